@@ -1,12 +1,12 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from app.core.security import get_current_active_user
 from app.crud.alert import alert_crud
-from app.db.session import get_db
+from app.db.session import get_async_db, get_async_read_db
 from app.schemas.alert import Alert, AlertCreate, AlertUpdate
 from app.models.user import User
 from app.services.notification.email import EmailNotifier
@@ -14,50 +14,54 @@ from app.services.notification.email import EmailNotifier
 router = APIRouter()
 
 @router.get("/", response_model=List[Alert])
-def read_alerts(
-    db: Session = Depends(get_db),
+async def read_alerts(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
 ):
     """Retrieve alerts for current user"""
-    alerts = alert_crud.get_multi_by_owner(
-        db, user_id=current_user.id, skip=skip, limit=limit
+    alerts = await alert_crud.get_multi_by_owner_async(
+        db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor
     )
+    next_cursor = alert_crud.next_cursor(alerts, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return alerts
 
 @router.post("/", response_model=Alert)
-def create_alert(
+async def create_alert(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     alert_in: AlertCreate,
     current_user: User = Depends(get_current_active_user),
     background_tasks: BackgroundTasks,
 ):
     """Create new alert for current user"""
-    alert = alert_crud.create_with_owner(
+    alert = await alert_crud.create_with_owner_async(
         db=db, obj_in=alert_in, user_id=current_user.id
     )
     
     # Immediately check if condition is met
     background_tasks.add_task(
         check_alert_condition,
-        alert_id=alert.id,
-        db=db
+        alert_id=alert.id
     )
     
     return alert
 
 @router.put("/{alert_id}", response_model=Alert)
-def update_alert(
+async def update_alert(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     alert_id: int,
     alert_in: AlertUpdate,
     current_user: User = Depends(get_current_active_user),
 ):
     """Update existing alert"""
-    alert = alert_crud.get(db, id=alert_id)
+    alert = await alert_crud.get_async(db, id=alert_id)
     if not alert:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -68,18 +72,18 @@ def update_alert(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    alert = alert_crud.update(db, db_obj=alert, obj_in=alert_in)
+    alert = await alert_crud.update_async(db, db_obj=alert, obj_in=alert_in)
     return alert
 
 @router.delete("/{alert_id}", response_model=Alert)
-def delete_alert(
+async def delete_alert(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     alert_id: int,
     current_user: User = Depends(get_current_active_user),
 ):
     """Delete existing alert"""
-    alert = alert_crud.get(db, id=alert_id)
+    alert = await alert_crud.get_async(db, id=alert_id)
     if not alert:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,10 +94,10 @@ def delete_alert(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    alert = alert_crud.remove(db, id=alert_id)
+    alert = await alert_crud.remove_async(db, id=alert_id)
     return alert
 
-def check_alert_condition(alert_id: int, db: Session):
+def check_alert_condition(alert_id: int):
     """Background task to check if alert condition is met"""
     from app.tasks.price_checks import check_alert
     check_alert.delay(alert_id)
@@ -1,25 +1,25 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import security
 from app.core.config import settings
 from app.crud.user import user_crud
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.schemas.token import Token
 from app.schemas.user import User
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login(
-    db: Session = Depends(get_db),
+async def login(
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """OAuth2 compatible token login"""
-    user = user_crud.authenticate(
+    user = await user_crud.authenticate_async(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
@@ -48,14 +48,14 @@ def login(
     }
 
 @router.post("/test-token", response_model=User)
-def test_token(
+async def test_token(
     current_user: User = Depends(security.get_current_active_user)
 ):
     """Test access token validity"""
     return current_user
 
 @router.post("/refresh-token", response_model=Token)
-def refresh_token(
+async def refresh_token(
     current_user: User = Depends(security.get_current_active_user)
 ):
     """Refresh access token"""
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import get_current_active_user
+from app.db.session import AsyncReadSessionLocal, get_async_read_db
+from app.models.user import User
+from app.services.analytics.export import (
+    ExportSpec,
+    Position,
+    decode_token,
+    encode_token,
+    encoder_for,
+    iter_batches_async,
+    new_export,
+    resume_position,
+)
+from app.utils.exceptions import InvalidExportTokenError
+
+router = APIRouter()
+
+@router.get("/price-history")
+async def export_price_history(
+    db: AsyncSession = Depends(get_async_read_db),
+    product_id: Optional[List[int]] = Query(None),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    format: str = Query("ndjson", regex="^(ndjson|csv|arrow)$"),
+    token: Optional[str] = None,
+    after_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user),
+):
+    """Stream price history as NDJSON, CSV or Arrow IPC, in constant memory.
+
+    Exports the given products (repeat ``product_id``; default all of the
+    user's, or every product for superusers) from ``start`` to ``end``. The
+    export's token comes back in X-Export-Token; to resume an interrupted
+    pull, pass it as ``token`` with the id of the last row received as
+    ``after_id`` (the other filters are then taken from the token).
+    """
+    scope = None if current_user.is_superuser else current_user.id
+    if token is None:
+        spec = new_export(
+            format=format, product_ids=product_id, start=start, end=end, user_id=scope
+        )
+    else:
+        spec = decode_token(token)
+        if spec.user_id != scope:
+            raise InvalidExportTokenError("Export token belongs to another user")
+
+    after = None
+    if after_id is not None:
+        after = await db.run_sync(lambda session: resume_position(session, after_id))
+
+    encoder = encoder_for(spec)
+    return StreamingResponse(
+        _export_chunks(spec, after, encoder),
+        media_type=encoder.media_type,
+        headers={
+            "X-Export-Token": encode_token(spec),
+            "Content-Disposition": f'attachment; filename="price_history.{encoder.extension}"'
+        }
+    )
+
+async def _export_chunks(
+    spec: ExportSpec, after: Optional[Position], encoder
+) -> AsyncIterator[bytes]:
+    # The request's session may be closed before the body is sent
+    async with AsyncReadSessionLocal() as db:
+        yield encoder.header(resumed=after is not None)
+        async for rows in iter_batches_async(db, spec, after):
+            yield encoder.encode(rows)
+        yield encoder.footer()
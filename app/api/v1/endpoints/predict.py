@@ -1,16 +1,25 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+from app.core.response_cache import cached_response
 from app.services.analytics.price_predictor import PricePredictor
-from app.db.session import get_db
-from sqlalchemy.orm import Session
 
 router = APIRouter()
 
 @router.get("/predict/{product_id}")
-def predict_future_prices(
+async def predict_future_prices(
+    request: Request,
     product_id: int,
-    days: int = 7,
-    db: Session = Depends(get_db)
+    days: int = 7
 ):
-    predictor = PricePredictor(db)
     predictor = PricePredictor()
-    return predictor.predict(product_id, days)
\ No newline at end of file
+    # Predictions change when the model is retrained, and forecasts start
+    # from today
+    version = (date.today().isoformat(), predictor.model_version(product_id))
+
+    async def load():
+        # Model loading and inference are CPU-bound; keep them off the event loop
+        return await run_in_threadpool(predictor.predict, product_id, days), version, {}
+
+    return await cached_response(request, version=version, load=load)
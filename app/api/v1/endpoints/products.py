@@ -1,49 +1,155 @@
-from typing import List
+from typing import List, Optional, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, BackgroundTasks
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from app.core.response_cache import cached_response
 from app.core.security import get_current_active_user
+from app.crud.price_history import price_history_crud
 from app.crud.product import product_crud
-from app.db.session import get_db
-from app.schemas.product import Product, ProductCreate, ProductUpdate
+from app.db.session import get_async_db, get_async_read_db
+from app.schemas.price_history import PricePoint
+from app.schemas.product import (
+    OPTIONAL_FIELDS,
+    OWNER_FIELDS,
+    SUMMARY_FIELDS,
+    Product,
+    ProductCreate,
+    ProductSummary,
+    ProductUpdate,
+)
 from app.models.user import User
 from app.tasks.price_checks import check_product_price
+from app.utils.exceptions import InvalidFieldsError
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Product])
-def read_products(
-    db: Session = Depends(get_db),
+# Most history rows a list item may embed (?history=N)
+MAX_HISTORY_POINTS = 100
+
+def _summary_fields(fields: Optional[str], exclude: Sequence[str] = ()) -> List[str]:
+    """Fields named by a ``fields=a,b`` parameter (SUMMARY_FIELDS by
+    default), none of which may be in ``exclude``"""
+    if fields is None:
+        return [name for name in SUMMARY_FIELDS if name not in exclude]
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [
+        name for name in names
+        if name not in SUMMARY_FIELDS + OPTIONAL_FIELDS or name in exclude
+    ]
+    if unknown:
+        raise InvalidFieldsError(f"Unknown product fields: {', '.join(unknown)}")
+    return ["id"] + [name for name in names if name != "id"]
+
+def _columns(fields: List[str], *extra: str) -> List[str]:
+    """Columns to select: the fields, plus what prices, versions and cursors need"""
+    return list(dict.fromkeys(
+        [*fields, "currency", *product_crud.version_columns, *extra]
+    ))
+
+async def _summaries(
+    db: AsyncSession, rows: List[Row], history: int
+) -> List[ProductSummary]:
+    items = [ProductSummary.from_orm(row) for row in rows]
+    if history:
+        points = await price_history_crud.get_latest_for_products_async(
+            db, product_ids=[item.id for item in items], limit=history
+        )
+        for item in items:
+            item.price_history = [PricePoint.from_orm(point) for point in points[item.id]]
+    return items
+
+@router.get("/", response_model=List[ProductSummary], response_model_exclude_unset=True)
+async def read_products(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    history: int = Query(0, ge=0, le=MAX_HISTORY_POINTS),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Retrieve products for current user"""
-    products = product_crud.get_multi_by_owner(
-        db, user_id=current_user.id, skip=skip, limit=limit
+    """Retrieve products for current user (ETag/If-None-Match aware).
+
+    ``fields`` picks the item fields (comma separated); ``history=N`` adds
+    each product's N most recent price history rows.
+    """
+    names = _summary_fields(fields)
+    page = dict(user_id=current_user.id, skip=skip, limit=limit, cursor=cursor)
+    versions = await product_crud.get_multi_by_owner_async(
+        db, columns=product_crud.version_columns, **page
+    )
+
+    async def load():
+        rows = await product_crud.get_multi_by_owner_async(
+            db, columns=_columns(names), **page
+        )
+        next_cursor = product_crud.next_cursor(rows, limit)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+        return await _summaries(db, rows, history), product_crud.row_versions(rows), headers
+
+    return await cached_response(
+        request,
+        version=product_crud.row_versions(versions),
+        load=load,
+        response_model_include=set(names) | ({"price_history"} if history else set()),
+        user_id=current_user.id
+    )
+
+@router.get("/deals", response_model=List[ProductSummary], response_model_exclude_unset=True)
+async def read_deals(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    threshold: float = 0.1,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    history: int = Query(0, ge=0, le=MAX_HISTORY_POINTS),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Products furthest below their recent average price (the same for every user)"""
+    names = _summary_fields(fields, exclude=OWNER_FIELDS)
+    page = dict(threshold=threshold, limit=limit, cursor=cursor)
+    versions = await product_crud.get_price_drops_async(
+        db, columns=product_crud.version_columns, **page
+    )
+
+    async def load():
+        rows = await product_crud.get_price_drops_async(
+            db, columns=_columns(names, "price_drop_pct"), **page
+        )
+        next_cursor = product_crud.next_cursor(rows, limit, sort_key="price_drop_pct")
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+        return await _summaries(db, rows, history), product_crud.row_versions(rows), headers
+
+    return await cached_response(
+        request,
+        version=product_crud.row_versions(versions),
+        load=load,
+        response_model_include=set(names) | ({"price_history"} if history else set())
     )
-    return products
 
 @router.post("/", response_model=Product)
-def create_product(
+async def create_product(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     product_in: ProductCreate,
     current_user: User = Depends(get_current_active_user),
     background_tasks: BackgroundTasks,
 ):
     """Create new product for current user"""
     # Check if product already exists
-    existing_product = product_crud.get_by_url(db, url=product_in.url)
+    existing_product = await product_crud.get_by_url_async(db, url=product_in.url)
     if existing_product:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Product with this URL already exists"
         )
     
-    product = product_crud.create_with_owner(
+    product = await product_crud.create_with_owner_async(
         db=db, obj_in=product_in, user_id=current_user.id
     )
     
@@ -56,15 +162,17 @@ def create_product(
     return product
 
 @router.put("/{product_id}", response_model=Product)
-def update_product(
+async def update_product(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     product_id: int,
     product_in: ProductUpdate,
     current_user: User = Depends(get_current_active_user),
 ):
     """Update existing product"""
-    product = product_crud.get(db, id=product_id)
+    product = await product_crud.get_async(
+        db, id=product_id, load_relationships=False
+    )
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -75,18 +183,20 @@ def update_product(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    product = product_crud.update(db, db_obj=product, obj_in=product_in)
+    product = await product_crud.update_async(db, db_obj=product, obj_in=product_in)
     return product
 
 @router.delete("/{product_id}", response_model=Product)
-def delete_product(
+async def delete_product(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     product_id: int,
     current_user: User = Depends(get_current_active_user),
 ):
     """Delete existing product"""
-    product = product_crud.get(db, id=product_id)
+    product = await product_crud.get_async(
+        db, id=product_id, load_relationships=False
+    )
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -97,19 +207,21 @@ def delete_product(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    product = product_crud.remove(db, id=product_id)
+    product = await product_crud.remove_async(db, id=product_id)
     return product
 
 @router.post("/{product_id}/check", response_model=dict)
-def trigger_price_check(
+async def trigger_price_check(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     product_id: int,
     current_user: User = Depends(get_current_active_user),
     background_tasks: BackgroundTasks,
 ):
     """Manually trigger price check for a product"""
-    product = product_crud.get(db, id=product_id)
+    product = await product_crud.get_async(
+        db, id=product_id, load_relationships=False
+    )
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
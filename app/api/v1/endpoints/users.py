@@ -1,25 +1,41 @@
-from typing import List
+from typing import AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from starlette import status
 
-from app.core.security import get_current_active_superuser
+from app.config import settings
+from app.core.security import get_current_active_superuser, get_current_active_user
 from app.crud.user import user_crud
-from app.db.session import get_db
+from app.db.session import (
+    AsyncReadSessionLocal,
+    get_async_db,
+    get_async_read_db,
+    get_db,
+    get_read_db,
+)
 from app.schemas.user import User, UserCreate, UserUpdate
+from app.utils.exceptions import PayloadTooLargeError, UnsupportedImageError
+from app.utils.helpers import etag_matches, image_content_type
 
 router = APIRouter()
 
 @router.get("/", response_model=List[User])
 def read_users(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_superuser),
 ):
     """Retrieve all users (admin only)"""
-    users = user_crud.get_multi(db, skip=skip, limit=limit)
+    users = user_crud.get_multi(db, skip=skip, limit=limit, cursor=cursor)
+    next_cursor = user_crud.next_cursor(users, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return users
 
 @router.post("/", response_model=User)
@@ -97,5 +113,89 @@ def update_user_me(
                 detail="Email already registered"
             )
     
-    user = user_crud.update(db, db_obj=current_user, obj_in=user_in)
+    # current_user is a cached principal, not a row in this session
+    user = user_crud.get(db, id=current_user.id)
+    user = user_crud.update(db, db_obj=user, obj_in=user_in)
     return user
+
+@router.put("/me/avatar", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_avatar_me(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Replace the current user's profile image (raw image bytes as the body)"""
+    image = bytearray()
+    async for chunk in request.stream():
+        image.extend(chunk)
+        if len(image) > settings.AVATAR_MAX_BYTES:
+            raise PayloadTooLargeError(settings.AVATAR_MAX_BYTES)
+    content_type = image_content_type(bytes(image[:16]))
+    if content_type is None:
+        raise UnsupportedImageError()
+    await user_crud.set_avatar_async(
+        db, user_id=current_user.id, image=bytes(image), content_type=content_type
+    )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.delete("/me/avatar", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_avatar_me(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Remove the current user's profile image"""
+    if not await user_crud.remove_avatar_async(db, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Avatar not found"
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get("/{user_id}/avatar")
+async def read_avatar(
+    user_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Stream a user's profile image; 304 when the client's copy is current"""
+    if user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    avatar = await user_crud.get_avatar_async(db, user_id=user_id)
+    if not avatar:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Avatar not found"
+        )
+
+    headers = {"ETag": f'"{avatar.etag}"', "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), avatar.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    headers["Content-Length"] = str(avatar.size)
+    return StreamingResponse(
+        _avatar_chunks(user_id, avatar.etag, avatar.size),
+        media_type=avatar.content_type,
+        headers=headers
+    )
+
+async def _avatar_chunks(user_id: int, etag: str, size: int) -> AsyncIterator[bytes]:
+    # The request's session may be closed before the body is sent
+    async with AsyncReadSessionLocal() as db:
+        if db.get_bind().dialect.name == "postgresql":
+            # Every chunk from one snapshot, so a replacement mid-stream is not seen
+            await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        offset = 0
+        while offset < size:
+            chunk = await user_crud.read_avatar_chunk_async(
+                db, user_id=user_id, etag=etag,
+                offset=offset, size=settings.AVATAR_CHUNK_SIZE
+            )
+            if not chunk:
+                # Replaced or deleted since the headers went out; abort the
+                # response instead of ending it short of Content-Length
+                raise RuntimeError(f"Avatar of user {user_id} changed while streaming")
+            yield chunk
+            offset += len(chunk)
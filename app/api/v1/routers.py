@@ -5,7 +5,8 @@ from app.api.v1.endpoints import (
     users, 
     products, 
     alerts,
-    price_history
+    price_history,
+    exports
 )
 
 api_router = APIRouter()
@@ -19,6 +20,7 @@ api_router.include_router(
     prefix="/price-history", 
     tags=["price-history"]
 )
+api_router.include_router(exports.router, prefix="/export", tags=["export"])
 from .endpoints import predict  # Add this line
 
 api_router.include_router(predict.router, prefix="/predict", tags=["predictions"])
\ No newline at end of file
@@ -6,7 +6,25 @@ load_dotenv()
 class Config:
     # Database configuration
     DB_URI = os.getenv('DATABASE_URL', 'sqlite:///price_tracker.db')
-    
+    # Connection pool per engine; watch GET /health/db for saturation and waits
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 20))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 100))
+    # Statements at least this slow go to the slow-query log
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+    # Requests and tasks running more statements than this are logged as likely N+1s
+    QUERY_COUNT_WARN = int(os.getenv('QUERY_COUNT_WARN', 50))
+    # Report X-DB-Query-Count / X-DB-Time-Ms on every API response
+    DB_DEBUG_HEADERS = os.getenv('DB_DEBUG_HEADERS', 'False').lower() == 'true'
+    # Read replicas, comma separated; read-only sessions use them when set
+    DATABASE_REPLICA_URLS = [
+        url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()
+    ]
+    # Replicas further behind than this are skipped until they catch up
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_LAG_CHECK_SECONDS = float(os.getenv('REPLICA_LAG_CHECK_SECONDS', 5))
+    # A user who just wrote reads from the primary for this long
+    REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', 10))
+
     # Scraper configuration
     REQUEST_HEADERS = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -18,6 +36,116 @@ class Config:
     EMAIL_SENDER = os.getenv('EMAIL_SENDER')
     EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
     SMS_API_KEY = os.getenv('SMS_API_KEY')
+
+    # SMTP session pool (set EMAIL_SMTP_STARTTLS=False to point at a local sink)
+    EMAIL_SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+    EMAIL_SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
+    EMAIL_SMTP_STARTTLS = os.getenv('EMAIL_SMTP_STARTTLS', 'True').lower() == 'true'
+    EMAIL_SMTP_TIMEOUT = float(os.getenv('EMAIL_SMTP_TIMEOUT', 30))
+    EMAIL_SMTP_POOL_SIZE = int(os.getenv('EMAIL_SMTP_POOL_SIZE', 8))
+    EMAIL_SMTP_MAX_MESSAGES_PER_SESSION = int(
+        os.getenv('EMAIL_SMTP_MAX_MESSAGES_PER_SESSION', 500)
+    )
+    NOTIFICATION_CONCURRENCY = int(os.getenv('NOTIFICATION_CONCURRENCY', 32))
+
+    # Push/SMS providers (shared HTTP/2 clients)
+    PUSH_API_KEY = os.getenv('PUSH_API_KEY')
+    PUSH_API_URL = os.getenv('PUSH_API_URL')
+    PUSH_BATCH_SIZE = int(os.getenv('PUSH_BATCH_SIZE', 100))
+    PUSH_MAX_CONCURRENCY = int(os.getenv('PUSH_MAX_CONCURRENCY', 20))
+    SMS_API_URL = os.getenv('SMS_API_URL')
+    SMS_API_BATCH_URL = os.getenv('SMS_API_BATCH_URL')
+    SMS_BATCH_SIZE = int(os.getenv('SMS_BATCH_SIZE', 100))
+    SMS_MAX_CONCURRENCY = int(os.getenv('SMS_MAX_CONCURRENCY', 10))
+    NOTIFICATION_HTTP_TIMEOUT = float(os.getenv('NOTIFICATION_HTTP_TIMEOUT', 10))
+
+    # Send governor: "provider=rate:burst" or "provider/sender=rate:burst",
+    # comma separated; providers without an entry are not paced
+    NOTIFICATION_RATE_LIMITS = os.getenv(
+        'NOTIFICATION_RATE_LIMITS', 'email=14:28,sms=10:20,push=500:1000'
+    )
+    NOTIFICATION_MAX_PENDING_SENDS = int(os.getenv('NOTIFICATION_MAX_PENDING_SENDS', 5000))
+    NOTIFICATION_MAX_SEND_WAIT_SECONDS = float(
+        os.getenv('NOTIFICATION_MAX_SEND_WAIT_SECONDS', 30)
+    )
+    NOTIFICATION_THROTTLE_RETRIES = int(os.getenv('NOTIFICATION_THROTTLE_RETRIES', 3))
+
+    # Outbox jobs for one (user, channel) within this window go out as a digest
+    NOTIFICATION_DIGEST_WINDOW_SECONDS = float(
+        os.getenv('NOTIFICATION_DIGEST_WINDOW_SECONDS', 120)
+    )
+    # Alerts this far below target are sent immediately instead of batched
+    NOTIFICATION_URGENT_DROP_PCT = float(os.getenv('NOTIFICATION_URGENT_DROP_PCT', 0.3))
+
+    # Alert re-arming: after notifying, an alert stays quiet until the price
+    # rises back above target (plus margin) or drops a further ALERT_REARM_DROP_PCT
+    ALERT_REARM_DROP_PCT = float(os.getenv('ALERT_REARM_DROP_PCT', 0.1))
+    ALERT_REARM_MARGIN_PCT = float(os.getenv('ALERT_REARM_MARGIN_PCT', 0.02))
+    ALERT_COOLDOWN_SECONDS = int(os.getenv('ALERT_COOLDOWN_SECONDS', 3600))
+
+    # Notification outbox drained by the notifications worker
+    NOTIFICATION_OUTBOX_BATCH_SIZE = int(os.getenv('NOTIFICATION_OUTBOX_BATCH_SIZE', 500))
+    NOTIFICATION_OUTBOX_LEASE_SECONDS = int(os.getenv('NOTIFICATION_OUTBOX_LEASE_SECONDS', 120))
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS = int(os.getenv('NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5))
+    NOTIFICATION_OUTBOX_RETRY_SECONDS = int(os.getenv('NOTIFICATION_OUTBOX_RETRY_SECONDS', 60))
+    NOTIFICATION_OUTBOX_POLL_SECONDS = float(os.getenv('NOTIFICATION_OUTBOX_POLL_SECONDS', 10))
+
+    # Monthly price_history partitions (apply migrations/002 on Postgres first)
+    PRICE_HISTORY_PARTITIONING = os.getenv('PRICE_HISTORY_PARTITIONING', 'False').lower() == 'true'
+    PRICE_HISTORY_PARTITION_PREMAKE = int(os.getenv('PRICE_HISTORY_PARTITION_PREMAKE', 3))
+    # Months of history to keep; 0 keeps everything
+    PRICE_HISTORY_RETENTION_MONTHS = int(os.getenv('PRICE_HISTORY_RETENTION_MONTHS', 0))
+    # Store a new price_history row only when price or availability changes
+    PRICE_HISTORY_CHANGE_ONLY = os.getenv('PRICE_HISTORY_CHANGE_ONLY', 'False').lower() == 'true'
+    # Window of history used for price statistics on each check
+    PRICE_STATS_WINDOW_DAYS = int(os.getenv('PRICE_STATS_WINDOW_DAYS', 90))
+    # Trailing window whose mean daily close is the deals feed's reference price
+    PRICE_DROP_WINDOW_DAYS = int(os.getenv('PRICE_DROP_WINDOW_DAYS', 30))
+
+    # Password hashing (app/core/hashing.py). Stored hashes with fewer
+    # rounds are upgraded on the next successful login
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    # Hashing processes; 0 uses one per CPU
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 0))
+    # Reject hashing work with 503 beyond this queue depth or expected wait
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 64))
+    PASSWORD_HASH_MAX_WAIT_SECONDS = float(os.getenv('PASSWORD_HASH_MAX_WAIT_SECONDS', 2))
+
+    # Authenticated users cached per (user, token); 0 disables the cache.
+    # Set PRINCIPAL_CACHE_REDIS_URL to share entries and invalidations
+    # between processes (redis package required)
+    PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv('PRINCIPAL_CACHE_TTL_SECONDS', 60))
+    PRINCIPAL_CACHE_MAXSIZE = int(os.getenv('PRINCIPAL_CACHE_MAXSIZE', 10000))
+    PRINCIPAL_CACHE_REDIS_URL = os.getenv('PRINCIPAL_CACHE_REDIS_URL')
+
+    # Profile images (user_avatars), streamed to clients in chunks
+    AVATAR_MAX_BYTES = int(os.getenv('AVATAR_MAX_BYTES', 2 * 1024 * 1024))
+    AVATAR_CHUNK_SIZE = int(os.getenv('AVATAR_CHUNK_SIZE', 256 * 1024))
+
+    # Rendered GET responses by ETag (app/core/response_cache.py); 0 TTL
+    # disables the store but keeps ETags and 304s. Set
+    # RESPONSE_CACHE_REDIS_URL to share rendered bodies between processes
+    RESPONSE_CACHE_TTL_SECONDS = float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', 300))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    RESPONSE_CACHE_REDIS_URL = os.getenv('RESPONSE_CACHE_REDIS_URL')
+
+    # Bulk price history export (app/services/analytics/export.py): rows per
+    # server-side cursor fetch and output batch
+    EXPORT_BATCH_ROWS = int(os.getenv('EXPORT_BATCH_ROWS', 5000))
+    # Signs resume tokens (SECRET_KEY if unset); must be the same in every
+    # process serving exports, so the API refuses to start without one
+    EXPORT_TOKEN_SECRET = os.getenv('EXPORT_TOKEN_SECRET') or os.getenv('SECRET_KEY')
+    EXPORT_TOKEN_TTL_HOURS = float(os.getenv('EXPORT_TOKEN_TTL_HOURS', 24))
+
+    # Email templates
+    EMAIL_TEMPLATE_DIR = os.getenv(
+        'EMAIL_TEMPLATE_DIR',
+        os.path.join(os.path.dirname(__file__), 'templates')
+    )
+    EMAIL_TEMPLATE_RELOAD_INTERVAL = float(os.getenv('EMAIL_TEMPLATE_RELOAD_INTERVAL', 5))
+    PUBLIC_BASE_URL = os.getenv('PUBLIC_BASE_URL', 'http://localhost:8000')
     
     # Scheduling
-    CHECK_INTERVAL_HOURS = 6
\ No newline at end of file
+    CHECK_INTERVAL_HOURS = 6
+
+settings = Config()
@@ -0,0 +1,139 @@
+"""Password hashing in a dedicated process pool.
+
+bcrypt costs a few hundred milliseconds of CPU per call by design. Run in
+the request path it holds the event loop (async endpoints) or a threadpool
+worker (sync ones) for that long, so a burst of logins stalls unrelated
+requests. Here every hash and verify runs in a pool of
+PASSWORD_HASH_WORKERS processes instead, and callers only wait on a future.
+
+Admission adapts to the observed cost: a job's expected wait is the number
+of jobs ahead of it per worker times the recent mean hash time. When that
+exceeds PASSWORD_HASH_MAX_WAIT_SECONDS, or PASSWORD_HASH_MAX_PENDING jobs
+are already queued, the call fails at once with PasswordHashingBusyError
+(503 with Retry-After) rather than queueing behind the burst.
+
+Successful verifies also report whether the stored hash is below the
+current policy (BCRYPT_ROUNDS, deprecated schemes), with a replacement hash
+computed in the same job, so logins upgrade hashes transparently.
+"""
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.utils.exceptions import PasswordHashingBusyError
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    # Hashes with fewer rounds need_update and are replaced on login
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS
+)
+
+# Run inside the pool's processes; each returns (result, seconds spent)
+
+def _hash(secret: str) -> Tuple[str, float]:
+    started = time.perf_counter()
+    return pwd_context.hash(secret), time.perf_counter() - started
+
+def _verify_and_update(secret: str, hashed: str) -> Tuple[Tuple[bool, Optional[str]], float]:
+    started = time.perf_counter()
+    return pwd_context.verify_and_update(secret, hashed), time.perf_counter() - started
+
+class PasswordHasher:
+    """Bounded process pool for bcrypt with fail-fast admission"""
+
+    def __init__(
+        self,
+        *,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_pending: int = settings.PASSWORD_HASH_MAX_PENDING,
+        max_wait_seconds: float = settings.PASSWORD_HASH_MAX_WAIT_SECONDS
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.max_wait_seconds = max_wait_seconds
+        self.pending = 0
+        self.mean_seconds: Optional[float] = None  # moving average of job cost
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def hash(self, secret: str) -> str:
+        """Hash a password, blocking the calling thread (not the CPU) meanwhile"""
+        return self._submit(_hash, secret).result()[0]
+
+    def verify_and_update(self, secret: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(valid, replacement hash or None)"""
+        return self._submit(_verify_and_update, secret, hashed).result()[0]
+
+    async def hash_async(self, secret: str) -> str:
+        return (await asyncio.wrap_future(self._submit(_hash, secret)))[0]
+
+    async def verify_and_update_async(
+        self, secret: str, hashed: str
+    ) -> Tuple[bool, Optional[str]]:
+        return (await asyncio.wrap_future(
+            self._submit(_verify_and_update, secret, hashed)
+        ))[0]
+
+    def expected_wait(self) -> float:
+        """Seconds a job submitted now would queue before a worker picks it up"""
+        return (self.pending // self.workers) * (self.mean_seconds or 0.0)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args) -> Future:
+        with self._lock:
+            wait = self.expected_wait()
+            if self.pending >= self.max_pending or wait > self.max_wait_seconds:
+                raise PasswordHashingBusyError(retry_after=max(1, math.ceil(wait)))
+            self.pending += 1
+            try:
+                try:
+                    future = self._executor().submit(fn, *args)
+                except BrokenProcessPool:
+                    # A worker died; start over with a fresh pool
+                    self._pool = None
+                    future = self._executor().submit(fn, *args)
+            except BaseException:
+                self.pending -= 1
+                raise
+        future.add_done_callback(self._finished)
+        return future
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # Forked processes (Celery children) must not share the parent's pool
+        if self._pool is None or self._pool_pid != os.getpid():
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            self._pool_pid = os.getpid()
+        return self._pool
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                return
+            seconds = future.result()[1]
+            self.mean_seconds = (
+                seconds if self.mean_seconds is None
+                else 0.8 * self.mean_seconds + 0.2 * seconds
+            )
+
+password_hasher = PasswordHasher()
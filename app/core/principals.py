@@ -0,0 +1,171 @@
+"""Cache of authenticated users for the auth dependencies.
+
+Every authenticated request resolves its bearer token to a user. Instead of
+a users lookup per request, a Principal (a read-only copy of the user's
+small columns) is cached per (user id, token jti), so repeated requests
+with the same token run no query at all.
+
+Entries are dropped when a commit updates or deletes the user, which covers
+profile edits, deactivation and password changes. The optional shared
+tier (PRINCIPAL_CACHE_REDIS_URL) lets processes reuse each other's entries
+and drops them there too, but a copy another process already holds lives
+until PRINCIPAL_CACHE_TTL_SECONDS pass, which bounds how long a change
+takes to apply everywhere.
+"""
+import json
+import threading
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Any, Iterable, Optional, Set
+
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.config import settings
+from app.core.logging import logger
+from app.db.models.user import User
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by endpoints (no password hash)"""
+    id: int
+    email: str
+    full_name: Optional[str] = None
+    phone: Optional[str] = None
+    notification_pref: Optional[str] = None
+    is_active: bool = True
+    is_superuser: bool = False
+    email_verified: bool = False
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    last_login: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(**{f.name: getattr(user, f.name) for f in fields(cls)})
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), default=datetime.isoformat)
+
+    @classmethod
+    def from_json(cls, data: str) -> "Principal":
+        values = json.loads(data)
+        for name in ("created_at", "updated_at", "last_login"):
+            if values.get(name):
+                values[name] = datetime.fromisoformat(values[name])
+        return cls(**values)
+
+class PrincipalCache:
+    """Process-local TTL+LRU cache with an optional Redis tier behind it"""
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = settings.PRINCIPAL_CACHE_MAXSIZE,
+        ttl: float = settings.PRINCIPAL_CACHE_TTL_SECONDS,
+        shared_url: Optional[str] = settings.PRINCIPAL_CACHE_REDIS_URL
+    ):
+        self.ttl = ttl
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl) if ttl > 0 else None
+        self._lock = threading.Lock()
+        self._shared = None
+        if shared_url and ttl > 0:
+            import redis  # only needed for the shared tier
+            self._shared = redis.Redis.from_url(shared_url, socket_timeout=0.2)
+
+    def get(self, user_id: int, jti: Optional[str]) -> Optional[Principal]:
+        if self._local is None:
+            return None
+        key = (user_id, jti or "")
+        with self._lock:
+            principal = self._local.get(key)
+        if principal is not None or self._shared is None:
+            return principal
+        try:
+            data = self._shared.hget(self._shared_key(user_id), key[1])
+        except Exception as e:
+            logger.warning(f"Shared principal cache unavailable: {str(e)}")
+            return None
+        if data is None:
+            return None
+        principal = Principal.from_json(data)
+        with self._lock:
+            self._local[key] = principal
+        return principal
+
+    def put(self, user_id: int, jti: Optional[str], principal: Principal) -> None:
+        if self._local is None:
+            return
+        key = (user_id, jti or "")
+        with self._lock:
+            self._local[key] = principal
+        if self._shared is not None:
+            try:
+                pipe = self._shared.pipeline()
+                pipe.hset(self._shared_key(user_id), key[1], principal.to_json())
+                pipe.expire(self._shared_key(user_id), int(self.ttl) or 1)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Shared principal cache unavailable: {str(e)}")
+
+    def invalidate(self, user_ids: Optional[Iterable[int]] = None) -> None:
+        """Drop the given users' entries, or every entry when ``user_ids`` is None"""
+        if self._local is None:
+            return
+        ids = None if user_ids is None else set(user_ids)
+        with self._lock:
+            if ids is None:
+                self._local.clear()
+            else:
+                for key in [key for key in self._local.keys() if key[0] in ids]:
+                    self._local.pop(key, None)
+        if self._shared is not None:
+            try:
+                if ids is None:
+                    keys = list(self._shared.scan_iter(match=self._shared_key("*")))
+                else:
+                    keys = [self._shared_key(user_id) for user_id in ids]
+                if keys:
+                    self._shared.delete(*keys)
+            except Exception as e:
+                logger.warning(f"Shared principal cache unavailable: {str(e)}")
+
+    @staticmethod
+    def _shared_key(user_id: Any) -> str:
+        return f"principal:{user_id}"
+
+principal_cache = PrincipalCache()
+
+# Users changed in a session are invalidated once its transaction commits,
+# so a concurrent request cannot re-cache the old row in between. _ALL
+# stands for bulk statements whose rows are not known.
+_CHANGED = "changed_principals"
+_ALL = "all"
+
+def _mark(session: Optional[Session], user_id: Any) -> None:
+    if session is not None:
+        changed: Set[Any] = session.info.setdefault(_CHANGED, set())
+        changed.add(user_id)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    _mark(object_session(target), target.id)
+
+@event.listens_for(Session, "do_orm_execute")
+def _users_changed_in_bulk(state) -> None:
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    if any(mapper.class_ is User for mapper in state.all_mappers):
+        _mark(state.session, _ALL)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    changed = session.info.pop(_CHANGED, None)
+    if changed:
+        principal_cache.invalidate(None if _ALL in changed else changed)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_CHANGED, None)
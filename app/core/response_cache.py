@@ -0,0 +1,177 @@
+"""ETags, 304s and a rendered-body cache for polled GET endpoints.
+
+The browser extension and dashboard re-poll product lists and predictions
+far more often than prices change. A cached endpoint first reads a version
+of its response: a cheap value that changes whenever the response would,
+such as the listed products' updated_at, last_checked and reference_price
+read without loading the products. The strong ETag is a hash of the path,
+query parameters, user and that version, so
+
+* a request whose If-None-Match names it is answered 304 before anything
+  is loaded or serialized;
+* otherwise the rendered body is looked up by ETag in a bounded TTL+LRU
+  store (shared through Redis when RESPONSE_CACHE_REDIS_URL is set), and
+  only a miss runs the endpoint.
+
+Invalidation follows the data rather than messages: a price check writes
+last_checked, the next request reads a new version and so a new ETag, and
+the old body ages out of the store. Celery workers updating prices need no
+hook into the API processes' caches.
+
+A missed body is stored under the version of what was actually loaded, not
+the version read first; with replicas the two reads can hit different
+servers, and a body must never be cached under a newer ETag than its data.
+"""
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from cachetools import TTLCache
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import parse_obj_as
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.config import settings
+from app.core.logging import logger
+from app.utils.helpers import etag_matches
+
+# Per-user responses; clients must revalidate before reusing one
+CACHE_CONTROL = "private, no-cache"
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+class ResponseCache:
+    """Rendered bodies by ETag: a process-local store bounded in bytes,
+    with an optional Redis tier behind it"""
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = settings.RESPONSE_CACHE_MAX_BYTES,
+        ttl: float = settings.RESPONSE_CACHE_TTL_SECONDS,
+        shared_url: Optional[str] = settings.RESPONSE_CACHE_REDIS_URL
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = None
+        if ttl > 0 and max_bytes > 0:
+            self._local = TTLCache(
+                maxsize=max_bytes, ttl=ttl, getsizeof=lambda entry: len(entry.body)
+            )
+        self._lock = threading.Lock()
+        self._shared = None
+        if shared_url and self._local is not None:
+            import redis  # only needed for the shared tier
+            self._shared = redis.Redis.from_url(shared_url, socket_timeout=0.2)
+
+    def get(self, etag: str) -> Optional[CachedResponse]:
+        if self._local is None:
+            return None
+        with self._lock:
+            entry = self._local.get(etag)
+        if entry is not None or self._shared is None:
+            return entry
+        try:
+            data = self._shared.hgetall(self._shared_key(etag))
+        except Exception as e:
+            logger.warning(f"Shared response cache unavailable: {str(e)}")
+            return None
+        if not data:
+            return None
+        entry = CachedResponse(body=data[b"body"], headers=json.loads(data[b"headers"]))
+        self._store_local(etag, entry)
+        return entry
+
+    def put(self, etag: str, entry: CachedResponse) -> None:
+        if self._local is None or len(entry.body) > self.max_bytes:
+            return
+        self._store_local(etag, entry)
+        if self._shared is not None:
+            try:
+                pipe = self._shared.pipeline()
+                pipe.hset(self._shared_key(etag), mapping={
+                    "body": entry.body,
+                    "headers": json.dumps(entry.headers)
+                })
+                pipe.expire(self._shared_key(etag), int(self.ttl) or 1)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Shared response cache unavailable: {str(e)}")
+
+    def clear(self) -> None:
+        """Drop this process's entries (shared ones expire on their own)"""
+        if self._local is not None:
+            with self._lock:
+                self._local.clear()
+
+    def _store_local(self, etag: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._local[etag] = entry
+
+    @staticmethod
+    def _shared_key(etag: str) -> str:
+        return f"response:{etag}"
+
+response_cache = ResponseCache()
+
+def make_etag(request: Request, user_id: Optional[int], version: Any) -> str:
+    """Strong ETag for ``request`` as seen by ``user_id`` at ``version``"""
+    key = [
+        request.method,
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        user_id,
+        version
+    ]
+    raw = json.dumps(jsonable_encoder(key), separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+async def cached_response(
+    request: Request,
+    *,
+    version: Any,
+    load: Callable[[], Awaitable[Tuple[Any, Any, Dict[str, str]]]],
+    response_model: Any = None,
+    response_model_include: Optional[Set[str]] = None,
+    user_id: Optional[int] = None
+) -> Response:
+    """Answer a GET from its ETag, the cache, or ``load`` in that order.
+
+    ``version`` is the current version of the response. ``load`` returns
+    (content, version of that content, extra headers), and the content is
+    validated against ``response_model`` and rendered with
+    ``response_model_include`` as FastAPI would. Pass ``user_id`` unless
+    the response is the same for everyone.
+    """
+    etag = make_etag(request, user_id, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=_validators(etag))
+
+    entry = response_cache.get(etag)
+    if entry is None:
+        content, loaded_version, headers = await load()
+        if response_model is not None:
+            content = parse_obj_as(response_model, content)
+        etag = make_etag(request, user_id, loaded_version)
+        entry = CachedResponse(
+            body=JSONResponse(
+                jsonable_encoder(content, include=response_model_include)
+            ).body,
+            headers=dict(headers)
+        )
+        response_cache.put(etag, entry)
+    return Response(
+        content=entry.body,
+        media_type="application/json",
+        headers={**entry.headers, **_validators(etag)}
+    )
+
+def _validators(etag: str) -> Dict[str, str]:
+    return {"ETag": f'"{etag}"', "Cache-Control": CACHE_CONTROL}
@@ -2,19 +2,21 @@ from datetime import datetime, timedelta
 from typing import Optional, Union
 
 from jose import jwt
-from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.core.principals import Principal, principal_cache
 from app.db.models.user import User
 from app.crud.user import user_crud
-from app.db.session import get_db
+from app.db.routing import current_principal
+from app.db.session import get_async_db
 from app.schemas.user import TokenPayload
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 class Token(BaseModel):
@@ -26,12 +28,12 @@ class TokenData(BaseModel):
     email: Optional[EmailStr] = None
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password against hashed version"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify password against hashed version (in the hashing pool)"""
+    return password_hasher.verify_and_update(plain_password, hashed_password)[0]
 
 def get_password_hash(password: str) -> str:
-    """Generate password hash"""
-    return pwd_context.hash(password)
+    """Generate password hash (in the hashing pool)"""
+    return password_hasher.hash(password)
 
 def create_access_token(
     subject: Union[str, int], 
@@ -64,18 +66,17 @@ def authenticate_user(
     password: str
 ) -> Optional[User]:
     """Authenticate user with email and password"""
-    user = user_crud.get_by_email(db, email=email)
-    if not user:
-        return None
-    if not verify_password(password, user.hashed_password):
-        return None
-    return user
+    return user_crud.authenticate(db, email=email, password=password)
 
-def get_current_user(
-    db: Session = Depends(get_db),
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
     token: str = Depends(oauth2_scheme)
-) -> User:
-    """Get current authenticated user from JWT token"""
+) -> Principal:
+    """Get current authenticated user from JWT token.
+
+    Served from the principal cache when this token was seen recently, in
+    which case no query runs.
+    """
     try:
         payload = jwt.decode(
             token, 
@@ -89,17 +90,23 @@ def get_current_user(
             detail="Could not validate credentials",
         )
     
-    user = user_crud.get(db, id=token_data.sub)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    return user
+    principal = principal_cache.get(token_data.sub, token_data.jti)
+    if principal is None:
+        user = await user_crud.get_async(db, id=token_data.sub, load_relationships=False)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        principal = Principal.from_user(user)
+        principal_cache.put(token_data.sub, token_data.jti, principal)
+    # Lets read sessions keep this user on the primary after their writes
+    current_principal.set(principal.id)
+    return principal
 
-def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+async def get_current_active_user(
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Get current active user (not disabled)"""
     if not current_user.is_active:
         raise HTTPException(
@@ -108,9 +115,9 @@ def get_current_active_user(
         )
     return current_user
 
-def get_current_active_superuser(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+async def get_current_active_superuser(
+    current_user: Principal = Depends(get_current_active_user)
+) -> Principal:
     """Get current active superuser"""
     if not current_user.is_superuser:
         raise HTTPException(
@@ -0,0 +1,180 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+
+from app.crud.base import CRUDBase
+from app.db.models.alert import Alert
+from app.db.models.product import Product
+from app.schemas.alert import AlertCreate, AlertUpdate
+from app.utils.money import to_minor
+
+class CRUDAlert(CRUDBase[Alert, AlertCreate, AlertUpdate]):
+    def get_multi_by_owner(
+        self,
+        db: Session,
+        *,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[Alert]:
+        """Get multiple alerts owned by a user"""
+        return self._paginate(
+            db.query(Alert).filter(Alert.user_id == user_id),
+            skip=skip, limit=limit, cursor=cursor
+        )
+
+    async def get_multi_by_owner_async(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[Alert]:
+        """Get multiple alerts owned by a user"""
+        return await self._run_async(
+            db, self.get_multi_by_owner,
+            user_id=user_id, skip=skip, limit=limit, cursor=cursor
+        )
+
+    async def create_with_owner_async(
+        self, db: AsyncSession, *, obj_in: AlertCreate, user_id: int
+    ) -> Alert:
+        """Create a new alert for a user"""
+        return await self._run_async(
+            db, self.create_with_owner, obj_in=obj_in, user_id=user_id
+        )
+
+    def create_with_owner(
+        self, db: Session, *, obj_in: AlertCreate, user_id: int
+    ) -> Alert:
+        """Create a new alert for a user"""
+        obj_in_data = self._prices_to_minor(db, jsonable_encoder(obj_in))
+        db_obj = Alert(**obj_in_data, user_id=user_id)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Alert,
+        obj_in: Union[AlertUpdate, Dict[str, Any]]
+    ) -> Alert:
+        """Update an alert; a new target or reactivation re-arms it"""
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+
+        target_changed = (
+            update_data.get("target_price") is not None
+            and to_minor(update_data["target_price"], self._currency(db, update_data, db_obj))
+            != db_obj.target_price
+        )
+        reactivated = update_data.get("active") and not db_obj.active
+        if target_changed or reactivated:
+            update_data = {**update_data, "armed": True}
+        return super().update(db, db_obj=db_obj, obj_in=update_data)
+
+    def rearm(
+        self,
+        db: Session,
+        *,
+        product_id: int,
+        current_price: int,
+        rearm_margin_pct: float = 0.0
+    ) -> int:
+        """Re-arm disarmed alerts whose price climbed back above target (no commit).
+
+        The margin adds hysteresis so a price hovering around the target
+        does not flip the alert on every check.
+        """
+        result = db.execute(
+            update(Alert)
+            .where(
+                Alert.product_id == product_id,
+                Alert.active == True,
+                Alert.armed == False,
+                Alert.target_price * (1 + rearm_margin_pct) < current_price
+            )
+            .values(armed=True)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def get_triggered(
+        self,
+        db: Session,
+        *,
+        product_id: int,
+        current_price: int,
+        default_drop_pct: Optional[float] = None,
+        cooldown: Optional[timedelta] = None
+    ) -> List[Alert]:
+        """Get alerts that should notify at ``current_price``.
+
+        That is armed alerts at or above the price, plus disarmed alerts
+        whose price fell a further ``rearm_drop_pct`` (falling back to
+        ``default_drop_pct``) below the last notified price. Everything is
+        filtered in SQL, so alerts that already fired are never loaded.
+        """
+        drop_pct = func.coalesce(Alert.rearm_drop_pct, default_drop_pct)
+        conditions = [
+            Alert.product_id == product_id,
+            Alert.active == True,
+            Alert.target_price >= current_price,
+            or_(
+                Alert.armed == True,
+                and_(
+                    drop_pct.isnot(None),
+                    Alert.last_notified_price * (1 - drop_pct) >= current_price
+                )
+            )
+        ]
+        if cooldown:
+            conditions.append(or_(
+                Alert.last_notified_at.is_(None),
+                Alert.last_notified_at <= datetime.utcnow() - cooldown
+            ))
+        return (
+            db.query(Alert)
+            .options(joinedload(Alert.user), joinedload(Alert.product))
+            .filter(*conditions)
+            .all()
+        )
+
+    def mark_notified(
+        self, db: Session, *, ids: Sequence[int], price: int
+    ) -> None:
+        """Disarm alerts that were just notified at ``price`` (no commit)"""
+        if not ids:
+            return
+        db.execute(
+            update(Alert)
+            .where(Alert.id.in_(ids))
+            .values(
+                armed=False,
+                last_notified_price=price,
+                last_notified_at=datetime.utcnow()
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def _currency(
+        self, db: Session, data: Dict[str, Any], db_obj: Optional[Alert] = None
+    ) -> Optional[str]:
+        """Alert prices are in the alerted product's currency"""
+        product_id = data.get("product_id") or getattr(db_obj, "product_id", None)
+        product = db.get(Product, product_id) if product_id else None
+        return product.currency if product else None
+
+alert_crud = CRUDAlert(Alert)
@@ -1,15 +1,42 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session, selectinload
 
 from app.db.base_class import Base
+from app.db.types import MinorUnitPrice
+from app.utils.exceptions import InvalidCursorError
+from app.utils.money import to_minor
 
 ModelType = TypeVar("ModelType", bound=Base)  # Correctly define the TypeVar
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Rows per statement for the bulk methods; keeps bound parameters under
+# SQLite's limit and Postgres statements a manageable size
+BULK_CHUNK_SIZE = 500
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Column that list pages are ordered by, with id as the tie-breaker
+    sort_key = "id"
+    # Unique columns upsert_many matches existing rows on
+    upsert_key: Tuple[str, ...] = ()
+    # Relationships the API response schemas read; the async methods load
+    # them up front since lazy loads cannot run while a response is rendered
+    response_relationships: Tuple[str, ...] = ()
+    # Columns whose values change whenever an object's API representation
+    # does; listed with columns=version_columns they are what the response
+    # cache hashes into ETags (app/core/response_cache.py)
+    version_columns: Tuple[str, ...] = ()
+
     def __init__(self, model: Type[ModelType]):
         """CRUD object with default methods"""
         self.model = model
@@ -19,20 +46,135 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return db.get(self.model, id)
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[ModelType]:
         """Get multiple objects with pagination"""
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return self._paginate(db.query(self.model), skip=skip, limit=limit, cursor=cursor)
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         """Create new object"""
-        obj_in_data = jsonable_encoder(obj_in)
+        obj_in_data = self._prices_to_minor(db, jsonable_encoder(obj_in))
         db_obj = self.model(**obj_in_data)  # type: ignore
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def create_many(
+        self,
+        db: Session,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> List[int]:
+        """Insert many objects in one transaction and return their ids in input order.
+
+        Rows go out as batched INSERT ... RETURNING statements of up to
+        ``chunk_size`` rows; no objects are loaded back.
+        """
+        rows = [self._create_values(db, obj_in) for obj_in in objs_in]
+        assigned = self._assign_ids(db, len(rows))
+        if assigned is not None:
+            for row, id in zip(rows, assigned):
+                row["id"] = id
+        ids: List[int] = assigned or [0] * len(rows)
+        for fields, positions in self._group_by_fields(rows).items():
+            stmt = insert(self.model)
+            if assigned is None:
+                # A multi-row RETURNING is not guaranteed to follow VALUES order
+                stmt = stmt.returning(self.model.id, sort_by_parameter_order=True)
+            for start in range(0, len(positions), chunk_size):
+                chunk = positions[start:start + chunk_size]
+                result = db.execute(stmt, [rows[i] for i in chunk])
+                if assigned is None:
+                    for i, id in zip(chunk, result.scalars()):
+                        ids[i] = id
+        db.commit()
+        return ids
+
+    def upsert_many(
+        self,
+        db: Session,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        index_elements: Optional[Sequence[str]] = None,
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> List[int]:
+        """Insert many objects, updating rows that already exist, in one transaction.
+
+        Existing rows are matched on ``index_elements`` (the model's
+        ``upsert_key`` by default), which must be covered by a unique
+        constraint. Each row must still be insertable (required columns
+        given); only the fields present in each row are overwritten.
+        Returns the id of each input row's inserted or updated row, in
+        input order; when the input repeats a key the last occurrence wins
+        and every occurrence gets its id.
+        """
+        keys = tuple(index_elements or self.upsert_key)
+        if not keys:
+            raise ValueError(f"{self.model.__name__} has no upsert key")
+
+        data = [
+            obj_in.dict() if isinstance(obj_in, BaseModel) else dict(obj_in)
+            for obj_in in objs_in
+        ]
+        existing: Dict[Tuple, ModelType] = {}
+        if any(self._price_columns(row) for row in data):
+            # Prices for rows that already exist are in that row's currency
+            key_columns = tuple_(*(getattr(self.model, key) for key in keys))
+            values = list({tuple(row[key] for key in keys) for row in data})
+            for start in range(0, len(values), chunk_size):
+                existing.update(
+                    (tuple(getattr(obj, key) for key in keys), obj) for obj in
+                    db.query(self.model).filter(key_columns.in_(values[start:start + chunk_size]))
+                )
+
+        # ON CONFLICT cannot touch the same row twice in one statement
+        latest: Dict[Tuple, Dict[str, Any]] = {}
+        for row in data:
+            key = tuple(row[name] for name in keys)
+            latest.pop(key, None)
+            latest[key] = self._create_values(db, row, existing.get(key))
+        rows = list(latest.values())
+
+        columns = inspect(self.model).columns
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        key_columns = [getattr(self.model, key) for key in keys]
+        ids_by_key: Dict[Tuple, int] = {}
+        # One statement shape per set of given fields, so absent fields keep
+        # their current values instead of being reset to defaults
+        for fields, positions in self._group_by_fields(rows).items():
+            stmt = dialect.insert(self.model)
+            set_ = {
+                name: stmt.excluded[name] for name in fields
+                if name not in keys and not columns[name].primary_key
+            }
+            if set_:
+                # ON CONFLICT skips Python-side onupdate defaults such as updated_at
+                set_.update(
+                    (column.name, column.onupdate.arg(None)) for column in columns
+                    if column.onupdate is not None and column.onupdate.is_callable
+                    and column.name not in fields
+                )
+            else:
+                # Nothing to change; a no-op update still returns the id
+                set_ = {keys[0]: stmt.excluded[keys[0]]}
+            # Ids are matched back on the key, RETURNING order is unspecified
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(keys), set_=set_
+            ).returning(self.model.id, *key_columns)
+            for start in range(0, len(positions), chunk_size):
+                chunk = positions[start:start + chunk_size]
+                for id, *key in db.execute(stmt.values([rows[i] for i in chunk])):
+                    ids_by_key[tuple(key)] = id
+        db.commit()
+        return [ids_by_key[tuple(row[key] for key in keys)] for row in data]
+
     def update(
         self,
         db: Session,
@@ -41,13 +183,13 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
         """Update existing object"""
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
+        update_data = self._prices_to_minor(db, update_data, db_obj)
         
-        for field in obj_data:
+        for field in inspect(self.model).column_attrs.keys():
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
         
@@ -56,6 +198,39 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.refresh(db_obj)
         return db_obj
 
+    def update_many(
+        self,
+        db: Session,
+        *,
+        objs_in: Sequence[Dict[str, Any]],
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> int:
+        """Update many objects by id in one transaction.
+
+        Each dict holds an ``id`` and the fields to change for that row; rows
+        are sent as executemany UPDATE statements of up to ``chunk_size``.
+        Returns the number of rows given.
+        """
+        fields = set(inspect(self.model).column_attrs.keys())
+        existing: Dict[int, ModelType] = {}
+        if any(self._price_columns(data) for data in objs_in):
+            # Prices are scaled by each row's stored currency
+            ids = [data["id"] for data in objs_in]
+            for start in range(0, len(ids), chunk_size):
+                existing.update(
+                    (obj.id, obj) for obj in
+                    db.query(self.model).filter(self.model.id.in_(ids[start:start + chunk_size]))
+                )
+
+        rows = []
+        for data in objs_in:
+            data = self._prices_to_minor(db, data, existing.get(data["id"]))
+            rows.append({name: value for name, value in data.items() if name in fields})
+        for start in range(0, len(rows), chunk_size):
+            self._update_rows(db, rows[start:start + chunk_size])
+        db.commit()
+        return len(rows)
+
     def remove(self, db: Session, *, id: int) -> ModelType:
         """Remove object by ID"""
         obj = db.get(self.model, id)
@@ -66,3 +241,224 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def count(self, db: Session) -> int:
         """Count all objects"""
         return db.query(self.model).count()
+
+    # Async variants for the FastAPI layer. They run the sync methods on the
+    # AsyncSession's connection (AsyncSession.run_sync), so behaviour is
+    # identical while database I/O yields to the event loop.
+
+    async def get_async(
+        self, db: AsyncSession, id: Any, *, load_relationships: bool = True
+    ) -> Optional[ModelType]:
+        """Get object by ID; skip loading relationships for existence/ownership checks"""
+        return await self._run_async(
+            db, self.get, load_relationships=load_relationships, id=id
+        )
+
+    async def get_multi_async(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[ModelType]:
+        """Get multiple objects with pagination"""
+        return await self._run_async(
+            db, self.get_multi, skip=skip, limit=limit, cursor=cursor
+        )
+
+    async def create_async(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        """Create new object"""
+        return await self._run_async(db, self.create, obj_in=obj_in)
+
+    async def update_async(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        """Update existing object"""
+        return await self._run_async(db, self.update, db_obj=db_obj, obj_in=obj_in)
+
+    async def remove_async(self, db: AsyncSession, *, id: int) -> ModelType:
+        """Remove object by ID"""
+        def remove(session: Session) -> ModelType:
+            # Load what the response needs before the row is gone
+            self._load_relationships(session, session.get(self.model, id))
+            return self.remove(session, id=id)
+
+        return await db.run_sync(remove)
+
+    async def count_async(self, db: AsyncSession) -> int:
+        """Count all objects"""
+        return await db.run_sync(self.count)
+
+    async def _run_async(
+        self, db: AsyncSession, method, *, load_relationships: bool = True, **kwargs
+    ):
+        """Run a sync CRUD method on an AsyncSession, loading response relationships"""
+        def call(session: Session):
+            result = method(session, **kwargs)
+            if load_relationships:
+                self._load_relationships(session, result)
+            return result
+
+        return await db.run_sync(call)
+
+    def _load_relationships(self, db: Session, result: Any) -> None:
+        """Populate response_relationships on the model objects in ``result``
+        with one selectin query each"""
+        objs = result if isinstance(result, list) else [result]
+        ids = [obj.id for obj in objs if isinstance(obj, self.model)]
+        if not self.response_relationships or not ids:
+            return
+        db.execute(
+            select(self.model)
+            .where(self.model.id.in_(ids))
+            .options(*(
+                selectinload(getattr(self.model, name))
+                for name in self.response_relationships
+            ))
+        ).all()
+
+    def row_versions(self, items: Sequence[Any]) -> List[Tuple]:
+        """version_columns of loaded objects or rows, as listed with
+        ``columns=version_columns``"""
+        return [tuple(getattr(item, name) for name in self.version_columns) for item in items]
+
+    def next_cursor(
+        self, items: Sequence[ModelType], limit: int, sort_key: Optional[str] = None
+    ) -> Optional[str]:
+        """Opaque token for the page after ``items``, or None on the last page.
+
+        A full page may be followed by an empty one; clients stop when no
+        cursor comes back. Pass the ``sort_key`` the page was listed by when
+        it is not the model's default.
+        """
+        if not items or len(items) < limit:
+            return None
+        sort_key = sort_key or self.sort_key
+        last = items[-1]
+        payload = {
+            "k": sort_key,
+            "v": jsonable_encoder(getattr(last, sort_key)),
+            "id": last.id
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def _paginate(
+        self,
+        query: Query,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort_key: Optional[str] = None,
+        descending: bool = False,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Any]:
+        """Apply a stable order and either keyset or offset pagination.
+
+        With a cursor the page starts right after the (sort_key, id) it
+        encodes, which an index on those columns answers without reading
+        the skipped rows. ``skip`` is kept for existing clients. The sort
+        column must not be NULL for listed rows. With ``columns`` the page
+        comes back as rows of just those columns, and no objects are loaded.
+        """
+        sort_key = sort_key or self.sort_key
+        column = getattr(self.model, sort_key)
+        keys = [self.model.id] if sort_key == "id" else [column, self.model.id]
+
+        if cursor is not None:
+            value, last_id = self._decode_cursor(cursor, sort_key)
+            position = [last_id] if sort_key == "id" else [value, last_id]
+            if descending:
+                query = query.filter(tuple_(*keys) < tuple_(*position))
+            else:
+                query = query.filter(tuple_(*keys) > tuple_(*position))
+        elif skip:
+            query = query.offset(skip)
+        order = [key.desc() for key in keys] if descending else keys
+        query = query.order_by(*order).limit(limit)
+        if columns is not None:
+            return self._rows(query, columns)
+        return query.all()
+
+    def _rows(self, query: Query, columns: Sequence[str]) -> List[Row]:
+        """``query``'s results as rows of the named columns only"""
+        if not columns:
+            raise ValueError(f"No {self.model.__name__} columns to list")
+        return query.with_entities(*(getattr(self.model, name) for name in columns)).all()
+
+    def _decode_cursor(self, cursor: str, sort_key: str) -> Tuple[Any, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            if payload["k"] != sort_key:
+                raise InvalidCursorError("Pagination cursor belongs to a different listing")
+            value, last_id = payload["v"], int(payload["id"])
+        except InvalidCursorError:
+            raise
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise InvalidCursorError()
+
+        python_type = getattr(self.model, sort_key).type.python_type
+        try:
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise InvalidCursorError()
+        return value, last_id
+
+    def _create_values(
+        self,
+        db: Session,
+        obj_in: Union[CreateSchemaType, Dict[str, Any]],
+        db_obj: Optional[ModelType] = None
+    ) -> Dict[str, Any]:
+        """Column values for inserting ``obj_in`` in a bulk statement"""
+        data = obj_in.dict() if isinstance(obj_in, BaseModel) else dict(obj_in)
+        return self._prices_to_minor(db, data, db_obj)
+
+    def _update_rows(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        """UPDATE rows by id, each dict holding the id and its new values"""
+        db.execute(update(self.model), rows)
+
+    def _assign_ids(self, db: Session, count: int) -> Optional[List[int]]:
+        """Ids for ``count`` rows about to be bulk inserted, for tables that
+        cannot generate them; None lets the database assign them"""
+        return None
+
+    @staticmethod
+    def _group_by_fields(rows: List[Dict[str, Any]]) -> Dict[frozenset, List[int]]:
+        """Positions of rows sharing a field set; a multi-row VALUES needs one shape"""
+        groups: Dict[frozenset, List[int]] = {}
+        for i, row in enumerate(rows):
+            groups.setdefault(frozenset(row), []).append(i)
+        return groups
+
+    def _price_columns(self, data: Dict[str, Any]) -> List[str]:
+        return [
+            column.name for column in self.model.__table__.columns
+            if isinstance(column.type, MinorUnitPrice) and data.get(column.name) is not None
+        ]
+
+    def _prices_to_minor(
+        self, db: Session, data: Dict[str, Any], db_obj: Optional[ModelType] = None
+    ) -> Dict[str, Any]:
+        """Scale major-unit input prices to the model's minor-unit columns"""
+        prices = self._price_columns(data)
+        if not prices:
+            return data
+        currency = self._currency(db, data, db_obj)
+        return {**data, **{name: to_minor(data[name], currency) for name in prices}}
+
+    def _currency(
+        self, db: Session, data: Dict[str, Any], db_obj: Optional[ModelType] = None
+    ) -> Optional[str]:
+        """Currency that input prices for this model are expressed in"""
+        return data.get("currency") or getattr(db_obj, "currency", None)
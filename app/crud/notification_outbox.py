@@ -0,0 +1,192 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.db.models.notification_outbox import NotificationOutbox
+from app.schemas.notification import NotificationJobCreate, NotificationJobUpdate
+
+class CRUDNotificationOutbox(
+    CRUDBase[NotificationOutbox, NotificationJobCreate, NotificationJobUpdate]
+):
+    def enqueue(
+        self,
+        db: Session,
+        *,
+        user_id: int,
+        channel: str,
+        recipient: str,
+        payload: Dict[str, Any],
+        urgent: bool = False,
+        window_seconds: float = 0
+    ) -> NotificationOutbox:
+        """Record a notification job in the caller's transaction (no commit).
+
+        Non-urgent jobs join the user's open digest window for the channel,
+        so every alert collected inside the window becomes due together.
+        """
+        now = datetime.utcnow()
+        available_at = now
+        if not urgent and window_seconds:
+            open_window = db.execute(
+                select(func.min(NotificationOutbox.available_at)).where(
+                    NotificationOutbox.user_id == user_id,
+                    NotificationOutbox.channel == channel,
+                    NotificationOutbox.status == "pending",
+                    NotificationOutbox.urgent == False,
+                    NotificationOutbox.available_at > now
+                )
+            ).scalar()
+            available_at = open_window or now + timedelta(seconds=window_seconds)
+
+        job = NotificationOutbox(
+            user_id=user_id,
+            channel=channel,
+            recipient=recipient,
+            payload=payload,
+            urgent=urgent,
+            available_at=available_at
+        )
+        db.add(job)
+        return job
+
+    def claim_batch(
+        self, db: Session, *, limit: int = 500, lease_seconds: int = 120
+    ) -> List[NotificationOutbox]:
+        """Lease up to ``limit`` due jobs for this worker and commit the lease.
+
+        On Postgres the candidate rows are locked with FOR UPDATE SKIP LOCKED
+        so concurrent drainers never block on or double-claim each other.
+        SQLite ignores the locking clause; its single-writer lock makes the
+        UPDATE ... WHERE id IN (SELECT ...) atomic on its own. Jobs whose
+        lease expired (worker crashed mid-send) become claimable again.
+        """
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        claimable = or_(
+            and_(
+                NotificationOutbox.status == "pending",
+                NotificationOutbox.available_at <= now
+            ),
+            and_(
+                NotificationOutbox.status == "leased",
+                NotificationOutbox.leased_until < now
+            )
+        )
+        candidates = (
+            select(NotificationOutbox.id)
+            .where(claimable)
+            .order_by(NotificationOutbox.available_at, NotificationOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(candidates.scalar_subquery()))
+            .values(
+                status="leased",
+                lease_token=token,
+                leased_until=now + timedelta(seconds=lease_seconds),
+                attempts=NotificationOutbox.attempts + 1
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return (
+            db.query(NotificationOutbox)
+            .filter(NotificationOutbox.lease_token == token)
+            .order_by(NotificationOutbox.id)
+            .all()
+        )
+
+    def mark_delivered(
+        self, db: Session, *, ids: Sequence[int], lease_token: str
+    ) -> int:
+        """Mark leased jobs delivered; jobs re-leased by another worker are skipped"""
+        if not ids:
+            return 0
+        result = db.execute(
+            update(NotificationOutbox)
+            .where(
+                NotificationOutbox.id.in_(ids),
+                NotificationOutbox.lease_token == lease_token
+            )
+            .values(
+                status="delivered",
+                delivered_at=datetime.utcnow(),
+                leased_until=None,
+                last_error=None
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount
+
+    def mark_failed(
+        self,
+        db: Session,
+        *,
+        ids: Sequence[int],
+        lease_token: str,
+        error: str,
+        max_attempts: int = 5,
+        retry_in: Optional[timedelta] = None
+    ) -> None:
+        """Return jobs to the queue with backoff, or park them after max_attempts"""
+        if not ids:
+            return
+        now = datetime.utcnow()
+        owned = and_(
+            NotificationOutbox.id.in_(ids),
+            NotificationOutbox.lease_token == lease_token
+        )
+        db.execute(
+            update(NotificationOutbox)
+            .where(owned, NotificationOutbox.attempts >= max_attempts)
+            .values(status="failed", leased_until=None, last_error=error)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(NotificationOutbox)
+            .where(owned, NotificationOutbox.attempts < max_attempts)
+            .values(
+                status="pending",
+                leased_until=None,
+                last_error=error,
+                available_at=now + (retry_in or timedelta(minutes=1))
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def release(
+        self,
+        db: Session,
+        *,
+        ids: Sequence[int],
+        lease_token: str,
+        retry_in: timedelta
+    ) -> None:
+        """Hand deferred jobs back without spending an attempt (provider backpressure)"""
+        if not ids:
+            return
+        db.execute(
+            update(NotificationOutbox)
+            .where(
+                NotificationOutbox.id.in_(ids),
+                NotificationOutbox.lease_token == lease_token
+            )
+            .values(
+                status="pending",
+                leased_until=None,
+                attempts=NotificationOutbox.attempts - 1,
+                available_at=datetime.utcnow() + retry_in
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+outbox_crud = CRUDNotificationOutbox(NotificationOutbox)
@@ -0,0 +1,343 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import bindparam, delete, func, insert, select, true, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.db.partitioning import allocate_sqlite_ids, uses_sqlite_view
+from app.db.models.price_history import PriceHistory
+from app.db.models.product import Product
+from app.schemas.price_history import PriceHistoryCreate, PriceHistoryUpdate
+
+# Observations that differ in any of these start a new run
+RUN_KEY = ("price", "currency", "availability", "in_stock")
+
+def expand_runs(
+    runs: Iterable[Tuple[datetime, float, Optional[datetime], int]]
+) -> List[Tuple[datetime, float]]:
+    """Turn (date, price, last_seen, observation_count) runs into points.
+
+    A run's observations are spread evenly between its first and last
+    sighting, which matches the scheduled checks that produced them.
+    """
+    points = []
+    for start, price, last_seen, count in runs:
+        count = count or 1
+        if count == 1 or last_seen is None:
+            points.append((start, price))
+            continue
+        step = (last_seen - start) / (count - 1)
+        points.extend((start + step * i, price) for i in range(count))
+    return points
+
+class CRUDPriceHistory(CRUDBase[PriceHistory, PriceHistoryCreate, PriceHistoryUpdate]):
+    # Writes go through Core statements: the partitioned SQLite view reports
+    # no affected rows, which the ORM's flush takes for a stale object
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: PriceHistory,
+        obj_in: Union[PriceHistoryUpdate, Dict[str, Any]]
+    ) -> PriceHistory:
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+        update_data = self._prices_to_minor(db, update_data, db_obj)
+        columns = PriceHistory.__table__.columns
+        values = {name: value for name, value in update_data.items() if name in columns}
+        current = (PriceHistory.id == db_obj.id, PriceHistory.date == db_obj.date)
+        if uses_sqlite_view(db.connection()) and values.get("date", db_obj.date) != db_obj.date:
+            # The view's UPDATE trigger keeps a row in its month's table;
+            # re-insert it so the INSERT trigger routes it to the new month
+            row = {column.name: getattr(db_obj, column.name) for column in columns}
+            db.execute(
+                delete(PriceHistory).where(*current)
+                .execution_options(synchronize_session=False)
+            )
+            db.execute(insert(PriceHistory).values({**row, **values}))
+        elif values:
+            # Postgres moves rows between partitions on its own
+            db.execute(
+                update(PriceHistory).where(*current).values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def remove(self, db: Session, *, id: int) -> Optional[PriceHistory]:
+        obj = db.get(PriceHistory, id)
+        if obj is not None:
+            db.expunge(obj)
+        db.execute(
+            delete(PriceHistory).where(PriceHistory.id == id)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return obj
+
+    def upsert_many(self, db: Session, **kwargs) -> List[int]:
+        if uses_sqlite_view(db.connection()):
+            # ON CONFLICT needs a unique index, which a UNION ALL view has none of
+            raise ValueError("upsert_many is not supported on partitioned SQLite price history")
+        return super().upsert_many(db, **kwargs)
+
+    def _update_rows(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        if uses_sqlite_view(db.connection()) and any("date" in row for row in rows):
+            raise ValueError("Use update() to change the date of partitioned SQLite price history")
+        table = PriceHistory.__table__
+        for fields, positions in self._group_by_fields(rows).items():
+            db.execute(
+                table.update()
+                .where(table.c.id == bindparam("row_id"))
+                .values({name: bindparam(name) for name in fields if name != "id"}),
+                [
+                    {**{n: v for n, v in rows[i].items() if n != "id"}, "row_id": rows[i]["id"]}
+                    for i in positions
+                ]
+            )
+
+    def _assign_ids(self, db: Session, count: int) -> Optional[List[int]]:
+        return allocate_sqlite_ids(db.connection(), count)
+
+    def get_range(
+        self,
+        db: Session,
+        *,
+        product_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        latest: bool = False,
+        expand: bool = False
+    ) -> List[Row]:
+        """Get (date, price) rows for a product in ascending date order.
+
+        Only the columns covered by ix_price_history_product_id_date are
+        selected, so Postgres can answer with an index-only scan. ``start`` is
+        inclusive and ``end`` exclusive. With ``latest`` the ``limit`` most
+        recent rows are returned instead of the oldest.
+
+        Rows are runs when change-only storage is on, one per price change.
+        Pass ``expand`` to get one point per observation instead, including
+        the part of a run that started before ``start``; ``limit`` then
+        counts runs, not points.
+        """
+        if expand:
+            query = select(
+                PriceHistory.date,
+                PriceHistory.price,
+                PriceHistory.last_seen,
+                PriceHistory.observation_count
+            )
+        else:
+            query = select(PriceHistory.date, PriceHistory.price)
+        query = query.where(PriceHistory.product_id == product_id)
+        if start is not None:
+            query = query.where(PriceHistory.date >= start)
+        if end is not None:
+            query = query.where(PriceHistory.date < end)
+
+        query = query.order_by(
+            PriceHistory.date.desc() if latest else PriceHistory.date
+        )
+        if limit is not None:
+            query = query.limit(limit)
+
+        rows = db.execute(query).all()
+        if latest:
+            rows = rows[::-1]
+        if not expand:
+            return rows
+
+        if start is not None:
+            # The run in effect at ``start`` began before it
+            previous = db.execute(
+                select(
+                    PriceHistory.date,
+                    PriceHistory.price,
+                    PriceHistory.last_seen,
+                    PriceHistory.observation_count
+                )
+                .where(PriceHistory.product_id == product_id, PriceHistory.date < start)
+                .order_by(PriceHistory.date.desc())
+                .limit(1)
+            ).first()
+            if previous is not None and (previous.last_seen or previous.date) >= start:
+                rows.insert(0, previous)
+        return [
+            point for point in expand_runs(rows)
+            if (start is None or point[0] >= start) and (end is None or point[0] < end)
+        ]
+
+    def get_latest(self, db: Session, *, product_id: int) -> Optional[PriceHistory]:
+        """Get the most recent row for a product"""
+        return (
+            db.query(PriceHistory)
+            .filter(PriceHistory.product_id == product_id)
+            .order_by(PriceHistory.date.desc())
+            .first()
+        )
+
+    def get_latest_for_products(
+        self, db: Session, *, product_ids: Sequence[int], limit: int
+    ) -> Dict[int, List[Row]]:
+        """The ``limit`` most recent (date, price, currency) rows of each
+        product, oldest first, in one query.
+
+        Postgres reads each product's rows with a LATERAL top-N over
+        ix_price_history_product_id_date; other databases rank every row of
+        the listed products with a window function.
+        """
+        points: Dict[int, List[Row]] = {product_id: [] for product_id in product_ids}
+        if not product_ids or limit <= 0:
+            return points
+
+        if db.get_bind().dialect.name == "postgresql":
+            products = select(Product.id).where(Product.id.in_(product_ids)).subquery()
+            latest = (
+                select(PriceHistory.date, PriceHistory.price, PriceHistory.currency)
+                .where(PriceHistory.product_id == products.c.id)
+                .order_by(PriceHistory.date.desc())
+                .limit(limit)
+                .lateral()
+            )
+            query = (
+                select(
+                    products.c.id.label("product_id"),
+                    latest.c.date,
+                    latest.c.price,
+                    latest.c.currency
+                )
+                .join_from(products, latest, true())
+            )
+        else:
+            latest = (
+                select(
+                    PriceHistory.product_id,
+                    PriceHistory.date,
+                    PriceHistory.price,
+                    PriceHistory.currency,
+                    func.row_number().over(
+                        partition_by=PriceHistory.product_id,
+                        order_by=PriceHistory.date.desc()
+                    ).label("recency")
+                )
+                .where(PriceHistory.product_id.in_(product_ids))
+                .subquery()
+            )
+            query = (
+                select(latest.c.product_id, latest.c.date, latest.c.price, latest.c.currency)
+                .where(latest.c.recency <= limit)
+            )
+
+        for row in db.execute(query.order_by(latest.c.date)):
+            points[row.product_id].append(row)
+        return points
+
+    def record(
+        self,
+        db: Session,
+        *,
+        product_id: int,
+        price: float,
+        observed_at: datetime,
+        change_only: bool = False,
+        **fields
+    ) -> Optional[PriceHistory]:
+        """Store an observation (no commit).
+
+        With ``change_only`` an observation matching the product's latest
+        row extends that row's run (last_seen, observation_count) and None
+        is returned; otherwise a new row is added and returned.
+        """
+        observation = PriceHistory(
+            product_id=product_id, price=price, date=observed_at, **fields
+        )
+        if change_only:
+            previous = self.get_latest(db, product_id=product_id)
+            if (
+                previous is not None
+                and previous.date <= observed_at
+                and self._run_key(previous) == self._run_key(observation)
+            ):
+                self._extend_run(
+                    db, previous, last_seen=observed_at,
+                    observation_count=PriceHistory.observation_count + 1
+                )
+                return None
+        db.add(observation)
+        return observation
+
+    def compact(self, db: Session, *, product_id: int, chunk_size: int = 1000) -> int:
+        """Merge consecutive identical observations into runs (no commit).
+
+        Returns the number of rows removed.
+        """
+        rows = db.execute(
+            select(
+                PriceHistory.id,
+                PriceHistory.date,
+                PriceHistory.last_seen,
+                PriceHistory.observation_count,
+                *(PriceHistory.__table__.c[column] for column in RUN_KEY)
+            )
+            .where(PriceHistory.product_id == product_id)
+            .order_by(PriceHistory.date, PriceHistory.id)
+        ).all()
+
+        runs: List[list] = []  # [head row, last_seen, observation_count]
+        redundant: List[int] = []
+        for row in rows:
+            if runs and self._run_key(runs[-1][0]) == self._run_key(row):
+                runs[-1][1] = row.last_seen or row.date
+                runs[-1][2] += row.observation_count or 1
+                redundant.append(row.id)
+            else:
+                runs.append([row, row.last_seen, row.observation_count or 1])
+
+        for head, last_seen, count in runs:
+            if count != (head.observation_count or 1):
+                self._extend_run(db, head, last_seen=last_seen, observation_count=count)
+        for start in range(0, len(redundant), chunk_size):
+            db.execute(
+                delete(PriceHistory)
+                .where(PriceHistory.id.in_(redundant[start:start + chunk_size]))
+                .execution_options(synchronize_session=False)
+            )
+        return len(redundant)
+
+    @staticmethod
+    def _run_key(row) -> Tuple:
+        """Values that must match for observations to share a run, with
+        unset columns read as their insert defaults"""
+        table = PriceHistory.__table__
+        return tuple(
+            table.c[column].default.arg if getattr(row, column) is None
+            else getattr(row, column)
+            for column in RUN_KEY
+        )
+
+    def _extend_run(self, db: Session, head, **values) -> None:
+        # Core UPDATE works through the SQLite partition view, and the date
+        # predicate prunes Postgres partitions
+        db.execute(
+            update(PriceHistory)
+            .where(PriceHistory.id == head.id, PriceHistory.date == head.date)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def get_latest_for_products_async(
+        self, db: AsyncSession, *, product_ids: Sequence[int], limit: int
+    ) -> Dict[int, List[Row]]:
+        """The ``limit`` most recent rows of each product, oldest first"""
+        return await self._run_async(
+            db, self.get_latest_for_products, load_relationships=False,
+            product_ids=product_ids, limit=limit
+        )
+
+price_history_crud = CRUDPriceHistory(PriceHistory)
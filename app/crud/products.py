@@ -1,27 +1,59 @@
-from typing import List, Optional
+import re
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
 
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import (
+    Float, Integer, and_, cast, column, func, literal_column, or_, select, table, update
+)
 
+from app.config import settings
 from app.crud.base import CRUDBase
-from app.db.models.product import Product
+from app.db.models.price_rollup import PriceRollupDaily
+from app.db.models.product import SEARCH_CONFIG, Product
 from app.schemas.product import ProductCreate, ProductUpdate
 
+_SEARCH_TERM = re.compile(r"\w+")
+_PRODUCTS_FTS = table("products_fts", column("rowid"))
+
 class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
+    upsert_key = ("url",)
+    response_relationships = ("user", "price_history")
+    # Price checks set last_checked in the same commit that appends history,
+    # edits bump updated_at, and refresh_price_drops rewrites reference_price
+    version_columns = ("id", "updated_at", "last_checked", "reference_price")
+
+    def create_with_owner(
+        self, db: Session, *, obj_in: ProductCreate, user_id: int
+    ) -> Product:
+        """Create a new product for a user"""
+        obj_in_data = self._prices_to_minor(db, jsonable_encoder(obj_in))
+        db_obj = Product(**obj_in_data, user_id=user_id)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
     def get_by_url(self, db: Session, url: str) -> Optional[Product]:
         """Get product by URL"""
         return db.query(Product).filter(Product.url == url).first()
 
     def get_multi_by_owner(
-        self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
     ) -> List[Product]:
         """Get multiple products owned by a user"""
-        return (
-            db.query(Product)
-            .filter(Product.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return self._paginate(
+            db.query(Product).filter(Product.user_id == user_id),
+            skip=skip, limit=limit, cursor=cursor, columns=columns
         )
 
     def get_active_products(self, db: Session) -> List[Product]:
@@ -31,7 +63,48 @@ class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
     def search(
         self, db: Session, *, query: str, skip: int = 0, limit: int = 100
     ) -> List[Product]:
-        """Search products by name or description"""
+        """Search products by name or description, best matches first.
+
+        Every word in ``query`` matches as a prefix, so partial input
+        ("wirel head") finds results while the user types. Uses the
+        full-text index (tsvector on Postgres, FTS5 on SQLite); name matches
+        rank above description matches. Results are ranked, so pages are
+        taken with ``skip`` rather than a cursor.
+        """
+        terms = [term.lower() for term in _SEARCH_TERM.findall(query)]
+        if not terms:
+            return []
+        dialect = db.get_bind().dialect.name
+
+        if dialect == "postgresql":
+            tsquery = func.to_tsquery(
+                literal_column(f"'{SEARCH_CONFIG}'::regconfig"),
+                " & ".join(f"{term}:*" for term in terms)
+            )
+            search_vector = literal_column("products.search_vector")
+            return (
+                db.query(Product)
+                .filter(search_vector.bool_op("@@")(tsquery))
+                .order_by(func.ts_rank_cd(search_vector, tsquery).desc(), Product.id)
+                .offset(skip)
+                .limit(limit)
+                .all()
+            )
+
+        if dialect == "sqlite":
+            # Quoted terms are plain strings to FTS5, never query syntax
+            match = " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+            return (
+                db.query(Product)
+                .join(_PRODUCTS_FTS, _PRODUCTS_FTS.c.rowid == Product.id)
+                .filter(literal_column("products_fts").op("MATCH")(match))
+                # bm25 weights per column: name, description (lower is better)
+                .order_by(literal_column("bm25(products_fts, 10.0, 1.0)"), Product.id)
+                .offset(skip)
+                .limit(limit)
+                .all()
+            )
+
         search = f"%{query}%"
         return (
             db.query(Product)
@@ -41,17 +114,177 @@ class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
                     Product.description.ilike(search)
                 )
             )
+            .order_by(Product.id)
             .offset(skip)
             .limit(limit)
             .all()
         )
 
     def get_price_drops(
-        self, db: Session, *, threshold: float = 0.1, days: int = 7
+        self,
+        db: Session,
+        *,
+        threshold: float = 0.1,
+        days: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Product]:
+        """Get active products priced at least ``threshold`` below their
+        reference price, biggest drop first.
+
+        The reference is the mean daily close over the trailing
+        PRICE_DROP_WINDOW_DAYS, precomputed by refresh_price_drops, so the
+        feed is a range scan of ix_products_price_drop_pct_id and pages with
+        ``cursor`` (see next_cursor with sort_key="price_drop_pct"). Any
+        other ``days`` computes references on the fly and pages with ``skip``.
+        """
+        if days is not None and days != settings.PRICE_DROP_WINDOW_DAYS:
+            references = self._reference_prices(days)
+            drop = (references.c.reference - Product.current_price) / references.c.reference
+            query = (
+                db.query(Product)
+                .join(references, references.c.product_id == Product.id)
+                .filter(Product.is_active == True, drop >= threshold)
+                .order_by(drop.desc(), Product.id.desc())
+                .offset(skip)
+                .limit(limit)
+            )
+            return self._rows(query, columns) if columns is not None else query.all()
+
+        return self._paginate(
+            db.query(Product).filter(
+                Product.is_active == True,
+                Product.price_drop_pct >= threshold
+            ),
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            sort_key="price_drop_pct",
+            descending=True,
+            columns=columns
+        )
+
+    def refresh_price_drops(self, db: Session, *, days: Optional[int] = None) -> int:
+        """Recompute reference prices and drops for every product (no commit).
+
+        One set-based UPDATE from the daily rollups; products without
+        history in the window lose their reference. Returns the number of
+        products with a reference.
+        """
+        references = self._reference_prices(days or settings.PRICE_DROP_WINDOW_DAYS)
+        result = db.execute(
+            update(Product)
+            .where(Product.id == references.c.product_id)
+            .values(
+                reference_price=cast(func.round(references.c.reference), Integer),
+                price_drop_pct=(
+                    (references.c.reference - Product.current_price) / references.c.reference
+                ),
+                # Derived columns; keep onupdate from marking every product edited
+                updated_at=Product.updated_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(Product)
+            .where(
+                Product.reference_price.isnot(None),
+                Product.id.notin_(select(references.c.product_id))
+            )
+            .values(reference_price=None, price_drop_pct=None, updated_at=Product.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    @staticmethod
+    def _reference_prices(days: int):
+        """(product_id, reference) with each product's mean daily close over
+        the ``days`` before its latest day"""
+        window_start = datetime.utcnow().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        ) - timedelta(days=days)
+        daily = PriceRollupDaily
+        windowed = (
+            select(
+                daily.product_id,
+                func.avg(cast(daily.close_price, Float)).over(
+                    partition_by=daily.product_id,
+                    order_by=daily.period_start,
+                    rows=(None, -1)
+                ).label("reference"),
+                func.row_number().over(
+                    partition_by=daily.product_id,
+                    order_by=daily.period_start.desc()
+                ).label("recency")
+            )
+            .where(daily.period_start >= window_start)
+            .subquery()
+        )
+        return (
+            select(windowed.c.product_id, windowed.c.reference)
+            .where(windowed.c.recency == 1, windowed.c.reference > 0)
+            .subquery()
+        )
+
+    async def get_by_url_async(self, db: AsyncSession, url: str) -> Optional[Product]:
+        """Get product by URL"""
+        return await self._run_async(db, self.get_by_url, url=url)
+
+    async def get_multi_by_owner_async(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
     ) -> List[Product]:
-        """Get products with significant price drops"""
-        # This would be more complex in a real implementation
-        # Joining with price_history table and comparing recent prices
-        return db.query(Product).limit(10).all()
+        """Get multiple products owned by a user"""
+        return await self._run_async(
+            db, self.get_multi_by_owner, load_relationships=columns is None,
+            user_id=user_id, skip=skip, limit=limit, cursor=cursor,
+            columns=columns
+        )
+
+    async def create_with_owner_async(
+        self, db: AsyncSession, *, obj_in: ProductCreate, user_id: int
+    ) -> Product:
+        """Create a new product for a user"""
+        return await self._run_async(
+            db, self.create_with_owner, obj_in=obj_in, user_id=user_id
+        )
+
+    async def search_async(
+        self, db: AsyncSession, *, query: str, skip: int = 0, limit: int = 100
+    ) -> List[Product]:
+        """Search products by name or description, best matches first"""
+        return await self._run_async(db, self.search, query=query, skip=skip, limit=limit)
+
+    async def get_price_drops_async(
+        self,
+        db: AsyncSession,
+        *,
+        threshold: float = 0.1,
+        days: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Product]:
+        """Get products furthest below their reference price (no relationships loaded)"""
+        return await self._run_async(
+            db, self.get_price_drops, load_relationships=False,
+            threshold=threshold, days=days, skip=skip, limit=limit, cursor=cursor,
+            columns=columns
+        )
+
+def price_drop_pct(reference_price: Optional[int], current_price: Optional[int]) -> Optional[float]:
+    """Fraction ``current_price`` is below ``reference_price`` (negative when above)"""
+    if not reference_price or current_price is None:
+        return None
+    return (reference_price - current_price) / reference_price
 
 product_crud = CRUDProduct(Product)
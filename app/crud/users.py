@@ -1,14 +1,20 @@
-from typing import Optional
+import hashlib
+from typing import Any, Dict, Optional, Union
 
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import delete, func, select
 
-from app.core.security import get_password_hash, verify_password
+from app.core.hashing import password_hasher
 from app.crud.base import CRUDBase
 from app.db.models.user import User
+from app.db.models.user_avatar import UserAvatar
 from app.schemas.user import UserCreate, UserUpdate
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+    upsert_key = ("email",)
+
     def get_by_email(self, db: Session, email: str) -> Optional[User]:
         """Get user by email"""
         return db.query(User).filter(User.email == email).first()
@@ -18,12 +24,25 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         create_data = obj_in.dict()
         create_data.pop("password")
         db_obj = User(**create_data)
-        db_obj.hashed_password = get_password_hash(obj_in.password)
+        db_obj.hashed_password = password_hasher.hash(obj_in.password)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def _create_values(
+        self,
+        db: Session,
+        obj_in: Union[UserCreate, Dict[str, Any]],
+        db_obj: Optional[User] = None
+    ) -> Dict[str, Any]:
+        """Bulk insert values with the password hashed"""
+        create_data = super()._create_values(db, obj_in, db_obj)
+        password = create_data.pop("password", None)
+        if password:
+            create_data["hashed_password"] = password_hasher.hash(password)
+        return create_data
+
     def update(
         self, db: Session, *, db_obj: User, obj_in: UserUpdate
     ) -> User:
@@ -34,7 +53,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             update_data = obj_in.dict(exclude_unset=True)
 
         if update_data.get("password"):
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = password_hasher.hash(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
 
@@ -43,14 +62,121 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     def authenticate(
         self, db: Session, *, email: str, password: str
     ) -> Optional[User]:
-        """Authenticate user with email and password"""
+        """Authenticate user with email and password.
+
+        A stored hash below the current bcrypt policy is replaced with the
+        one computed alongside the successful verify.
+        """
         user = self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = password_hasher.verify_and_update(password, user.hashed_password)
+        if not valid:
+            return None
+        if new_hash:
+            user.hashed_password = new_hash
+            db.commit()
+        return user
+
+    async def get_by_email_async(self, db: AsyncSession, email: str) -> Optional[User]:
+        """Get user by email"""
+        return await self._run_async(db, self.get_by_email, email=email)
+
+    async def authenticate_async(
+        self, db: AsyncSession, *, email: str, password: str
+    ) -> Optional[User]:
+        """Authenticate user with email and password.
+
+        The hash is checked in the hashing pool while the event loop serves
+        other requests.
+        """
+        user = await self.get_by_email_async(db, email=email)
+        if not user:
+            return None
+        valid, new_hash = await password_hasher.verify_and_update_async(
+            password, user.hashed_password
+        )
+        if not valid:
             return None
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
         return user
 
+    def remove(self, db: Session, *, id: int) -> User:
+        """Remove user and their avatar (SQLite does not cascade by default)"""
+        db.execute(delete(UserAvatar).where(UserAvatar.user_id == id))
+        return super().remove(db, id=id)
+
+    def get_avatar(self, db: Session, *, user_id: int) -> Optional[Row]:
+        """(content_type, size, etag, updated_at) of a user's avatar, without the image"""
+        return db.execute(
+            select(
+                UserAvatar.content_type,
+                UserAvatar.size,
+                UserAvatar.etag,
+                UserAvatar.updated_at
+            ).where(UserAvatar.user_id == user_id)
+        ).first()
+
+    def read_avatar_chunk(
+        self, db: Session, *, user_id: int, etag: str, offset: int, size: int
+    ) -> Optional[bytes]:
+        """``size`` bytes of the avatar from ``offset``; None if it was replaced"""
+        return db.execute(
+            select(func.substr(UserAvatar.image, offset + 1, size))
+            .where(UserAvatar.user_id == user_id, UserAvatar.etag == etag)
+        ).scalar()
+
+    def set_avatar(
+        self, db: Session, *, user_id: int, image: bytes, content_type: str
+    ) -> UserAvatar:
+        """Store or replace a user's avatar"""
+        avatar = db.get(UserAvatar, user_id) or UserAvatar(user_id=user_id)
+        avatar.image = image
+        avatar.content_type = content_type
+        avatar.size = len(image)
+        avatar.etag = hashlib.sha256(image).hexdigest()
+        db.add(avatar)
+        db.commit()
+        return avatar
+
+    def remove_avatar(self, db: Session, *, user_id: int) -> bool:
+        """Delete a user's avatar; False if they had none"""
+        result = db.execute(delete(UserAvatar).where(UserAvatar.user_id == user_id))
+        db.commit()
+        return result.rowcount > 0
+
+    async def get_avatar_async(self, db: AsyncSession, *, user_id: int) -> Optional[Row]:
+        """Avatar metadata without the image"""
+        return await self._run_async(
+            db, self.get_avatar, load_relationships=False, user_id=user_id
+        )
+
+    async def read_avatar_chunk_async(
+        self, db: AsyncSession, *, user_id: int, etag: str, offset: int, size: int
+    ) -> Optional[bytes]:
+        """A chunk of the avatar; None if it was replaced"""
+        return await self._run_async(
+            db, self.read_avatar_chunk, load_relationships=False,
+            user_id=user_id, etag=etag, offset=offset, size=size
+        )
+
+    async def set_avatar_async(
+        self, db: AsyncSession, *, user_id: int, image: bytes, content_type: str
+    ) -> UserAvatar:
+        """Store or replace a user's avatar"""
+        return await self._run_async(
+            db, self.set_avatar, load_relationships=False,
+            user_id=user_id, image=image, content_type=content_type
+        )
+
+    async def remove_avatar_async(self, db: AsyncSession, *, user_id: int) -> bool:
+        """Delete a user's avatar; False if they had none"""
+        return await self._run_async(
+            db, self.remove_avatar, load_relationships=False, user_id=user_id
+        )
+
     def is_active(self, user: User) -> bool:
         """Check if user is active"""
         return user.is_active
@@ -0,0 +1,238 @@
+"""Query counts, a slow-query log and connection pool metrics.
+
+Every engine in app/db/session.py is hooked with ``instrument_engine``.
+Statements are attributed to the scopes opened with ``track_queries`` (the
+API middleware opens one per request, Celery signals one per task); scopes
+nest and live in a ContextVar, so concurrent requests never share counts.
+
+Statements slower than SLOW_QUERY_MS are grouped by fingerprint, the SQL
+with literals and parameters replaced by ``?`` and IN lists collapsed, so
+one N+1 loop shows up as one entry with a high count rather than hundreds
+of distinct lines.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config import settings
+from app.core.logging import logger
+
+@dataclass
+class QueryStats:
+    """Statements run inside a ``track_queries`` scope"""
+    count: int = 0
+    seconds: float = 0.0
+    capture: bool = False
+    statements: List[str] = field(default_factory=list)
+
+    @property
+    def milliseconds(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+_scopes: ContextVar[Tuple[QueryStats, ...]] = ContextVar("query_scopes", default=())
+
+def start_scope(capture: bool = False) -> Tuple[QueryStats, Token]:
+    """Open a scope; pass the token to ``end_scope`` to close it"""
+    stats = QueryStats(capture=capture)
+    return stats, _scopes.set(_scopes.get() + (stats,))
+
+def end_scope(token: Token) -> None:
+    _scopes.reset(token)
+
+@contextmanager
+def track_queries(capture: bool = False) -> Iterator[QueryStats]:
+    """Count the statements run inside the block (and keep them with ``capture``)"""
+    stats, token = start_scope(capture)
+    try:
+        yield stats
+    finally:
+        end_scope(token)
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """Fail if the block runs more than ``limit`` statements.
+
+    Meant for tests guarding endpoints and CRUD methods against N+1s::
+
+        with assert_max_queries(3):
+            client.get("/api/v1/products/")
+    """
+    with track_queries(capture=True) as stats:
+        yield stats
+    if stats.count > limit:
+        raise AssertionError(
+            f"{stats.count} queries run, expected at most {limit}:\n"
+            + "\n".join(f"  {statement}" for statement in stats.statements)
+        )
+
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+def fingerprint(statement: str) -> str:
+    """Normalize SQL so statements differing only in values compare equal"""
+    for pattern, replacement in _LITERALS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+class SlowQueryLog:
+    """Slow statements grouped by fingerprint, least recently seen evicted first"""
+
+    def __init__(self, maxsize: int = 200):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float, engine: str) -> None:
+        key = fingerprint(statement)
+        with self._lock:
+            entry = self._entries.pop(key, None) or {
+                'fingerprint': key, 'engine': engine, 'count': 0,
+                'total_ms': 0.0, 'max_ms': 0.0
+            }
+            entry['count'] += 1
+            entry['total_ms'] = round(entry['total_ms'] + seconds * 1000, 2)
+            entry['max_ms'] = max(entry['max_ms'], round(seconds * 1000, 2))
+            self._entries[key] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def snapshot(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """The fingerprints with the most total time first"""
+        with self._lock:
+            entries = [dict(entry) for entry in self._entries.values()]
+        return sorted(entries, key=lambda e: e['total_ms'], reverse=True)[:limit]
+
+slow_queries = SlowQueryLog()
+
+class PoolMetrics:
+    """Checkout wait samples and saturation for one engine's pool"""
+
+    def __init__(self, window: int = 1024):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.peak_in_use = 0
+        self._waits: Deque[float] = deque(maxlen=window)
+        self.pool: Optional[QueuePool] = None
+
+    def observe(self, pool: QueuePool, wait: float, ok: bool) -> None:
+        self.pool = pool
+        if ok:
+            self.checkouts += 1
+            self._waits.append(wait)
+            self.peak_in_use = max(self.peak_in_use, pool.checkedout())
+        else:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Pool occupancy and checkout wait percentiles in milliseconds"""
+        samples = sorted(self._waits)
+
+        def percentile(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            index = min(len(samples) - 1, int(p * len(samples)))
+            return round(samples[index] * 1000, 2)
+
+        pool = self.pool
+        capacity = pool.size() + max(pool.max_overflow, 0) if pool is not None else 0
+        in_use = pool.checkedout() if pool is not None else 0
+        return {
+            'checkouts': self.checkouts,
+            'timeouts': self.timeouts,
+            'in_use': in_use,
+            'capacity': capacity,
+            'saturation': round(in_use / capacity, 3) if capacity else None,
+            'peak_saturation': round(self.peak_in_use / capacity, 3) if capacity else None,
+            'wait_p50_ms': percentile(0.50),
+            'wait_p95_ms': percentile(0.95),
+            'wait_p99_ms': percentile(0.99),
+        }
+
+_pool_metrics: Dict[str, PoolMetrics] = {}
+
+class _TimedCheckout:
+    """Pool mixin timing ``connect()``, which blocks while the pool is exhausted.
+
+    Metrics are keyed by the engine's ``pool_logging_name`` so they survive
+    the pool being recreated by ``engine.dispose()``.
+    """
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        self.max_overflow = max_overflow
+
+    def connect(self):
+        metrics = _pool_metrics.setdefault(self.logging_name or "default", PoolMetrics())
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            metrics.observe(self, time.perf_counter() - started, ok=False)
+            raise
+        metrics.observe(self, time.perf_counter() - started, ok=True)
+        return connection
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Count and time every statement the engine runs"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        for stats in _scopes.get():
+            stats.count += 1
+            stats.seconds += elapsed
+            if stats.capture:
+                stats.statements.append(statement)
+        if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+            slow_queries.record(statement, elapsed, name)
+            logger.warning(
+                f"Slow query on {name} ({elapsed * 1000:.1f} ms): {fingerprint(statement)}"
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
+
+def log_scope(label: str, stats: QueryStats) -> None:
+    """Log a finished request's or task's query totals"""
+    if stats.count > settings.QUERY_COUNT_WARN:
+        logger.warning(
+            f"{label} ran {stats.count} queries ({stats.milliseconds} ms), "
+            "possible N+1"
+        )
+    else:
+        logger.debug(f"{label} ran {stats.count} queries ({stats.milliseconds} ms)")
+
+def db_metrics() -> Dict[str, Any]:
+    """Pool metrics per engine and the slowest query fingerprints"""
+    return {
+        'pools': {name: metrics.snapshot() for name, metrics in _pool_metrics.items()},
+        'slow_queries': slow_queries.snapshot(),
+    }
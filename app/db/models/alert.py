@@ -0,0 +1,49 @@
+from datetime import datetime
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Float,
+    DateTime,
+    ForeignKey,
+    Boolean,
+    Index
+)
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+from app.db.types import MinorUnitPrice
+
+class Alert(Base):
+    __tablename__ = "alerts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    target_price = Column(MinorUnitPrice, nullable=False)  # product currency minor units
+    notification_type = Column(String(10), default="email")  # email, sms, push
+    active = Column(Boolean(), default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Trigger state: an armed alert notifies once when the price reaches the
+    # target, then stays disarmed until the price climbs back above target
+    # or drops a further rearm_drop_pct below the last notified price
+    armed = Column(Boolean(), default=True, nullable=False)
+    last_notified_price = Column(MinorUnitPrice, nullable=True)
+    last_notified_at = Column(DateTime, nullable=True)
+    rearm_drop_pct = Column(Float, nullable=True)
+
+    # Relationships
+    user_id = Column(Integer, ForeignKey("users.id"))
+    user = relationship("User", back_populates="alerts")
+    product_id = Column(Integer, ForeignKey("products.id"))
+    product = relationship("Product")
+
+    __table_args__ = (
+        # Lets the evaluator pick armed alerts for a product straight from the index
+        Index("ix_alerts_product_id_active_armed", "product_id", "active", "armed"),
+        # Keyset pages of a user's alerts (see CRUDBase._paginate)
+        Index("ix_alerts_user_id_id", "user_id", "id"),
+    )
+
+    def __repr__(self):
+        return f"<Alert(id={self.id}, product_id={self.product_id}, target={self.target_price})>"
@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON, Index
+
+from app.db.base_class import Base
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)
+    channel = Column(String(10), nullable=False)  # email, sms, push
+    recipient = Column(String(255), nullable=False)
+    payload = Column(JSON, nullable=False)
+    urgent = Column(Boolean, default=False)
+    status = Column(String(10), default="pending", nullable=False)  # pending, leased, delivered, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    lease_token = Column(String(32), nullable=True)
+    leased_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    delivered_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Drain workers scan due rows in available_at order
+        Index("ix_notification_outbox_status_available_at", "status", "available_at"),
+        # Enqueue looks up the open digest window for a user/channel
+        Index("ix_notification_outbox_user_channel_status", "user_id", "channel", "status"),
+        Index("ix_notification_outbox_lease_token", "lease_token"),
+    )
+
+    def __repr__(self):
+        return f"<NotificationOutbox(id={self.id}, channel={self.channel}, status={self.status})>"
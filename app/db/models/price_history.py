@@ -1,23 +1,39 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, String, Boolean
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Boolean, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
+from app.db.types import MinorUnitPrice
 
 class PriceHistory(Base):
     __tablename__ = "price_history"
 
     id = Column(Integer, primary_key=True, index=True)
-    price = Column(Float, nullable=False)
+    price = Column(MinorUnitPrice, nullable=False)  # minor units of currency
     date = Column(DateTime, default=datetime.utcnow, index=True)
     currency = Column(String(3), default="USD")
     availability = Column(Boolean, default=True)
     in_stock = Column(Boolean, default=True)
     source = Column(String(50), nullable=True)  # website, api, etc.
+    # Change-only storage: repeat sightings of the same price extend the row
+    last_seen = Column(DateTime, nullable=True)
+    observation_count = Column(Integer, default=1, nullable=False)
 
     # Relationships
     product_id = Column(Integer, ForeignKey("products.id"))
     product = relationship("Product", back_populates="price_history")
 
+    __table_args__ = (
+        # Per-product range reads; INCLUDE makes (date, price) reads index-only on Postgres
+        Index(
+            "ix_price_history_product_id_date",
+            "product_id",
+            "date",
+            postgresql_include=["price"]
+        ),
+    )
+    # Deletes through the partitioned SQLite view report no matched rows
+    __mapper_args__ = {"confirm_deleted_rows": False}
+
     def __repr__(self):
         return f"<PriceHistory(id={self.id}, price={self.price}, date={self.date})>"
\ No newline at end of file
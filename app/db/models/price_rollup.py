@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, BigInteger, Float, DateTime, ForeignKey
+from sqlalchemy.orm import declared_attr
+
+from app.db.base_class import Base
+from app.db.types import MinorUnitPrice
+
+class PriceRollupMixin:
+    """Open/high/low/close summary of one product's prices over a period.
+
+    opened_at/closed_at record which observation set open and close, so late
+    or out-of-order writes still merge correctly. price_sum and
+    price_sum_sq let mean and volatility be derived across periods.
+    """
+    @declared_attr
+    def product_id(cls):
+        return Column(Integer, ForeignKey("products.id"), primary_key=True)
+
+    period_start = Column(DateTime, primary_key=True)
+    open_price = Column(MinorUnitPrice, nullable=False)
+    high_price = Column(MinorUnitPrice, nullable=False)
+    low_price = Column(MinorUnitPrice, nullable=False)
+    close_price = Column(MinorUnitPrice, nullable=False)
+    mean_price = Column(Float, nullable=False)  # minor units, fractional
+    sample_count = Column(Integer, nullable=False)
+    price_sum = Column(BigInteger, nullable=False)
+    price_sum_sq = Column(Float, nullable=False)
+    opened_at = Column(DateTime, nullable=False)
+    closed_at = Column(DateTime, nullable=False)
+
+class PriceRollupDaily(PriceRollupMixin, Base):
+    __tablename__ = "price_rollup_daily"
+
+    def __repr__(self):
+        return f"<PriceRollupDaily(product_id={self.product_id}, day={self.period_start})>"
+
+class PriceRollupWeekly(PriceRollupMixin, Base):
+    """Weeks start on Monday"""
+    __tablename__ = "price_rollup_weekly"
+
+    def __repr__(self):
+        return f"<PriceRollupWeekly(product_id={self.product_id}, week={self.period_start})>"
@@ -3,15 +3,19 @@ from sqlalchemy import (
     Column, 
     Integer, 
     String, 
-    Float, 
     DateTime, 
     ForeignKey,
     Boolean,
-    Text
+    Float,
+    Text,
+    Index,
+    DDL,
+    event
 )
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
+from app.db.types import MinorUnitPrice
 
 class Product(Base):
     __tablename__ = "products"
@@ -21,10 +25,15 @@ class Product(Base):
     description = Column(Text, nullable=True)
     url = Column(String(512), unique=True, nullable=False)
     image_url = Column(String(512), nullable=True)
-    current_price = Column(Float, nullable=True)
-    original_price = Column(Float, nullable=True)
-    target_price = Column(Float, nullable=False)
+    # Prices are integers in the currency's minor unit (see app.utils.money)
+    current_price = Column(MinorUnitPrice, nullable=True)
+    original_price = Column(MinorUnitPrice, nullable=True)
+    target_price = Column(MinorUnitPrice, nullable=False)
     currency = Column(String(3), default="USD")
+    # Deals feed: mean daily close over PRICE_DROP_WINDOW_DAYS and how far
+    # current_price is below it (refreshed by CRUDProduct.refresh_price_drops)
+    reference_price = Column(MinorUnitPrice, nullable=True)
+    price_drop_pct = Column(Float, nullable=True)
     is_active = Column(Boolean(), default=True)
     last_checked = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -35,5 +44,50 @@ class Product(Base):
     user = relationship("User", back_populates="products")
     price_history = relationship("PriceHistory", back_populates="product")
 
+    __table_args__ = (
+        # Keyset pages of a user's products (see CRUDBase._paginate)
+        Index("ix_products_user_id_id", "user_id", "id"),
+        # Deals feed pages, biggest drop first
+        Index("ix_products_price_drop_pct_id", "price_drop_pct", "id"),
+    )
+
     def __repr__(self):
-        return f"<Product(id={self.id}, name={self.name[:20]}...)>"
\ No newline at end of file
+        return f"<Product(id={self.id}, name={self.name[:20]}...)>"
+
+# Full-text search index, kept in sync by the database on every write.
+# Postgres: a generated tsvector column (name weighted above description)
+# with a GIN index. SQLite: an external-content FTS5 table maintained by
+# triggers, so product text is not stored twice. Existing databases get the
+# same objects from migrations/007_product_search.sql.
+SEARCH_CONFIG = "simple"  # no stemming, so prefixes match what users type
+
+for statement in (
+    "ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX ix_products_search_vector ON products USING GIN (search_vector)",
+):
+    event.listen(
+        Product.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql")
+    )
+
+for statement in (
+    "CREATE VIRTUAL TABLE products_fts USING fts5("
+    "name, description, content='products', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts (rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts (products_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER products_fts_update AFTER UPDATE OF name, description ON products BEGIN "
+    "INSERT INTO products_fts (products_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO products_fts (rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+):
+    event.listen(
+        Product.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
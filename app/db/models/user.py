@@ -4,8 +4,7 @@ from sqlalchemy import (
     Integer, 
     String, 
     Boolean, 
-    DateTime,
-    LargeBinary
+    DateTime
 )
 from sqlalchemy.orm import relationship
 
@@ -26,7 +25,7 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
-    profile_image = Column(LargeBinary, nullable=True)
+    # The profile image lives in user_avatars (app/db/models/user_avatar.py)
 
     # Relationships
     products = relationship("Product", back_populates="user")
@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, ForeignKey
+from sqlalchemy.orm import deferred
+
+from app.db.base_class import Base
+
+class UserAvatar(Base):
+    """A user's profile image, kept out of the users table so loading a
+    User (on every authenticated request) never reads image bytes"""
+    __tablename__ = "user_avatars"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    content_type = Column(String(50), nullable=False)
+    size = Column(Integer, nullable=False)
+    etag = Column(String(64), nullable=False)  # sha256 of the image, hex
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Served in chunks by CRUDUser.read_avatar_chunk; never loaded with the row
+    image = deferred(Column(LargeBinary, nullable=False))
+
+    def __repr__(self):
+        return f"<UserAvatar(user_id={self.user_id}, size={self.size})>"
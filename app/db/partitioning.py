@@ -0,0 +1,243 @@
+"""Monthly range partitioning of price_history.
+
+Postgres uses native declarative partitioning: price_history is a table
+PARTITION BY RANGE (date) (see migrations/002_partition_price_history.sql)
+with one child per month, so queries with a date bound are pruned to the
+matching months and retention is a DROP TABLE per month.
+
+SQLite has no partitioning, so each month lives in its own table and
+price_history becomes a UNION ALL view over them. INSTEAD OF triggers route
+writes to the right month; ids come from a shared price_history_ids table
+because SQLite cannot report the rowid of a row inserted through a view.
+"""
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import Index, MetaData, Table, event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.config import settings
+from app.core.logging import logger
+from app.db.models.price_history import PriceHistory
+
+PARENT = PriceHistory.__tablename__
+PREFIX = f"{PARENT}_p"
+LEGACY = f"{PARENT}_legacy"
+ID_TABLE = f"{PARENT}_ids"
+
+_NAME = re.compile(rf"^{PREFIX}(\d{{4}})_(\d{{2}})$")
+_PG_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+@dataclass
+class Partition:
+    name: str
+    start: Optional[datetime]  # None for the unbounded legacy partition
+    end: datetime
+
+def month_start(when: datetime, offset: int = 0) -> datetime:
+    """First instant of the month ``offset`` months after ``when``"""
+    index = when.year * 12 + when.month - 1 + offset
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def partition_name(start: datetime) -> str:
+    return f"{PREFIX}{start.year:04d}_{start.month:02d}"
+
+class PriceHistoryPartitions:
+    """Creates price_history partitions ahead of time and drops expired ones"""
+
+    def __init__(
+        self,
+        engine: Engine,
+        *,
+        premake: int = settings.PRICE_HISTORY_PARTITION_PREMAKE,
+        retention_months: int = settings.PRICE_HISTORY_RETENTION_MONTHS
+    ):
+        self.engine = engine
+        self.premake = premake
+        self.retention_months = retention_months
+        self.postgres = engine.dialect.name == "postgresql"
+
+    def partitions(self, conn: Connection) -> List[Partition]:
+        """Existing partitions ordered by start date"""
+        if self.postgres:
+            rows = conn.execute(text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:parent AS regclass)"
+            ), {"parent": PARENT}).all()
+            found = []
+            for name, bound in rows:
+                match = _PG_BOUND.search(bound or "")
+                if not match:
+                    continue  # a DEFAULT partition has no range
+                lower, upper = (value.strip("'") for value in match.groups())
+                found.append(Partition(
+                    name,
+                    None if lower == "MINVALUE" else datetime.fromisoformat(lower),
+                    datetime.fromisoformat(upper)
+                ))
+            return sorted(found, key=lambda p: p.start or datetime.min)
+
+        found = []
+        for name in inspect(conn).get_table_names():
+            match = _NAME.match(name)
+            if match:
+                start = datetime(int(match.group(1)), int(match.group(2)), 1)
+                found.append(Partition(name, start, month_start(start, 1)))
+        found.sort(key=lambda p: p.start)
+        if inspect(conn).has_table(LEGACY):
+            # The pre-partitioning table holds everything before the first month
+            end = found[0].start if found else month_start(datetime.utcnow())
+            found.insert(0, Partition(LEGACY, None, end))
+        return found
+
+    def ensure(self, now: Optional[datetime] = None) -> List[str]:
+        """Create partitions from the current month through ``premake`` months ahead"""
+        now = now or datetime.utcnow()
+        with self.engine.begin() as conn:
+            # A missing view means partitions gained columns (see migrations/004)
+            rebuild = not self.postgres and (
+                self._adopt_sqlite_table(conn)
+                or PARENT not in inspect(conn).get_view_names()
+            )
+            existing = {p.name for p in self.partitions(conn)}
+            created = []
+            for offset in range(self.premake + 1):
+                start = month_start(now, offset)
+                name = partition_name(start)
+                if name in existing:
+                    continue
+                if self.postgres:
+                    conn.execute(text(
+                        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{PARENT}" '
+                        f"FOR VALUES FROM ('{start.isoformat()}') "
+                        f"TO ('{month_start(start, 1).isoformat()}')"
+                    ))
+                else:
+                    self._create_sqlite_partition(conn, name)
+                created.append(name)
+            if (created or rebuild) and not self.postgres:
+                self._rebuild_sqlite_view(conn)
+        for name in created:
+            logger.info(f"Created price history partition {name}")
+        return created
+
+    def drop_expired(self, now: Optional[datetime] = None) -> List[str]:
+        """Drop partitions that end before the retention cutoff"""
+        if self.retention_months <= 0:
+            return []
+        cutoff = month_start(now or datetime.utcnow(), -self.retention_months)
+        with self.engine.begin() as conn:
+            expired = [p.name for p in self.partitions(conn) if p.end <= cutoff]
+            for name in expired:
+                if self.postgres:
+                    # Detaching first keeps the parent's lock short
+                    conn.execute(text(f'ALTER TABLE "{PARENT}" DETACH PARTITION "{name}"'))
+                conn.execute(text(f'DROP TABLE "{name}"'))
+            if expired and not self.postgres:
+                self._rebuild_sqlite_view(conn)
+        for name in expired:
+            logger.info(f"Dropped expired price history partition {name}")
+        return expired
+
+    def _adopt_sqlite_table(self, conn: Connection) -> bool:
+        """Turn an existing plain price_history table into the legacy partition"""
+        conn.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{ID_TABLE}" (id INTEGER PRIMARY KEY AUTOINCREMENT)'
+        ))
+        # Only the sequence matters, allocated ids need not be kept
+        conn.execute(text(f'DELETE FROM "{ID_TABLE}"'))
+        if PARENT not in inspect(conn).get_table_names():
+            return False
+        conn.execute(text(f'ALTER TABLE "{PARENT}" RENAME TO "{LEGACY}"'))
+        # Continue ids after the legacy rows; AUTOINCREMENT never reuses them
+        conn.execute(text(
+            f'INSERT INTO "{ID_TABLE}" (id) SELECT MAX(id) FROM "{LEGACY}" WHERE id IS NOT NULL'
+        ))
+        conn.execute(text(f'DELETE FROM "{ID_TABLE}"'))
+        return True
+
+    def _create_sqlite_partition(self, conn: Connection, name: str) -> None:
+        source = PriceHistory.__table__
+        table = Table(name, MetaData(), *(column._copy() for column in source.columns))
+        Index(f"ix_{name}_product_id_date", table.c.product_id, table.c.date)
+        table.create(conn)
+
+    def _rebuild_sqlite_view(self, conn: Connection) -> None:
+        """Recreate the UNION ALL view and its routing triggers"""
+        columns = [column.name for column in PriceHistory.__table__.columns]
+        column_list = ", ".join(f'"{c}"' for c in columns)
+        new_values = ", ".join(f'NEW."{c}"' for c in columns)
+        assignments = ", ".join(f'"{c}" = NEW."{c}"' for c in columns if c != "id")
+        parts = self.partitions(conn)
+
+        conn.execute(text(f'DROP VIEW IF EXISTS "{PARENT}"'))
+        if not parts:
+            return
+        conn.execute(text(
+            f'CREATE VIEW "{PARENT}" AS '
+            + " UNION ALL ".join(f'SELECT {column_list} FROM "{p.name}"' for p in parts)
+        ))
+
+        def in_range(p: Partition) -> str:
+            # SQLAlchemy stores SQLite datetimes as sortable ISO strings
+            upper = f"NEW.date < '{p.end:%Y-%m-%d %H:%M:%S}'"
+            if p.start is None:
+                return upper
+            return f"NEW.date >= '{p.start:%Y-%m-%d %H:%M:%S}' AND {upper}"
+
+        for p in parts:
+            conn.execute(text(
+                f'CREATE TRIGGER "{p.name}_insert" INSTEAD OF INSERT ON "{PARENT}" '
+                f"WHEN {in_range(p)} BEGIN "
+                f'INSERT INTO "{p.name}" ({column_list}) VALUES ({new_values}); END'
+            ))
+        covered = " OR ".join(f"({in_range(p)})" for p in parts)
+        conn.execute(text(
+            f'CREATE TRIGGER "{PARENT}_insert_unrouted" INSTEAD OF INSERT ON "{PARENT}" '
+            f"WHEN NEW.date IS NULL OR NOT ({covered}) BEGIN "
+            f"SELECT RAISE(ABORT, 'no {PARENT} partition for this date'); END"
+        ))
+        conn.execute(text(
+            f'CREATE TRIGGER "{PARENT}_update" INSTEAD OF UPDATE ON "{PARENT}" BEGIN '
+            + " ".join(
+                f'UPDATE "{p.name}" SET {assignments} WHERE id = OLD.id;' for p in parts
+            )
+            + " END"
+        ))
+        conn.execute(text(
+            f'CREATE TRIGGER "{PARENT}_delete" INSTEAD OF DELETE ON "{PARENT}" BEGIN '
+            + " ".join(f'DELETE FROM "{p.name}" WHERE id = OLD.id;' for p in parts)
+            + " END"
+        ))
+
+def _assign_sqlite_id(mapper, connection: Connection, target: PriceHistory) -> None:
+    if target.id is None:
+        target.id = _next_sqlite_id(connection)
+
+def _next_sqlite_id(connection: Connection) -> int:
+    return connection.execute(text(f'INSERT INTO "{ID_TABLE}" (id) VALUES (NULL)')).lastrowid
+
+def uses_sqlite_view(connection: Connection) -> bool:
+    """Whether price_history is the partitioned SQLite view on this connection"""
+    return connection.dialect.name == "sqlite" and event.contains(
+        PriceHistory, "before_insert", _assign_sqlite_id
+    )
+
+def allocate_sqlite_ids(connection: Connection, count: int) -> Optional[List[int]]:
+    """Ids for rows bulk inserted through the SQLite view, which skip the
+    before_insert hook; None when price_history is not that view"""
+    if not uses_sqlite_view(connection):
+        return None
+    return [_next_sqlite_id(connection) for _ in range(count)]
+
+def configure_partitioning(engine: Engine) -> None:
+    """Hook ORM inserts into the SQLite partition scheme when it is enabled"""
+    if not settings.PRICE_HISTORY_PARTITIONING:
+        return
+    if engine.dialect.name == "sqlite" and not event.contains(
+        PriceHistory, "before_insert", _assign_sqlite_id
+    ):
+        event.listen(PriceHistory, "before_insert", _assign_sqlite_id)
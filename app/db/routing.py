@@ -0,0 +1,182 @@
+"""Read/write routing between the primary database and its read replicas.
+
+Sessions made by the read session factories in app/db/session.py send
+plain SELECTs to a replica, chosen once per transaction so its reads see
+one server's data over one connection, and everything else (flushes, Core DML,
+SELECT ... FOR UPDATE) to the primary. Once a session has written it stays
+on the primary so it reads its own uncommitted rows.
+
+Read-your-writes across requests: a user whose request committed a write
+reads from the primary for REPLICA_STICKY_SECONDS afterwards. The user is
+taken from ``current_principal``, which the auth dependency sets. The
+sticky set is kept per process; a request served by another worker can
+still read from a replica, at most REPLICA_MAX_LAG_SECONDS behind.
+
+Replica lag is measured at most every REPLICA_LAG_CHECK_SECONDS per
+replica. Replicas that are further behind than REPLICA_MAX_LAG_SECONDS or
+cannot be reached are skipped, and reads fall back to the primary when
+none are usable.
+"""
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Hashable, List, Optional
+
+from cachetools import TTLCache
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.config import settings
+from app.core.logging import logger
+
+# Who the current request acts for; set by app.core.security.get_current_user
+current_principal: ContextVar[Optional[Hashable]] = ContextVar(
+    "current_principal", default=None
+)
+
+# Zero while the replica is streaming and has replayed everything it
+# received, otherwise the age of the last replayed transaction. A replica
+# whose WAL receiver is down has replayed all it received too, so it is
+# only counted current while streaming. NULL on a server that is not a standby.
+_PG_LAG = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN NULL "
+    "WHEN EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') "
+    "AND pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+@dataclass
+class Replica:
+    engine: Engine
+    lag: Optional[float] = None  # None until measured or when unreachable
+    checked_at: float = float("-inf")
+
+class ReplicaRouter:
+    """Picks the engine reads go to, skipping replicas that lag too far"""
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: List[Engine],
+        *,
+        max_lag_seconds: float = settings.REPLICA_MAX_LAG_SECONDS,
+        lag_check_seconds: float = settings.REPLICA_LAG_CHECK_SECONDS
+    ):
+        self.primary = primary
+        self.replicas = [Replica(engine) for engine in replicas]
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_seconds = lag_check_seconds
+        self._turn = itertools.count()
+
+    def reader(self, principal: Optional[Hashable] = None) -> Engine:
+        """Engine for a read on behalf of ``principal``"""
+        if not self.replicas or wrote_recently(principal):
+            return self.primary
+        start = next(self._turn)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self.healthy(replica):
+                return replica.engine
+        return self.primary
+
+    def healthy(self, replica: Replica) -> bool:
+        if time.monotonic() - replica.checked_at >= self.lag_check_seconds:
+            self.check(replica)
+        return replica.lag is not None and replica.lag <= self.max_lag_seconds
+
+    def check(self, replica: Replica) -> Optional[float]:
+        """Measure a replica's lag in seconds (None when it is unusable)"""
+        replica.checked_at = time.monotonic()
+        try:
+            with replica.engine.connect() as conn:
+                if replica.engine.dialect.name == "postgresql":
+                    lag = conn.execute(_PG_LAG).scalar()
+                    lag = None if lag is None else max(float(lag), 0.0)
+                else:
+                    # No replication to measure; reachable counts as current
+                    conn.execute(text("SELECT 1"))
+                    lag = 0.0
+        except Exception as e:
+            logger.warning(f"Replica {replica.engine.url!r} unavailable: {str(e)}")
+            lag = None
+        was_usable = replica.lag is not None and replica.lag <= self.max_lag_seconds
+        if was_usable and (lag is None or lag > self.max_lag_seconds):
+            logger.warning(f"Replica {replica.engine.url!r} is {lag}s behind, skipping it")
+        replica.lag = lag
+        return lag
+
+# Principals that committed a write in the last REPLICA_STICKY_SECONDS
+_recent_writers = TTLCache(maxsize=100_000, ttl=max(settings.REPLICA_STICKY_SECONDS, 0.001))
+_writers_lock = threading.Lock()
+
+def mark_write(principal: Optional[Hashable]) -> None:
+    """Send ``principal``'s reads to the primary for the sticky window"""
+    if principal is not None and settings.REPLICA_STICKY_SECONDS > 0:
+        with _writers_lock:
+            _recent_writers[principal] = True
+
+def wrote_recently(principal: Optional[Hashable]) -> bool:
+    if principal is None:
+        return False
+    with _writers_lock:
+        return principal in _recent_writers
+
+class RoutingSession(Session):
+    """Session that reads from replicas when given a router.
+
+    Without a router every statement uses the session's own bind, as with a
+    plain Session, but its commits still make the principal sticky.
+    """
+
+    def __init__(self, *args, router: Optional[ReplicaRouter] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.router = router
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.router is None or self._writes(clause):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        # Cleared when the transaction ends
+        if "reader" not in self.info:
+            self.info["reader"] = self.router.reader(current_principal.get())
+        return self.info["reader"]
+
+    def _writes(self, clause: Any) -> bool:
+        if self._flushing or self.info.get("primary"):
+            return True
+        if isinstance(clause, UpdateBase):
+            return True
+        return getattr(clause, "_for_update_arg", None) is not None
+
+def _wrote(session: Session) -> None:
+    # "primary" keeps the rest of the session on the primary, "wrote" lasts
+    # until the transaction ends
+    session.info["primary"] = True
+    session.info["wrote"] = True
+
+@event.listens_for(RoutingSession, "after_flush")
+def _flushed(session: Session, flush_context) -> None:
+    _wrote(session)
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _executed(state) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        _wrote(state.session)
+
+@event.listens_for(RoutingSession, "after_commit")
+def _committed(session: Session) -> None:
+    if session.info.pop("wrote", False):
+        mark_write(current_principal.get())
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _rolled_back(session: Session) -> None:
+    session.info.pop("wrote", None)
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _transaction_ended(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("reader", None)
@@ -1,27 +1,127 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 
 from app.config import settings
+from app.db.instrumentation import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    instrument_engine,
+)
+from app.db.partitioning import configure_partitioning
+from app.db.routing import ReplicaRouter, RoutingSession
 
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    pool_size=20,
-    max_overflow=100,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     pool_recycle=3600,
+    poolclass=InstrumentedQueuePool,
+    pool_logging_name="primary",
     connect_args={"connect_timeout": 5}
 )
 
+instrument_engine(engine, "primary")
+configure_partitioning(engine)
+
 SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    expire_on_commit=False
+)
+
+# Read-only work (list endpoints, dashboards, model training) reads from
+# replicas; see app/db/routing.py
+replica_engines = [
+    create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=3600,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name=f"replica-{index}",
+        connect_args={"connect_timeout": 5} if make_url(url).get_backend_name() == "postgresql" else {}
+    )
+    for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+]
+for index, replica in enumerate(replica_engines):
+    instrument_engine(replica, f"replica-{index}")
+
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    router=ReplicaRouter(engine, replica_engines),
     autocommit=False,
     autoflush=False,
     bind=engine,
     expire_on_commit=False
 )
 
+# Async engine for the FastAPI layer; Celery tasks keep the sync one above
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def async_database_url(url: str) -> URL:
+    """The same database through its asyncio driver"""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=3600,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_logging_name="async-primary",
+    connect_args={"timeout": 5} if engine.dialect.name == "postgresql" else {}
+)
+
+instrument_engine(async_engine.sync_engine, "async-primary")
+configure_partitioning(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+async_replica_engines = [
+    create_async_engine(
+        async_database_url(url),
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=3600,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_logging_name=f"async-replica-{index}",
+        connect_args={"timeout": 5} if make_url(url).get_backend_name() == "postgresql" else {}
+    )
+    for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+]
+for index, replica in enumerate(async_replica_engines):
+    instrument_engine(replica.sync_engine, f"async-replica-{index}")
+
+# The routing session runs inside AsyncSession, so it routes between the
+# sync facades of the async engines
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    sync_session_class=RoutingSession,
+    router=ReplicaRouter(
+        async_engine.sync_engine,
+        [replica.sync_engine for replica in async_replica_engines]
+    ),
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 def get_db() -> Generator[Session, None, None]:
@@ -30,4 +130,22 @@ def get_db() -> Generator[Session, None, None]:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db() -> Generator[Session, None, None]:
+    """Dependency for a session that reads from replicas"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for an async session that reads from replicas"""
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,28 @@
+from numbers import Integral
+
+from sqlalchemy import Float, Integer
+from sqlalchemy.types import TypeDecorator
+
+class MinorUnitPrice(TypeDecorator):
+    """Price stored as an integer count of the currency's minor unit.
+
+    Binds refuse floats so a major-unit value can never be written by
+    accident; convert with app.utils.money.to_minor first.
+    """
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, Integral) and not isinstance(value, bool):
+            return int(value)
+        raise TypeError(
+            f"MinorUnitPrice expects an int in minor units, got {type(value).__name__}"
+        )
+
+    def coerce_compared_value(self, op, value):
+        # Factors in expressions such as target_price * 1.02 stay floats
+        if isinstance(value, float):
+            return Float()
+        return self
@@ -7,6 +7,7 @@ from pydantic import ValidationError
 from app.core.config import settings
 from app.core.security import oauth2_scheme
 from app.core.logging import logger
+from app.core.principals import Principal, principal_cache
 from app.db.session import SessionLocal
 from app.schemas.user import TokenPayload
 from app.crud.user import user_crud
@@ -40,13 +41,17 @@ def get_current_user(
             detail="Could not validate credentials",
         )
     
-    user = user_crud.get(db, id=token_data.sub)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    return user
+    principal = principal_cache.get(token_data.sub, token_data.jti)
+    if principal is None:
+        user = user_crud.get(db, id=token_data.sub)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        principal = Principal.from_user(user)
+        principal_cache.put(token_data.sub, token_data.jti, principal)
+    return principal
 
 def get_scraper_factory() -> ScraperFactory:
     """Dependency for getting scraper factory"""
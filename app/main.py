@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.background import BackgroundTasks
@@ -8,6 +8,8 @@ from typing import List
 from app.api.v1.routers import api_router
 from config import Config, settings
 from api.core.logging import get_logger
+from app.core.hashing import password_hasher
+from app.db.instrumentation import db_metrics, log_scope, track_queries
 from app.db.session import SessionLocal
 
 # Initialize logger
@@ -15,7 +17,9 @@ logger = get_logger(__name__)
 from app.db.models import Product
 from app.schemas.product import ProductCreate, ProductOut
 from api.crud.products import product_crud
+from app.services.analytics.export import require_token_secret
 from app.services.scraper.factory import ScraperFactory
+from app.services.notifications.http_client import close_provider_clients, provider_metrics
 from tasks.price_checks import check_product_price
 from app.dependencies import get_db
 
@@ -36,8 +40,22 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            "X-Next-Cursor", "ETag", "X-Export-Token", "X-DB-Query-Count", "X-DB-Time-Ms"
+        ],
     )
 
+@app.middleware("http")
+async def count_db_queries(request: Request, call_next):
+    """Attribute the statements run while serving a request to it"""
+    with track_queries() as stats:
+        response = await call_next(request)
+    log_scope(f"{request.method} {request.url.path}", stats)
+    if settings.DB_DEBUG_HEADERS:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = str(stats.milliseconds)
+    return response
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -48,6 +66,8 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 async def startup_event():
     """Initialize application services on startup"""
     logger.info("Starting up Price Tracker...")
+    # Fail now rather than on the first export request
+    require_token_secret()
     # Initialize blockchain connection
     # Initialize AI models
     logger.info("Application startup complete")
@@ -56,12 +76,24 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup application services on shutdown"""
     logger.info("Shutting down Price Tracker...")
+    await close_provider_clients()
+    password_hasher.shutdown()
 
 @app.get("/health", tags=["health"])
 def health_check():
     """Endpoint for health checks"""
     return {"status": "healthy"}
 
+@app.get("/health/notifications", tags=["health"])
+def notification_health():
+    """Request counts and latency percentiles per notification provider"""
+    return provider_metrics()
+
+@app.get("/health/db", tags=["health"])
+def database_health():
+    """Connection pool saturation, checkout waits and the slowest queries"""
+    return db_metrics()
+
 @app.post("/products/", response_model=ProductOut, tags=["products"])
 def create_product(
     product: ProductCreate,
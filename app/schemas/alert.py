@@ -0,0 +1,45 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.money import MinorUnitGetterDict, Price
+
+class AlertBase(BaseModel):
+    product_id: int
+    target_price: Price = Field(..., example=79.99)
+    notification_type: str = Field("email", regex="^(email|sms|push)$", example="email")
+    active: bool = True
+    rearm_drop_pct: Optional[float] = Field(
+        None, gt=0, lt=1, example=0.05,
+        description="Notify again after a further drop of this fraction"
+    )
+
+class AlertCreate(AlertBase):
+    pass
+
+class AlertUpdate(AlertBase):
+    product_id: Optional[int] = None
+    target_price: Optional[Price] = None
+    notification_type: Optional[str] = Field(None, regex="^(email|sms|push)$")
+    active: Optional[bool] = None
+
+class AlertInDBBase(AlertBase):
+    id: int
+    user_id: int
+    armed: bool = True
+    last_notified_price: Optional[Decimal] = None
+    last_notified_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+        getter_dict = MinorUnitGetterDict
+
+class Alert(AlertInDBBase):
+    pass
+
+class AlertInDB(AlertInDBBase):
+    pass
@@ -0,0 +1,36 @@
+from typing import Any, Optional
+
+from pydantic import condecimal
+from pydantic.utils import GetterDict
+from sqlalchemy import Table
+
+from app.db.types import MinorUnitPrice
+from app.utils.money import to_major
+
+# API prices are exact major-unit decimals (79.99); the database keeps minor units
+Price = condecimal(gt=0)
+
+def _currency_of(obj: Any) -> Optional[str]:
+    currency = getattr(obj, "currency", None)
+    if currency is None and getattr(obj, "product", None) is not None:
+        currency = obj.product.currency
+    return currency
+
+class MinorUnitGetterDict(GetterDict):
+    """Reads ORM rows for response schemas, turning MinorUnitPrice columns
+    into major-unit Decimals in the row's (or its product's) currency"""
+    # Table of plain result rows (column-only selects), which carry no
+    # __table__ of their own; set by subclasses that read such rows
+    row_table: Optional[Table] = None
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        value = super().get(key, default)
+        if value is None or not isinstance(value, int):
+            return value
+        table = getattr(type(self._obj), "__table__", None)
+        if table is None:
+            table = self.row_table
+        column = table.c.get(key) if table is not None else None
+        if column is not None and isinstance(column.type, MinorUnitPrice):
+            return to_major(value, _currency_of(self._obj))
+        return value
@@ -0,0 +1,17 @@
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+class NotificationJobBase(BaseModel):
+    user_id: int
+    channel: str = Field("email", regex="^(email|sms|push)$")
+    recipient: str = Field(..., max_length=255)
+    payload: Dict[str, Any]
+    urgent: bool = False
+
+class NotificationJobCreate(NotificationJobBase):
+    pass
+
+class NotificationJobUpdate(BaseModel):
+    status: Optional[str] = None
+    last_error: Optional[str] = None
@@ -1,12 +1,14 @@
 from datetime import datetime
+from decimal import Decimal
 from typing import Optional
 
 from pydantic import BaseModel, Field
 
-from app.schemas.product import Product
+from app.db.models.price_history import PriceHistory as PriceHistoryModel
+from app.schemas.money import MinorUnitGetterDict, Price
 
 class PriceHistoryBase(BaseModel):
-    price: float = Field(..., gt=0, example=99.99)
+    price: Price = Field(..., example=99.99)
     currency: str = Field("USD", max_length=3, example="USD")
     availability: bool = True
     in_stock: bool = True
@@ -22,22 +24,38 @@ class PriceHistoryInDBBase(PriceHistoryBase):
     id: int
     date: datetime
     product_id: int
+    last_seen: Optional[datetime] = None
+    observation_count: int = 1
 
     class Config:
         orm_mode = True
+        getter_dict = MinorUnitGetterDict
 
 class PriceHistory(PriceHistoryInDBBase):
-    product: Product
+    # Resolved in app.schemas.product, which imports this module
+    product: "Product"
 
 class PriceHistoryInDB(PriceHistoryInDBBase):
     pass
 
+class PricePointGetterDict(MinorUnitGetterDict):
+    row_table = PriceHistoryModel.__table__
+
+class PricePoint(BaseModel):
+    """One history row as embedded in product list items"""
+    date: datetime
+    price: Decimal
+
+    class Config:
+        orm_mode = True
+        getter_dict = PricePointGetterDict
+
 class PriceTrendAnalysis(BaseModel):
     product_id: int
-    current_price: float
-    average_price: float
-    min_price: float
-    max_price: float
+    current_price: Decimal
+    average_price: Decimal
+    min_price: Decimal
+    max_price: Decimal
     price_change_7d: Optional[float] = None
     price_change_30d: Optional[float] = None
     last_updated: datetime
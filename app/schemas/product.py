@@ -1,9 +1,12 @@
 from datetime import datetime
+from decimal import Decimal
 from typing import Optional, List
 
 from pydantic import BaseModel, Field, HttpUrl, validator
 
-from app.schemas.price_history import PriceHistory
+from app.db.models.product import Product as ProductModel
+from app.schemas.money import MinorUnitGetterDict, Price
+from app.schemas.price_history import PriceHistory, PricePoint
 from app.schemas.user import User
 
 class ProductBase(BaseModel):
@@ -11,7 +14,7 @@ class ProductBase(BaseModel):
     description: Optional[str] = Field(None, example="Noise cancelling wireless headphones")
     url: HttpUrl = Field(..., example="https://example.com/product/123")
     image_url: Optional[HttpUrl] = Field(None, example="https://example.com/images/123.jpg")
-    target_price: float = Field(..., gt=0, example=99.99)
+    target_price: Price = Field(..., example=99.99)
     currency: str = Field("USD", max_length=3, example="USD")
 
 class ProductCreate(ProductBase):
@@ -22,12 +25,14 @@ class ProductUpdate(ProductBase):
     description: Optional[str] = None
     url: Optional[HttpUrl] = None
     image_url: Optional[HttpUrl] = None
-    target_price: Optional[float] = Field(None, gt=0)
+    target_price: Optional[Price] = None
     currency: Optional[str] = Field(None, max_length=3)
 
 class ProductInDBBase(ProductBase):
     id: int
-    current_price: Optional[float] = None
+    current_price: Optional[Decimal] = None
+    reference_price: Optional[Decimal] = None
+    price_drop_pct: Optional[float] = None
     is_active: bool = True
     created_at: datetime
     updated_at: datetime
@@ -36,6 +41,7 @@ class ProductInDBBase(ProductBase):
 
     class Config:
         orm_mode = True
+        getter_dict = MinorUnitGetterDict
 
 class Product(ProductInDBBase):
     price_history: List[PriceHistory] = []
@@ -44,9 +50,54 @@ class Product(ProductInDBBase):
 class ProductInDB(ProductInDBBase):
     pass
 
+PriceHistory.update_forward_refs(Product=Product)
+
+class ProductSummaryGetterDict(MinorUnitGetterDict):
+    row_table = ProductModel.__table__
+
+class ProductSummary(BaseModel):
+    """Product list item, read from a column-only select.
+
+    Lists return SUMMARY_FIELDS unless ``fields=`` names others (any of
+    SUMMARY_FIELDS and OPTIONAL_FIELDS, less OWNER_FIELDS on lists shared
+    between users); price_history is only present when
+    requested with ``history=N``. Unrequested fields are left out of the
+    response rather than sent as null.
+    """
+    id: int
+    name: Optional[str] = None
+    description: Optional[str] = None
+    url: Optional[str] = None
+    image_url: Optional[str] = None
+    current_price: Optional[Decimal] = None
+    original_price: Optional[Decimal] = None
+    target_price: Optional[Decimal] = None
+    currency: Optional[str] = None
+    reference_price: Optional[Decimal] = None
+    price_drop_pct: Optional[float] = None
+    is_active: Optional[bool] = None
+    last_checked: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    user_id: Optional[int] = None
+    price_history: Optional[List[PricePoint]] = None
+
+    class Config:
+        orm_mode = True
+        getter_dict = ProductSummaryGetterDict
+
+SUMMARY_FIELDS = (
+    "id", "name", "url", "image_url", "current_price", "original_price",
+    "target_price", "currency", "reference_price", "price_drop_pct",
+    "is_active", "last_checked", "updated_at"
+)
+OPTIONAL_FIELDS = ("description", "created_at", "user_id")
+# Only for the product's owner; never in lists shared between users
+OWNER_FIELDS = ("target_price", "user_id")
+
 class ProductPriceUpdate(BaseModel):
-    current_price: float = Field(..., gt=0)
-    original_price: Optional[float] = Field(None, gt=0)
+    current_price: Price
+    original_price: Optional[Price] = None
     currency: str = Field("USD", max_length=3)
     availability: bool = True
     in_stock: bool = True
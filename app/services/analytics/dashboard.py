@@ -2,26 +2,32 @@ import plotly.express as px
 import pandas as pd
 from typing import List, Dict
 
-from app.db.session import SessionLocal
+from app.db.models.product import Product
+from app.db.session import ReadSessionLocal
+from app.services.analytics.rollups import get_rollups
 from app.core.logging import logger
+from app.utils.money import to_major
 
 class DashboardGenerator:
     def __init__(self):
         pass
 
-    async def generate_price_history_chart(self, product_id: int) -> Dict:
-        """Generate price history chart for a product"""
+    async def generate_price_history_chart(
+        self, product_id: int, period: str = 'daily'
+    ) -> Dict:
+        """Generate price history chart for a product from its price rollups"""
         try:
-            db = SessionLocal()
-            history = db.execute(
-                "SELECT date, price FROM price_history WHERE product_id = :product_id ORDER BY date",
-                {'product_id': product_id}
-            ).fetchall()
+            db = ReadSessionLocal()
+            rollups = get_rollups(db, product_ids=[product_id], period=period)
 
-            if not history:
+            if not rollups:
                 return None
 
-            df = pd.DataFrame(history, columns=['date', 'price'])
+            currency = db.query(Product.currency).filter(Product.id == product_id).scalar()
+            df = pd.DataFrame(
+                [(r.period_start, float(to_major(r.close_price, currency))) for r in rollups],
+                columns=['date', 'price']
+            )
             fig = px.line(
                 df, 
                 x='date', 
@@ -38,27 +44,34 @@ class DashboardGenerator:
         finally:
             db.close()
 
-    async def generate_comparison_chart(self, product_ids: List[int]) -> Dict:
+    async def generate_comparison_chart(
+        self, product_ids: List[int], period: str = 'daily'
+    ) -> Dict:
         """Generate price comparison chart for multiple products"""
         try:
-            db = SessionLocal()
-            placeholders = ', '.join([':id_' + str(i) for i in range(len(product_ids))])
-            params = {'id_' + str(i): pid for i, pid in enumerate(product_ids)}
-            
-            query = f"""
-                SELECT ph.date, ph.price, p.name 
-                FROM price_history ph
-                JOIN products p ON ph.product_id = p.id
-                WHERE ph.product_id IN ({placeholders})
-                ORDER BY ph.date
-            """
-            
-            history = db.execute(query, params).fetchall()
+            db = ReadSessionLocal()
+            rollups = get_rollups(db, product_ids=product_ids, period=period)
             
-            if not history:
+            if not rollups:
                 return None
 
-            df = pd.DataFrame(history, columns=['date', 'price', 'name'])
+            products = {
+                row.id: row for row in
+                db.query(Product.id, Product.name, Product.currency)
+                .filter(Product.id.in_(product_ids))
+                .all()
+            }
+            df = pd.DataFrame(
+                [
+                    (
+                        r.period_start,
+                        float(to_major(r.close_price, products[r.product_id].currency)),
+                        products[r.product_id].name
+                    )
+                    for r in rollups
+                ],
+                columns=['date', 'price', 'name']
+            )
             fig = px.line(
                 df,
                 x='date',
@@ -74,4 +87,4 @@ class DashboardGenerator:
             logger.error(f"Failed to generate comparison chart: {str(e)}")
             return None
         finally:
-            db.close()
\ No newline at end of file
+            db.close()
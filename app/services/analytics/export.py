@@ -0,0 +1,340 @@
+"""Streaming bulk export of price history as NDJSON, CSV or Arrow IPC.
+
+BI pulls used to read whole tables with pd.read_sql, materializing them on
+both ends. Here rows are read through a server-side cursor (yield_per) and
+each fetched batch is encoded and handed on as it arrives, so memory stays
+at one batch of EXPORT_BATCH_ROWS however large the range.
+
+Rows come in (product_id, date, id) order, which
+ix_price_history_product_id_date serves. An export is described by a signed
+token (products, time range, format, owner scope) whose end is pinned to
+when it was issued, so observations recorded during a long pull do not
+shift its sequence. An interrupted pull resumes from the token and the id
+of the last row received:
+
+    GET /api/v1/export/price-history?product_id=42&start=2024-01-01&format=csv
+        (the token comes back in X-Export-Token)
+    GET /api/v1/export/price-history?token=...&after_id=123456
+
+or, against the database directly:
+
+    python -m app.services.analytics.export --product-id 42 --format arrow -o history.arrows
+
+A resumed CSV export omits the header row so the pieces concatenate; a
+resumed Arrow export is a complete IPC stream of its own.
+"""
+import argparse
+import base64
+import binascii
+import csv
+import hashlib
+import hmac
+import io
+import json
+import sys
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models.price_history import PriceHistory
+from app.db.models.product import Product
+from app.utils.exceptions import InvalidExportTokenError
+from app.utils.money import to_major
+
+# Exported columns, in output order
+COLUMNS = (
+    "id", "product_id", "date", "price", "currency", "availability",
+    "in_stock", "source", "last_seen", "observation_count"
+)
+
+# (product_id, date, id) of the last row a resumed export has already sent
+Position = Tuple[int, datetime, int]
+
+@dataclass(frozen=True)
+class ExportSpec:
+    format: str
+    product_ids: Optional[Tuple[int, ...]] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    # Only this user's products; None exports every product
+    user_id: Optional[int] = None
+    issued_at: Optional[datetime] = None
+
+def new_export(
+    *,
+    format: str = "ndjson",
+    product_ids: Optional[Sequence[int]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[int] = None
+) -> ExportSpec:
+    """An export of ``product_ids`` (all, by default) from ``start``
+    (inclusive) to ``end`` (exclusive, at most now)"""
+    if format not in ENCODERS:
+        raise ValueError(f"Unknown export format {format!r}")
+    now = datetime.utcnow()
+    return ExportSpec(
+        format=format,
+        product_ids=tuple(sorted(set(product_ids))) if product_ids else None,
+        start=start,
+        end=min(end, now) if end is not None else now,
+        user_id=user_id,
+        issued_at=now
+    )
+
+def encode_token(spec: ExportSpec) -> str:
+    payload = json.dumps(
+        asdict(spec), default=datetime.isoformat, separators=(",", ":")
+    ).encode()
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload))}"
+
+def decode_token(token: str) -> ExportSpec:
+    """The export a token describes; raises InvalidExportTokenError when it
+    was tampered with or is older than EXPORT_TOKEN_TTL_HOURS"""
+    try:
+        payload, signature = (_b64decode(part) for part in token.split("."))
+    except (ValueError, binascii.Error):
+        raise InvalidExportTokenError()
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise InvalidExportTokenError()
+
+    values = json.loads(payload)
+    for name in ("start", "end", "issued_at"):
+        if values.get(name):
+            values[name] = datetime.fromisoformat(values[name])
+    if values.get("product_ids") is not None:
+        values["product_ids"] = tuple(values["product_ids"])
+    spec = ExportSpec(**values)
+    if datetime.utcnow() - spec.issued_at > timedelta(hours=settings.EXPORT_TOKEN_TTL_HOURS):
+        raise InvalidExportTokenError("Export token has expired; start a new export")
+    return spec
+
+def export_query(spec: ExportSpec, after: Optional[Position] = None):
+    """SELECT of the rows of ``spec`` after ``after``, in export order"""
+    columns = [getattr(PriceHistory, name) for name in COLUMNS]
+    query = select(*columns)
+    if spec.product_ids is not None:
+        query = query.where(PriceHistory.product_id.in_(spec.product_ids))
+    if spec.user_id is not None:
+        query = query.where(
+            PriceHistory.product_id.in_(select(Product.id).where(Product.user_id == spec.user_id))
+        )
+    if spec.start is not None:
+        query = query.where(PriceHistory.date >= spec.start)
+    if spec.end is not None:
+        query = query.where(PriceHistory.date < spec.end)
+    order = (PriceHistory.product_id, PriceHistory.date, PriceHistory.id)
+    if after is not None:
+        query = query.where(tuple_(*order) > tuple_(*after))
+    return query.order_by(*order).execution_options(yield_per=settings.EXPORT_BATCH_ROWS)
+
+def resume_position(db: Session, after_id: int) -> Position:
+    """Export position of the row with id ``after_id``"""
+    row = db.execute(
+        select(PriceHistory.product_id, PriceHistory.date, PriceHistory.id)
+        .where(PriceHistory.id == after_id)
+    ).first()
+    if row is None:
+        raise InvalidExportTokenError(f"Price history row {after_id} no longer exists")
+    return tuple(row)
+
+def iter_batches(
+    db: Session, spec: ExportSpec, after: Optional[Position] = None
+) -> Iterator[List[Row]]:
+    """Rows of ``spec`` in batches, fetched through a server-side cursor"""
+    yield from db.execute(export_query(spec, after)).partitions()
+
+async def iter_batches_async(
+    db: AsyncSession, spec: ExportSpec, after: Optional[Position] = None
+) -> AsyncIterator[List[Row]]:
+    """Rows of ``spec`` in batches, fetched through a server-side cursor"""
+    result = await db.stream(export_query(spec, after))
+    async for partition in result.partitions():
+        yield partition
+
+# Encoders turn batches of rows into chunks of the output format
+
+def _record(row: Row) -> Dict:
+    record = dict(row._mapping)
+    record["price"] = to_major(row.price, row.currency)
+    return record
+
+class NDJSONEncoder:
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def header(self, resumed: bool = False) -> bytes:
+        return b""
+
+    def encode(self, rows: Sequence[Row]) -> bytes:
+        return "".join(
+            json.dumps(_record(row), default=self._default, separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode()
+
+    def footer(self) -> bytes:
+        return b""
+
+    @staticmethod
+    def _default(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value)  # Decimal prices, kept exact
+
+class CSVEncoder:
+    media_type = "text/csv"
+    extension = "csv"
+
+    def header(self, resumed: bool = False) -> bytes:
+        return b"" if resumed else self._lines([COLUMNS])
+
+    def encode(self, rows: Sequence[Row]) -> bytes:
+        return self._lines(
+            [
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in _record(row).values()
+            ]
+            for row in rows
+        )
+
+    def footer(self) -> bytes:
+        return b""
+
+    @staticmethod
+    def _lines(rows: Iterable[Sequence]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue().encode()
+
+class ArrowEncoder:
+    """Arrow IPC stream: one record batch per fetched batch"""
+    media_type = "application/vnd.apache.arrow.stream"
+    extension = "arrows"
+
+    def __init__(self):
+        import pyarrow as pa  # only needed for this format
+        self._pa = pa
+        self._schema = pa.schema([
+            ("id", pa.int64()),
+            ("product_id", pa.int64()),
+            ("date", pa.timestamp("us")),
+            # Three decimals hold every currency's minor unit exactly
+            ("price", pa.decimal128(18, 3)),
+            ("currency", pa.string()),
+            ("availability", pa.bool_()),
+            ("in_stock", pa.bool_()),
+            ("source", pa.string()),
+            ("last_seen", pa.timestamp("us")),
+            ("observation_count", pa.int32()),
+        ])
+        self._sink = io.BytesIO()
+        self._writer = None
+
+    def header(self, resumed: bool = False) -> bytes:
+        self._writer = self._pa.ipc.new_stream(self._sink, self._schema)
+        return self._drain()
+
+    def encode(self, rows: Sequence[Row]) -> bytes:
+        records = [_record(row) for row in rows]
+        self._writer.write_batch(self._pa.RecordBatch.from_arrays(
+            [
+                self._pa.array([record[field.name] for record in records], type=field.type)
+                for field in self._schema
+            ],
+            schema=self._schema
+        ))
+        return self._drain()
+
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._drain()
+
+    def _drain(self) -> bytes:
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+ENCODERS: Dict[str, Type] = {
+    "ndjson": NDJSONEncoder,
+    "csv": CSVEncoder,
+    "arrow": ArrowEncoder,
+}
+
+def encoder_for(spec: ExportSpec):
+    return ENCODERS[spec.format]()
+
+def require_token_secret() -> str:
+    """The secret resume tokens are signed with; raises when none is configured"""
+    if not settings.EXPORT_TOKEN_SECRET:
+        raise RuntimeError("Set EXPORT_TOKEN_SECRET (or SECRET_KEY) to sign export tokens")
+    return settings.EXPORT_TOKEN_SECRET
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(require_token_secret().encode(), payload, hashlib.sha256).digest()
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream price history to a file or stdout")
+    parser.add_argument(
+        "--product-id", type=int, action="append", dest="product_ids",
+        help="limit to these products (repeatable); default is all products"
+    )
+    parser.add_argument("--start", type=datetime.fromisoformat, help="inclusive, ISO 8601")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="exclusive, ISO 8601")
+    parser.add_argument("--format", choices=sorted(ENCODERS), default="ndjson")
+    parser.add_argument("-o", "--output", help="default is stdout")
+    parser.add_argument("--token", help="resume the export this token describes")
+    parser.add_argument("--after-id", type=int, help="last row id already exported")
+    args = parser.parse_args()
+
+    spec = decode_token(args.token) if args.token else new_export(
+        format=args.format, product_ids=args.product_ids, start=args.start, end=args.end
+    )
+    token = encode_token(spec)
+    print(f"Export token: {token}", file=sys.stderr)
+
+    from app.db.session import ReadSessionLocal
+    db = ReadSessionLocal()
+    if args.after_id is None:
+        mode = "wb"
+    else:
+        # CSV and NDJSON pieces concatenate; an Arrow stream cannot be appended to
+        mode = "xb" if spec.format == "arrow" else "ab"
+    out = open(args.output, mode) if args.output else sys.stdout.buffer
+    encoder = encoder_for(spec)
+    exported, last_id = 0, args.after_id
+    try:
+        after = resume_position(db, args.after_id) if args.after_id is not None else None
+        out.write(encoder.header(resumed=after is not None))
+        for rows in iter_batches(db, spec, after):
+            out.write(encoder.encode(rows))
+            exported += len(rows)
+            last_id = rows[-1].id
+        out.write(encoder.footer())
+        print(f"Exported {exported} price history rows", file=sys.stderr)
+    except BaseException:
+        if last_id is not None:
+            print(
+                f"Interrupted; resume with --token {token} --after-id {last_id}",
+                file=sys.stderr
+            )
+        raise
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        db.close()
+
+if __name__ == "__main__":
+    main()
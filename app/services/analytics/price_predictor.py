@@ -1,6 +1,6 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from sklearn.ensemble import GradientBoostingRegressor
 from sklearn.model_selection import TimeSeriesSplit
 from xgboost import XGBRegressor
@@ -68,7 +68,15 @@ class PricePredictor:
             logger.error(f"Training failed for product {product_id}: {str(e)}")
             return False
 
-    async def predict(self, product_id: int, days: int = 7) -> Optional[Dict]:
+    def model_version(self, product_id: int) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of the product's saved model; changes on retrain"""
+        try:
+            stat = os.stat(os.path.join(self.models_dir, f"{product_id}.joblib"))
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def predict(self, product_id: int, days: int = 7) -> Optional[Dict]:
         """Predict future prices for a product"""
         try:
             model_path = os.path.join(self.models_dir, f"{product_id}.joblib")
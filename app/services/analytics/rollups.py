@@ -0,0 +1,190 @@
+"""Daily and weekly OHLC rollups of price_history.
+
+record_price folds each new observation into its day and week with a
+single upsert per table, in the caller's transaction. backfill rebuilds
+rollups from raw history for data written before rollups existed:
+
+    python -m app.services.analytics.rollups --product-id 42
+"""
+import argparse
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import Float, case, cast, delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.crud.price_history import price_history_crud
+from app.db.models.price_rollup import (
+    PriceRollupDaily,
+    PriceRollupMixin,
+    PriceRollupWeekly,
+)
+from app.db.models.product import Product
+from app.core.logging import logger
+
+ROLLUPS: Dict[str, Type[PriceRollupMixin]] = {
+    'daily': PriceRollupDaily,
+    'weekly': PriceRollupWeekly,
+}
+
+def period_start(rollup: Type[PriceRollupMixin], when: datetime) -> datetime:
+    day = datetime(when.year, when.month, when.day)
+    if rollup is PriceRollupWeekly:
+        return day - timedelta(days=day.weekday())
+    return day
+
+def _insert(db: Session, rollup: Type[PriceRollupMixin]):
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(rollup)
+
+def _upsert(db: Session, rollup: Type[PriceRollupMixin], rows: List[Dict]) -> None:
+    """Merge partial aggregates into existing periods"""
+    stmt = _insert(db, rollup).values(rows)
+    new = stmt.excluded
+    count = rollup.sample_count + new.sample_count
+    total = rollup.price_sum + new.price_sum
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[rollup.product_id, rollup.period_start],
+        set_={
+            'open_price': case(
+                (new.opened_at < rollup.opened_at, new.open_price),
+                else_=rollup.open_price
+            ),
+            'opened_at': case(
+                (new.opened_at < rollup.opened_at, new.opened_at),
+                else_=rollup.opened_at
+            ),
+            'close_price': case(
+                (new.closed_at >= rollup.closed_at, new.close_price),
+                else_=rollup.close_price
+            ),
+            'closed_at': case(
+                (new.closed_at >= rollup.closed_at, new.closed_at),
+                else_=rollup.closed_at
+            ),
+            'high_price': case(
+                (new.high_price > rollup.high_price, new.high_price),
+                else_=rollup.high_price
+            ),
+            'low_price': case(
+                (new.low_price < rollup.low_price, new.low_price),
+                else_=rollup.low_price
+            ),
+            'sample_count': count,
+            'price_sum': total,
+            'price_sum_sq': rollup.price_sum_sq + new.price_sum_sq,
+            'mean_price': cast(total, Float) / count,
+        }
+    )
+    db.execute(stmt)
+
+def _aggregate(
+    rollup: Type[PriceRollupMixin],
+    product_id: int,
+    points: Iterable[Tuple[datetime, float]]
+) -> List[Dict]:
+    """Summarise (date, price) points, which must be in date order"""
+    periods: Dict[datetime, Dict] = OrderedDict()
+    for when, price in points:
+        start = period_start(rollup, when)
+        row = periods.get(start)
+        if row is None:
+            periods[start] = {
+                'product_id': product_id,
+                'period_start': start,
+                'open_price': price,
+                'high_price': price,
+                'low_price': price,
+                'close_price': price,
+                'mean_price': price,
+                'sample_count': 1,
+                'price_sum': price,
+                'price_sum_sq': price * price,
+                'opened_at': when,
+                'closed_at': when,
+            }
+            continue
+        row['high_price'] = max(row['high_price'], price)
+        row['low_price'] = min(row['low_price'], price)
+        row['close_price'] = price
+        row['closed_at'] = when
+        row['sample_count'] += 1
+        row['price_sum'] += price
+        row['price_sum_sq'] += price * price
+        row['mean_price'] = row['price_sum'] / row['sample_count']
+    return list(periods.values())
+
+def record_price(
+    db: Session, *, product_id: int, price: float, observed_at: datetime
+) -> None:
+    """Fold one observation into the daily and weekly rollups (no commit)"""
+    for rollup in ROLLUPS.values():
+        _upsert(db, rollup, _aggregate(rollup, product_id, [(observed_at, price)]))
+
+def backfill(
+    db: Session,
+    *,
+    product_ids: Optional[Sequence[int]] = None,
+    chunk_size: int = 1000
+) -> int:
+    """Rebuild rollups from price_history, one product per transaction.
+
+    Returns the number of products processed. Safe to re-run: each
+    product's rollups are replaced, not added to. A price written for a
+    product while it is being rebuilt may be missed, so run it while price
+    checks are paused or re-run it for the affected products.
+    """
+    if product_ids is None:
+        product_ids = db.execute(select(Product.id).order_by(Product.id)).scalars().all()
+
+    for done, product_id in enumerate(product_ids, 1):
+        points = price_history_crud.get_range(db, product_id=product_id, expand=True)
+        for rollup in ROLLUPS.values():
+            db.execute(delete(rollup).where(rollup.product_id == product_id))
+            rows = _aggregate(rollup, product_id, points)
+            for start in range(0, len(rows), chunk_size):
+                db.execute(_insert(db, rollup), rows[start:start + chunk_size])
+        db.commit()
+        if done % 100 == 0:
+            logger.info(f"Backfilled price rollups for {done}/{len(product_ids)} products")
+    return len(product_ids)
+
+def get_rollups(
+    db: Session,
+    *,
+    product_ids: Sequence[int],
+    period: str = 'daily',
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> List[PriceRollupMixin]:
+    """Get rollup rows for products in period order"""
+    rollup = ROLLUPS[period]
+    query = select(rollup).where(rollup.product_id.in_(product_ids))
+    if start is not None:
+        query = query.where(rollup.period_start >= period_start(rollup, start))
+    if end is not None:
+        query = query.where(rollup.period_start < end)
+    return db.execute(
+        query.order_by(rollup.period_start, rollup.product_id)
+    ).scalars().all()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill price rollups from price_history")
+    parser.add_argument(
+        "--product-id", type=int, action="append", dest="product_ids",
+        help="limit to these products (repeatable); default is all products"
+    )
+    args = parser.parse_args()
+
+    from app.db.session import SessionLocal
+    db = SessionLocal()
+    try:
+        count = backfill(db, product_ids=args.product_ids)
+        print(f"Backfilled price rollups for {count} products")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ from datetime import datetime
 from app.core.config import settings
 from app.core.logging import logger
 from app.utils.exceptions import BlockchainError
+from app.utils.money import DEFAULT_CURRENCY, to_major, to_minor
 
 class PriceOracle:
     def __init__(self):
@@ -22,13 +23,16 @@ class PriceOracle:
             abi=self.contract_abi
         )
         
-    def submit_price(self, product_id: str, price: float, metadata: Dict) -> str:
-        """Submit price data to blockchain"""
+    def submit_price(
+        self, product_id: str, price: int, metadata: Dict, currency: str = DEFAULT_CURRENCY
+    ) -> str:
+        """Submit price data to blockchain (``price`` in the currency's minor units)"""
         try:
             # Prepare transaction
             tx_data = {
                 'productId': product_id,
-                'price': int(price * 100),  # Store as integer to avoid float precision
+                # The contract stores hundredths of the major unit
+                'price': to_minor(to_major(price, currency), DEFAULT_CURRENCY),
                 'source': metadata.get('source', ''),
                 'timestamp': metadata.get('timestamp', int(datetime.now().timestamp())),
                 'submitter': metadata.get('submitter', '')
@@ -64,7 +68,7 @@ class PriceOracle:
         try:
             result = self.contract.functions.getVerifiedPrice(product_id).call()
             return {
-                'price': result[0] / 100,
+                'price': to_major(result[0], DEFAULT_CURRENCY),
                 'timestamp': result[1],
                 'source': result[2],
                 'confidence': result[3] / 100
@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from app.services.notifications.base import BaseNotifier
+from app.utils.money import DEFAULT_CURRENCY
+
+@dataclass
+class PendingAlert:
+    user_id: int
+    channel: str
+    recipient: str
+    product_name: str
+    current_price: str  # display amount, e.g. '79.90'
+    target_price: str
+    product_url: str
+    # Jobs queued before prices carried their currency are USD
+    currency: str = DEFAULT_CURRENCY
+
+    def as_context(self) -> Dict:
+        return {
+            'product_name': self.product_name,
+            'current_price': self.current_price,
+            'target_price': self.target_price,
+            'product_url': self.product_url,
+            'currency': self.currency
+        }
+
+async def deliver_alerts(
+    alerts: List[PendingAlert],
+    notifier_factory: Optional[Callable[[str], BaseNotifier]] = None
+) -> bool:
+    """Send alerts for one (user, channel): a plain alert if single, else a digest"""
+    first = alerts[0]
+    notifier = (notifier_factory or notifier_for_channel)(first.channel)
+    if len(alerts) == 1:
+        return await notifier.send_price_alert(
+            recipient=first.recipient,
+            **first.as_context()
+        )
+    return await notifier.send_digest(
+        recipient=first.recipient,
+        alerts=[alert.as_context() for alert in alerts]
+    )
+
+def notifier_for_channel(channel: str) -> BaseNotifier:
+    """Build the notifier for an alert's notification_type"""
+    from app.services.notifications.email import EmailNotifier
+    from app.services.notifications.push import PushNotifier
+    from app.services.notifications.sms import SMSNotifier
+
+    notifiers = {'email': EmailNotifier, 'sms': SMSNotifier, 'push': PushNotifier}
+    return notifiers.get(channel, EmailNotifier)()
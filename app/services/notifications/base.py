@@ -1,7 +1,23 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional, Dict
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List
+
+from app.utils.money import DEFAULT_CURRENCY, currency_symbol
+
+@dataclass
+class NotificationMessage:
+    recipient: str
+    subject: str
+    template: str
+    context: Dict = field(default_factory=dict)
 
 class BaseNotifier(ABC):
+    # Name used for the provider's rate limits in the send governor
+    provider = 'default'
+    # Plain-text digests list this many items before summarizing the rest
+    digest_preview_items = 5
+
     @abstractmethod
     async def send(
         self,
@@ -18,10 +34,40 @@ class BaseNotifier(ABC):
         self,
         recipient: str,
         product_name: str,
-        current_price: float,
-        target_price: float,
-        product_url: str
+        current_price: str,
+        target_price: str,
+        product_url: str,
+        currency: str = DEFAULT_CURRENCY
     ) -> bool:
-        """Send price alert notification"""
+        """Send price alert notification (prices formatted in ``currency``)"""
         pass
-    
\ No newline at end of file
+
+    async def send_digest(self, recipient: str, alerts: List[Dict]) -> bool:
+        """Send several triggered price alerts as one notification"""
+        shown = alerts[:self.digest_preview_items]
+        lines = [
+            f"{a['product_name']}: {currency_symbol(a.get('currency'))}{a['current_price']}"
+            for a in shown
+        ]
+        if len(alerts) > len(shown):
+            lines.append(f"...and {len(alerts) - len(shown)} more")
+        return await self.send(
+            recipient=recipient,
+            subject=f"{len(alerts)} price alerts",
+            template="{summary}",
+            context={'summary': '\n'.join(lines), 'alerts': alerts}
+        )
+
+    async def send_many(self, messages: List[NotificationMessage]) -> List[bool]:
+        """Send several notifications, one result per message"""
+        results = await asyncio.gather(*(
+            self.send(m.recipient, m.subject, m.template, m.context)
+            for m in messages
+        ), return_exceptions=True)
+        # Throttled/backpressured sends come back as exceptions: report them
+        # as not delivered so the caller keeps and retries them
+        return [result is True for result in results]
+
+    def _render_message(self, template: str, context: Dict) -> str:
+        """Render a plain-text message body"""
+        return template.format(**context)
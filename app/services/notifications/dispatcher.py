@@ -0,0 +1,93 @@
+import asyncio
+import os
+import threading
+from typing import Awaitable, Callable, Iterable, List, Optional, TypeVar, Union
+
+from app.config import settings
+from app.core.logging import logger
+
+SendJob = Callable[[], Awaitable[bool]]
+T = TypeVar("T")
+
+class NotificationDispatcher:
+    """Run notification sends concurrently with a bounded number of workers"""
+
+    def __init__(self, concurrency: int = settings.NOTIFICATION_CONCURRENCY):
+        self.concurrency = concurrency
+
+    async def dispatch(
+        self, jobs: Iterable[SendJob], return_exceptions: bool = False
+    ) -> List[Union[bool, BaseException]]:
+        """Run send jobs and return their results in submission order.
+
+        A job that raises counts as False, or is returned as the exception
+        itself when ``return_exceptions`` is set.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for index, job in enumerate(jobs):
+            queue.put_nowait((index, job))
+
+        results = [False] * queue.qsize()
+        if not results:
+            return results
+
+        async def worker() -> None:
+            while True:
+                try:
+                    index, job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    results[index] = await job()
+                except Exception as e:
+                    if return_exceptions:
+                        results[index] = e
+                    else:
+                        logger.error(f"Notification job failed: {str(e)}")
+
+        workers = min(self.concurrency, len(results))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return results
+
+    def dispatch_sync(
+        self, jobs: Iterable[SendJob], return_exceptions: bool = False
+    ) -> List[Union[bool, BaseException]]:
+        """Run send jobs from synchronous code such as Celery tasks"""
+        return run_sync(self.dispatch(jobs, return_exceptions))
+
+# One event loop per process for sync callers, running in a daemon thread.
+# Provider clients are bound to the loop they are first used on; sharing
+# one across tasks keeps their HTTP/2 connections open instead of building
+# a client per asyncio.run.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_loop_lock = threading.Lock()
+
+def _worker_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _loop_pid
+    with _loop_lock:
+        # A forked child inherits the loop object but not its thread
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(
+                target=_loop.run_forever, name="notification-loop", daemon=True
+            ).start()
+        return _loop
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Run a coroutine on this process's notification loop and wait for it"""
+    return asyncio.run_coroutine_threadsafe(coro, _worker_loop()).result()
+
+def close_worker_loop() -> None:
+    """Close provider clients and stop the loop (worker shutdown)"""
+    global _loop
+    with _loop_lock:
+        loop, _loop = (_loop, None) if _loop_pid == os.getpid() else (None, None)
+    if loop is None:
+        return
+    from app.services.notifications.http_client import close_provider_clients
+    try:
+        asyncio.run_coroutine_threadsafe(close_provider_clients(), loop).result(timeout=10)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
@@ -1,22 +1,39 @@
+import asyncio
 import smtplib
+from collections import defaultdict
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
 from app.config import settings
 from app.core.logging import logger
-from app.services.notifications.base import BaseNotifier
-from app.templates.email import render_template
+from app.services.notifications.base import BaseNotifier, NotificationMessage
+from app.services.notifications.governor import (
+    BackpressureError,
+    ProviderThrottled,
+    get_send_governor,
+)
+from app.services.notifications.smtp_pool import SMTPSessionPool, get_smtp_pool
+from app.services.notifications.templates import render_template, render_templates
+from app.utils.money import DEFAULT_CURRENCY
+
+# SMTP replies that mean "slow down" rather than "this message is bad"
+THROTTLE_CODES = {421, 450, 451, 452}
 
 class EmailNotifier(BaseNotifier):
-    def __init__(self):
+    provider = 'email'
+
+    def __init__(self, pool: Optional[SMTPSessionPool] = None):
         self.sender = settings.EMAIL_SENDER
         self.password = settings.EMAIL_PASSWORD
         self.smtp_server = settings.EMAIL_SMTP_SERVER
         self.smtp_port = settings.EMAIL_SMTP_PORT
+        self.pool = pool or get_smtp_pool(
+            self.smtp_server, self.smtp_port, self.sender, self.password
+        )
 
     async def send(
         self,
@@ -26,39 +43,103 @@ class EmailNotifier(BaseNotifier):
         context: Optional[dict] = None
     ) -> bool:
         """Send email notification"""
-        if not self.sender or not self.password:
+        if not self.sender:
             logger.error("Email credentials not configured")
             return False
 
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.sender
-            msg['To'] = recipient
-            msg['Subject'] = subject
-
             # Render HTML email from template
             html_content = render_template(template, context or {})
-            msg.attach(MIMEText(html_content, 'html'))
+            msg = self._build_message(recipient, subject, html_content)
 
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender, self.password)
-                server.send_message(msg)
+            await self._transmit(msg)
 
             logger.info(f"Email sent to {recipient}")
             return True
 
+        except (ProviderThrottled, BackpressureError):
+            raise
         except Exception as e:
             logger.error(f"Failed to send email: {str(e)}")
             return False
 
+    async def send_many(self, messages: List[NotificationMessage]) -> List[bool]:
+        """Render messages in bulk per template, then send them concurrently"""
+        if not self.sender:
+            logger.error("Email credentials not configured")
+            return [False] * len(messages)
+
+        by_template: Dict[str, List[int]] = defaultdict(list)
+        for index, m in enumerate(messages):
+            by_template[m.template].append(index)
+
+        html: List[Optional[str]] = [None] * len(messages)
+        for template, indexes in by_template.items():
+            try:
+                rendered = render_templates(
+                    template, [messages[i].context for i in indexes]
+                )
+            except Exception as e:
+                logger.error(f"Failed to render {template}: {str(e)}")
+                continue
+            for i, content in zip(indexes, rendered):
+                html[i] = content
+
+        async def deliver(m: NotificationMessage, content: Optional[str]) -> bool:
+            if content is None:
+                return False
+            try:
+                await self._transmit(
+                    self._build_message(m.recipient, m.subject, content)
+                )
+                return True
+            except (ProviderThrottled, BackpressureError) as e:
+                logger.warning(f"Email to {m.recipient} deferred: {str(e)}")
+                return False
+            except Exception as e:
+                logger.error(f"Failed to send email to {m.recipient}: {str(e)}")
+                return False
+
+        return list(await asyncio.gather(*(
+            deliver(m, content) for m, content in zip(messages, html)
+        )))
+
+    async def send_digest(self, recipient: str, alerts: List[Dict]) -> bool:
+        """Send a single email listing every triggered alert"""
+        return await self.send(
+            recipient=recipient,
+            subject=f"Price Alerts: {len(alerts)} items hit your target",
+            template="price_digest.html",
+            context={'alerts': alerts}
+        )
+
+    async def _transmit(self, msg: MIMEMultipart) -> None:
+        async def attempt() -> None:
+            try:
+                await self.pool.send_message(msg)
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code in THROTTLE_CODES:
+                    raise ProviderThrottled(self.provider) from e
+                raise
+
+        await get_send_governor().submit(self.provider, self.sender, attempt)
+
+    def _build_message(self, recipient: str, subject: str, html_content: str) -> MIMEMultipart:
+        msg = MIMEMultipart()
+        msg['From'] = self.sender
+        msg['To'] = recipient
+        msg['Subject'] = subject
+        msg.attach(MIMEText(html_content, 'html'))
+        return msg
+
     async def send_price_alert(
         self,
         recipient: str,
         product_name: str,
-        current_price: float,
-        target_price: float,
-        product_url: str
+        current_price: str,
+        target_price: str,
+        product_url: str,
+        currency: str = DEFAULT_CURRENCY
     ) -> bool:
         """Send price alert email"""
         return await self.send(
@@ -69,6 +150,7 @@ class EmailNotifier(BaseNotifier):
                 'product_name': product_name,
                 'current_price': current_price,
                 'target_price': target_price,
-                'product_url': product_url
+                'product_url': product_url,
+                'currency': currency
             }
         )
\ No newline at end of file
@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+from app.config import settings
+from app.core.logging import logger
+
+T = TypeVar("T")
+
+class ProviderThrottled(Exception):
+    """The provider asked us to slow down (HTTP 429/503, SMTP 421/45x)"""
+
+    def __init__(self, provider: str, retry_after: Optional[float] = None):
+        super().__init__(f"{provider} throttled (retry after {retry_after}s)")
+        self.provider = provider
+        self.retry_after = retry_after
+
+class BackpressureError(Exception):
+    """The governor cannot take more sends; the caller must hold on to the work"""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} send queue is full")
+        self.provider = provider
+        self.retry_after = retry_after
+
+def retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or an HTTP date"""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations.
+
+    ``reserve`` always takes the tokens and returns how long the caller must
+    wait before using them, so concurrent senders are paced in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, cost: float = 1) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= min(cost, self.burst)
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def refund(self, cost: float = 1) -> None:
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + min(cost, self.burst))
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for ``seconds`` (provider said Retry-After)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = min(self.tokens, 0.0)
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse ``"email=14:28,sms=10:20,email/alerts@example.com=5:5"``.
+
+    Keys are a provider or ``provider/sender``; values are rate per second
+    and burst size.
+    """
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, _, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        limits[key.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+class SendGovernor:
+    """Paces every notifier send against per-provider and per-sender quotas.
+
+    Sends wait for tokens instead of failing. A provider throttle signal
+    pauses the provider's buckets for its Retry-After and the send is retried.
+    At most ``max_pending`` sends may be waiting per provider, and none may be
+    asked to wait longer than ``max_wait``. Past either limit the governor
+    raises BackpressureError, which callers propagate rather than drop.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Tuple[float, float]],
+        *,
+        max_pending: int = 10000,
+        max_wait: float = 30.0,
+        throttle_retries: int = 3,
+        default_retry_after: float = 5.0
+    ):
+        self.limits = limits
+        self.max_pending = max_pending
+        self.max_wait = max_wait
+        self.throttle_retries = throttle_retries
+        self.default_retry_after = default_retry_after
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._pending: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, key: str) -> Optional[TokenBucket]:
+        if key not in self.limits:
+            return None
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(*self.limits[key])
+            return bucket
+
+    def pending(self, provider: str) -> int:
+        return self._pending.get(provider, 0)
+
+    async def submit(
+        self,
+        provider: str,
+        sender: Optional[str],
+        send: Callable[[], Awaitable[T]],
+        cost: float = 1
+    ) -> T:
+        """Run ``send`` once both the provider and sender quotas allow it"""
+        with self._lock:
+            if self._pending.get(provider, 0) >= self.max_pending:
+                raise BackpressureError(provider, self.max_wait)
+            self._pending[provider] = self._pending.get(provider, 0) + 1
+
+        buckets = [
+            bucket for bucket in (
+                self._bucket(provider),
+                self._bucket(f"{provider}/{sender}") if sender else None
+            )
+            if bucket is not None
+        ]
+        try:
+            for attempt in range(self.throttle_retries + 1):
+                waits = [bucket.reserve(cost) for bucket in buckets]
+                wait = max(waits, default=0.0)
+                if wait > self.max_wait:
+                    for bucket in buckets:
+                        bucket.refund(cost)
+                    raise BackpressureError(provider, wait)
+                if wait:
+                    await asyncio.sleep(wait)
+
+                try:
+                    return await send()
+                except ProviderThrottled as e:
+                    pause = e.retry_after or self.default_retry_after
+                    logger.warning(
+                        f"{provider} throttled us, pausing sends for {pause:.1f}s"
+                    )
+                    for bucket in buckets:
+                        bucket.pause(pause)
+                    if attempt == self.throttle_retries:
+                        raise
+        finally:
+            with self._lock:
+                self._pending[provider] -= 1
+
+_governor: Optional[SendGovernor] = None
+
+def get_send_governor() -> SendGovernor:
+    """Get the process-wide send governor shared by all notifiers"""
+    global _governor
+    if _governor is None:
+        _governor = SendGovernor(
+            parse_rate_limits(settings.NOTIFICATION_RATE_LIMITS),
+            max_pending=settings.NOTIFICATION_MAX_PENDING_SENDS,
+            max_wait=settings.NOTIFICATION_MAX_SEND_WAIT_SECONDS,
+            throttle_retries=settings.NOTIFICATION_THROTTLE_RETRIES
+        )
+    return _governor
@@ -0,0 +1,164 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+
+from app.config import settings
+from app.core.logging import logger
+
+class ProviderMetrics:
+    """Request counters and recent latency samples for a provider"""
+
+    def __init__(self, window: int = 1024):
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self._latencies: Deque[float] = deque(maxlen=window)
+
+    def observe(self, latency: float, ok: bool) -> None:
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self._latencies.append(latency)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summarize counters and latency percentiles in milliseconds"""
+        samples = sorted(self._latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            index = min(len(samples) - 1, int(p * len(samples)))
+            return round(samples[index] * 1000, 2)
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+        }
+
+class ProviderClient:
+    """Long-lived HTTP/2 client shared by every notifier talking to a provider.
+
+    httpx clients and asyncio semaphores are bound to the event loop they
+    are first used on. Sync callers (Celery tasks) share one loop per worker
+    process (see dispatcher.run_sync), so the client lives as long as the
+    process; if another loop does use it, the old client is closed and a
+    fresh pair built.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_concurrency: int = 20,
+        timeout: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.transport = transport
+        self.metrics = ProviderMetrics()
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Loops in different threads (the worker loop, the API) may race here
+        self._lock = threading.Lock()
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._client is not None and self._loop is loop:
+                return self._client
+            if self._client is not None:
+                self._discard(self._client, self._loop)
+            limits = httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+                keepalive_expiry=60.0
+            )
+            # Custom (mock) transports don't speak HTTP/2
+            self._client = httpx.AsyncClient(
+                http2=self.transport is None,
+                limits=limits,
+                timeout=self.timeout,
+                transport=self.transport
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+            return self._client
+
+    def _discard(
+        self, client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]
+    ) -> None:
+        """Close a client left behind on another loop, releasing its pool"""
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._aclose_quietly(client), loop)
+        else:
+            asyncio.get_running_loop().create_task(self._aclose_quietly(client))
+
+    async def _aclose_quietly(self, client: httpx.AsyncClient) -> None:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close stale {self.name} client: {str(e)}")
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """POST to the provider within its concurrency limit"""
+        client = self._ensure_client()
+        async with self._semaphore:
+            self.metrics.in_flight += 1
+            started = time.perf_counter()
+            ok = False
+            try:
+                response = await client.post(url, **kwargs)
+                ok = response.is_success
+                return response
+            finally:
+                self.metrics.in_flight -= 1
+                self.metrics.observe(time.perf_counter() - started, ok)
+
+    async def aclose(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+            self._semaphore = None
+            self._loop = None
+        if client is not None:
+            await client.aclose()
+
+_clients: Dict[str, ProviderClient] = {}
+
+def get_provider_client(name: str) -> ProviderClient:
+    """Get the shared client for a named provider ('push', 'sms')"""
+    client = _clients.get(name)
+    if client is None:
+        limits = {
+            'push': settings.PUSH_MAX_CONCURRENCY,
+            'sms': settings.SMS_MAX_CONCURRENCY,
+        }
+        client = ProviderClient(
+            name,
+            max_concurrency=limits.get(name, 20),
+            timeout=settings.NOTIFICATION_HTTP_TIMEOUT
+        )
+        _clients[name] = client
+    return client
+
+def provider_metrics() -> Dict[str, Dict[str, Any]]:
+    """Latency and error metrics for every provider client"""
+    return {name: client.metrics.snapshot() for name, client in _clients.items()}
+
+async def close_provider_clients() -> None:
+    for client in list(_clients.values()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close {client.name} client: {str(e)}")
@@ -0,0 +1,49 @@
+import json
+from typing import Dict, List, Optional
+
+import httpx
+
+from app.services.notifications.http_client import ProviderClient
+
+class MockProvider:
+    """In-process stand-in for push/SMS provider APIs.
+
+    Plug it into a notifier with ``PushNotifier(client=mock.client('push'))``;
+    every request is recorded instead of leaving the process.
+    """
+
+    def __init__(self, status_code: int = 200, fail_recipients: Optional[List[str]] = None):
+        self.status_code = status_code
+        self.fail_recipients = set(fail_recipients or [])
+        self.requests: List[Dict] = []
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self._handle)
+
+    def client(self, name: str = 'mock', max_concurrency: int = 20) -> ProviderClient:
+        return ProviderClient(name, max_concurrency=max_concurrency, transport=self.transport)
+
+    @property
+    def delivered(self) -> List[str]:
+        """Recipients of every accepted message, in arrival order"""
+        recipients = []
+        for payload in self.requests:
+            for message in payload if isinstance(payload, list) else [payload]:
+                to = message.get('to')
+                recipients.extend(to if isinstance(to, list) else [to])
+        return [r for r in recipients if r not in self.fail_recipients]
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content or b'null')
+        self.requests.append(payload)
+        if self.status_code != 200:
+            return httpx.Response(self.status_code, json={'error': 'mock failure'})
+
+        if isinstance(payload, list):
+            tickets = [
+                {'status': 'error' if m.get('to') in self.fail_recipients else 'ok'}
+                for m in payload
+            ]
+            return httpx.Response(200, json={'data': tickets})
+        return httpx.Response(200, json={'status': 'ok'})
@@ -1,14 +1,41 @@
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+
 import httpx
 
 from app.config import settings
 from app.core.logging import logger
-from app.services.notifications.base import BaseNotifier
+from app.services.notifications.base import BaseNotifier, NotificationMessage
+from app.services.notifications.governor import (
+    BackpressureError,
+    ProviderThrottled,
+    get_send_governor,
+    retry_after_seconds,
+)
+from app.services.notifications.http_client import ProviderClient, get_provider_client
+from app.utils.money import DEFAULT_CURRENCY, currency_symbol
 
 class PushNotifier(BaseNotifier):
-    def __init__(self):
+    provider = 'push'
+
+    def __init__(self, client: Optional[ProviderClient] = None):
         self.api_key = settings.PUSH_API_KEY
         self.api_url = settings.PUSH_API_URL
+        self.batch_size = settings.PUSH_BATCH_SIZE
+        self.client = client or get_provider_client('push')
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+
+    def _payload(self, message: NotificationMessage) -> Dict:
+        return {
+            'to': message.recipient,
+            'title': message.subject,
+            'body': self._render_message(message.template, message.context),
+            'data': message.context
+        }
 
     async def send(
         self,
@@ -23,30 +50,88 @@ class PushNotifier(BaseNotifier):
             return False
 
         try:
-            message = self._render_message(template, context or {})
-            payload = {
-                'to': recipient,
-                'title': subject,
-                'body': message,
-                'data': context or {}
-            }
-
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.api_url,
-                    json=payload,
-                    headers=headers
-                )
-                response.raise_for_status()
+            message = NotificationMessage(recipient, subject, template, context or {})
+            await self._transmit(self._payload(message))
 
             logger.info(f"Push notification sent to {recipient}")
             return True
 
+        except (ProviderThrottled, BackpressureError):
+            raise
         except Exception as e:
             logger.error(f"Failed to send push notification: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+    async def send_many(self, messages: List[NotificationMessage]) -> List[bool]:
+        """Send push notifications in batches of up to PUSH_BATCH_SIZE per request.
+
+        The provider accepts a JSON array of messages and answers with one
+        ticket per message under ``data``.
+        """
+        if self.batch_size <= 1:
+            return await super().send_many(messages)
+        if not self.api_key or not self.api_url:
+            logger.error("Push notification credentials not configured")
+            return [False] * len(messages)
+
+        results: List[bool] = []
+        for start in range(0, len(messages), self.batch_size):
+            batch = messages[start:start + self.batch_size]
+            results.extend(await self._send_batch(batch))
+        return results
+
+    async def _send_batch(self, batch: List[NotificationMessage]) -> List[bool]:
+        try:
+            response = await self._transmit(
+                [self._payload(m) for m in batch], cost=len(batch)
+            )
+        except (ProviderThrottled, BackpressureError) as e:
+            logger.warning(f"Push batch of {len(batch)} deferred: {str(e)}")
+            return [False] * len(batch)
+        except Exception as e:
+            logger.error(f"Failed to send push batch of {len(batch)}: {str(e)}")
+            return [False] * len(batch)
+
+        tickets = response.json().get('data')
+        if not isinstance(tickets, list) or len(tickets) != len(batch):
+            return [True] * len(batch)
+        return [ticket.get('status') == 'ok' for ticket in tickets]
+
+    async def _transmit(self, payload, cost: int = 1) -> httpx.Response:
+        async def attempt() -> httpx.Response:
+            response = await self.client.post(
+                self.api_url, json=payload, headers=self._headers()
+            )
+            if response.status_code in (429, 503):
+                raise ProviderThrottled(
+                    self.provider, retry_after_seconds(response.headers)
+                )
+            response.raise_for_status()
+            return response
+
+        return await get_send_governor().submit(
+            self.provider, self.api_key, attempt, cost=cost
+        )
+
+    async def send_price_alert(
+        self,
+        recipient: str,
+        product_name: str,
+        current_price: str,
+        target_price: str,
+        product_url: str,
+        currency: str = DEFAULT_CURRENCY
+    ) -> bool:
+        """Send price alert push notification"""
+        return await self.send(
+            recipient=recipient,
+            subject=f"Price Alert: {product_name}",
+            template="{product_name} dropped to {symbol}{current_price} (target {symbol}{target_price})",
+            context={
+                'product_name': product_name,
+                'current_price': current_price,
+                'target_price': target_price,
+                'product_url': product_url,
+                'symbol': currency_symbol(currency)
+            }
+        )
@@ -1,14 +1,30 @@
-from typing import Optional
-import requests
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
 
 from app.config import settings
 from app.core.logging import logger
-from app.services.notifications.base import BaseNotifier
+from app.services.notifications.base import BaseNotifier, NotificationMessage
+from app.services.notifications.governor import (
+    BackpressureError,
+    ProviderThrottled,
+    get_send_governor,
+    retry_after_seconds,
+)
+from app.services.notifications.http_client import ProviderClient, get_provider_client
+from app.utils.money import DEFAULT_CURRENCY, currency_symbol
 
 class SMSNotifier(BaseNotifier):
-    def __init__(self):
+    provider = 'sms'
+    sender_id = 'PriceTracker'
+
+    def __init__(self, client: Optional[ProviderClient] = None):
         self.api_key = settings.SMS_API_KEY
         self.api_url = settings.SMS_API_URL
+        self.batch_url = settings.SMS_API_BATCH_URL
+        self.batch_size = settings.SMS_BATCH_SIZE
+        self.client = client or get_provider_client('sms')
 
     async def send(
         self,
@@ -28,17 +44,100 @@ class SMSNotifier(BaseNotifier):
                 'api_key': self.api_key,
                 'to': recipient,
                 'message': message,
-                'from': 'PriceTracker'
+                'from': self.sender_id
             }
 
-            response = requests.post(self.api_url, json=payload)
-            response.raise_for_status()
+            await self._transmit(self.api_url, payload)
 
             logger.info(f"SMS sent to {recipient}")
             return True
 
+        except (ProviderThrottled, BackpressureError):
+            raise
         except Exception as e:
             logger.error(f"Failed to send SMS: {str(e)}")
             return False
 
-    # ... (implement other methods)
\ No newline at end of file
+    async def send_many(self, messages: List[NotificationMessage]) -> List[bool]:
+        """Send SMS, grouping identical bodies into multi-recipient requests.
+
+        Batching needs SMS_API_BATCH_URL, an endpoint that takes a list of
+        numbers under ``to``; without it each message is sent on its own.
+        """
+        if not self.batch_url:
+            return await super().send_many(messages)
+        if not self.api_key:
+            logger.error("SMS credentials not configured")
+            return [False] * len(messages)
+
+        by_body: Dict[str, List[int]] = defaultdict(list)
+        for index, m in enumerate(messages):
+            by_body[self._render_message(m.template, m.context)].append(index)
+
+        results = [False] * len(messages)
+        for body, indexes in by_body.items():
+            for start in range(0, len(indexes), self.batch_size):
+                chunk = indexes[start:start + self.batch_size]
+                ok = await self._send_batch(body, [messages[i].recipient for i in chunk])
+                for i in chunk:
+                    results[i] = ok
+        return results
+
+    async def _send_batch(self, body: str, recipients: List[str]) -> bool:
+        try:
+            await self._transmit(
+                self.batch_url,
+                {
+                    'api_key': self.api_key,
+                    'to': recipients,
+                    'message': body,
+                    'from': self.sender_id
+                },
+                cost=len(recipients)
+            )
+            logger.info(f"SMS batch sent to {len(recipients)} recipients")
+            return True
+        except (ProviderThrottled, BackpressureError) as e:
+            logger.warning(f"SMS batch of {len(recipients)} deferred: {str(e)}")
+            return False
+        except Exception as e:
+            logger.error(f"Failed to send SMS batch of {len(recipients)}: {str(e)}")
+            return False
+
+    async def _transmit(self, url: str, payload: Dict, cost: int = 1) -> httpx.Response:
+        async def attempt() -> httpx.Response:
+            response = await self.client.post(url, json=payload)
+            if response.status_code in (429, 503):
+                raise ProviderThrottled(
+                    self.provider, retry_after_seconds(response.headers)
+                )
+            response.raise_for_status()
+            return response
+
+        return await get_send_governor().submit(
+            self.provider, self.sender_id, attempt, cost=cost
+        )
+
+    async def send_price_alert(
+        self,
+        recipient: str,
+        product_name: str,
+        current_price: str,
+        target_price: str,
+        product_url: str,
+        currency: str = DEFAULT_CURRENCY
+    ) -> bool:
+        """Send price alert SMS"""
+        return await self.send(
+            recipient=recipient,
+            subject=f"Price Alert: {product_name}",
+            template="Price Alert: {product_name} is now {symbol}{current_price} "
+                     "(target {symbol}{target_price}) {product_url}",
+            context={
+                'product_name': product_name,
+                'current_price': current_price,
+                'target_price': target_price,
+                'product_url': product_url,
+                'symbol': currency_symbol(currency)
+            }
+        )
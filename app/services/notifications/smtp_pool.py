@@ -0,0 +1,168 @@
+import asyncio
+import smtplib
+import ssl
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+from app.core.logging import logger
+
+class SMTPSessionPool:
+    """Pool of authenticated SMTP sessions reused across messages.
+
+    Each executor thread owns one session, so ``max_sessions`` caps the
+    number of concurrent connections to the provider. Sends queue up on
+    the executor and are pushed through whichever session frees up first.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        *,
+        max_sessions: int = 4,
+        use_starttls: bool = True,
+        timeout: float = 30.0,
+        max_messages_per_session: int = 500
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_sessions = max_sessions
+        self.use_starttls = use_starttls
+        self.timeout = timeout
+        self.max_messages_per_session = max_messages_per_session
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_sessions,
+            thread_name_prefix=f"smtp-{host}"
+        )
+        self._local = threading.local()
+        self._sessions_lock = threading.Lock()
+        self._sessions = set()
+
+    async def send_message(self, msg: Message) -> None:
+        """Send a message through a pooled session"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._send_blocking, msg)
+
+    def close(self) -> None:
+        """Close all sessions and stop the executor"""
+        self._executor.shutdown(wait=True)
+        with self._sessions_lock:
+            sessions = list(self._sessions)
+            self._sessions.clear()
+        for session in sessions:
+            self._quit(session)
+
+    def _send_blocking(self, msg: Message) -> None:
+        # A session that went stale while idle gets one reconnect attempt
+        for attempt in range(2):
+            session = self._get_session()
+            try:
+                session.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._discard_session()
+                if attempt:
+                    raise
+                continue
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code != 421:
+                    raise
+                # 421: server is closing the transmission channel
+                self._discard_session()
+                if attempt:
+                    raise
+                continue
+            except smtplib.SMTPException:
+                # Per-message failure (refused recipient etc.), session is fine
+                raise
+            except OSError:
+                self._discard_session()
+                if attempt:
+                    raise
+                continue
+
+            self._local.sent += 1
+            if self._local.sent >= self.max_messages_per_session:
+                self._discard_session()
+            return
+
+    def _get_session(self) -> smtplib.SMTP:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._connect()
+            self._local.session = session
+            self._local.sent = 0
+            with self._sessions_lock:
+                self._sessions.add(session)
+        return session
+
+    def _connect(self) -> smtplib.SMTP:
+        session = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_starttls:
+                session.starttls(context=ssl.create_default_context())
+            if self.username and self.password:
+                session.login(self.username, self.password)
+        except Exception:
+            self._quit(session)
+            raise
+        logger.debug(f"Opened SMTP session to {self.host}:{self.port}")
+        return session
+
+    def _discard_session(self) -> None:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            return
+        self._local.session = None
+        with self._sessions_lock:
+            self._sessions.discard(session)
+        self._quit(session)
+
+    @staticmethod
+    def _quit(session: smtplib.SMTP) -> None:
+        try:
+            session.quit()
+        except Exception:
+            session.close()
+
+_pools: Dict[Tuple[str, int, Optional[str]], SMTPSessionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_smtp_pool(
+    host: str = settings.EMAIL_SMTP_SERVER,
+    port: int = settings.EMAIL_SMTP_PORT,
+    username: Optional[str] = settings.EMAIL_SENDER,
+    password: Optional[str] = settings.EMAIL_PASSWORD
+) -> SMTPSessionPool:
+    """Get the process-wide session pool for an SMTP provider"""
+    key = (host, port, username)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SMTPSessionPool(
+                host,
+                port,
+                username,
+                password,
+                max_sessions=settings.EMAIL_SMTP_POOL_SIZE,
+                use_starttls=settings.EMAIL_SMTP_STARTTLS,
+                timeout=settings.EMAIL_SMTP_TIMEOUT,
+                max_messages_per_session=settings.EMAIL_SMTP_MAX_MESSAGES_PER_SESSION
+            )
+            _pools[key] = pool
+        return pool
+
+def close_smtp_pools() -> None:
+    """Close every pooled SMTP session (worker shutdown)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from jinja2 import Environment, FileSystemLoader, Template, nodes, select_autoescape
+from jinja2.ext import Extension
+
+from app.config import settings
+from app.core.logging import logger
+from app.utils.money import currency_symbol
+
+class FragmentCacheExtension(Extension):
+    """``{% cache "key" %}...{% endcache %}`` renders a block once per process.
+
+    Only wrap markup that doesn't depend on per-message context.
+    """
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache={})
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        body = parser.parse_statements(["name:endcache"], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_cache_support", args), [], [], body
+        ).set_lineno(lineno)
+
+    def _cache_support(self, name, caller):
+        cache = self.environment.fragment_cache
+        fragment = cache.get(name)
+        if fragment is None:
+            fragment = cache[name] = caller()
+        return fragment
+
+@lru_cache(maxsize=256)
+def url_for(name: str, path: str = "", _external: bool = False) -> str:
+    """Build an asset URL for use inside email templates"""
+    url = f"/{name}/{path}"
+    if _external:
+        url = settings.PUBLIC_BASE_URL.rstrip("/") + url
+    return url
+
+class EmailTemplateEngine:
+    """Loads and compiles email templates once per process.
+
+    Compiled templates are kept in memory; the template files are stat'ed
+    at most every ``reload_interval`` seconds and everything is recompiled
+    when one of them changes.
+    """
+
+    def __init__(self, template_dir: str, reload_interval: float = 5.0):
+        self.template_dir = template_dir
+        self.reload_interval = reload_interval
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(["html"]),
+            auto_reload=False,
+            cache_size=-1,
+            extensions=[FragmentCacheExtension]
+        )
+        self.env.globals["url_for"] = url_for
+        self.env.filters["currency_symbol"] = currency_symbol
+
+        self._templates: Dict[str, Template] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._check_for_changes(force=True)
+
+    def get_template(self, name: str) -> Template:
+        """Get a compiled template; bare names resolve under ``email/``"""
+        self._check_for_changes()
+        template = self._templates.get(name)
+        if template is None:
+            path = name if "/" in name else f"email/{name}"
+            template = self._templates[name] = self.env.get_template(path)
+        return template
+
+    def render(self, name: str, context: Optional[Dict] = None) -> str:
+        return self.get_template(name).render(context or {})
+
+    def render_many(self, name: str, contexts: Iterable[Dict]) -> List[str]:
+        """Render one template for many contexts with a single lookup"""
+        template = self.get_template(name)
+        return [template.render(context) for context in contexts]
+
+    def _check_for_changes(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            self.env.globals["now"] = datetime.utcnow()
+            mtimes = self._scan()
+            if mtimes != self._mtimes:
+                if self._mtimes:
+                    logger.info("Email templates changed on disk, recompiling")
+                self._mtimes = mtimes
+                self._templates.clear()
+                self.env.cache.clear()
+                self.env.fragment_cache.clear()
+
+    def _scan(self) -> Dict[str, float]:
+        mtimes = {}
+        for root, _, files in os.walk(self.template_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                mtimes[path] = os.stat(path).st_mtime
+        return mtimes
+
+_engine: Optional[EmailTemplateEngine] = None
+
+def get_template_engine() -> EmailTemplateEngine:
+    """Get the process-wide email template engine"""
+    global _engine
+    if _engine is None:
+        _engine = EmailTemplateEngine(
+            settings.EMAIL_TEMPLATE_DIR,
+            reload_interval=settings.EMAIL_TEMPLATE_RELOAD_INTERVAL
+        )
+    return _engine
+
+def render_template(template: str, context: Dict) -> str:
+    """Render an email template by name"""
+    return get_template_engine().render(template, context)
+
+def render_templates(template: str, contexts: Iterable[Dict]) -> List[str]:
+    """Render an email template for a list of contexts"""
+    return get_template_engine().render_many(template, contexts)
@@ -1,5 +1,6 @@
 import random
 import time
+from decimal import Decimal
 from typing import Optional, Dict
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -85,7 +86,7 @@ class AmazonScraper(BaseScraper):
         ]
         return self._find_with_fallbacks(soup, selectors)
 
-    def _extract_price(self, soup: BeautifulSoup) -> float:
+    def _extract_price(self, soup: BeautifulSoup) -> Optional[Decimal]:
         """Extract current price with multiple fallback selectors"""
         price_selectors = [
             {'class': 'a-price-whole'},
@@ -1,4 +1,5 @@
 import requests
+from decimal import Decimal, InvalidOperation
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 from app.utils.helpers import logger
@@ -19,10 +20,10 @@ class BaseScraper:
             return None
             
     def _extract_price(self, price_str):
-        """Convert price string to float"""
+        """Convert price string to an exact Decimal"""
         try:
-            return float(''.join(c for c in price_str if c.isdigit() or c == '.'))
-        except (ValueError, TypeError, AttributeError):
+            return Decimal(''.join(c for c in price_str if c.isdigit() or c == '.'))
+        except (InvalidOperation, TypeError):
             logger.error(f"Could not extract price from: {price_str}")
             return None
             
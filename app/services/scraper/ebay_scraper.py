@@ -1,4 +1,5 @@
 import logging
+from decimal import Decimal
 from typing import Optional, Dict
 from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
@@ -53,7 +54,7 @@ class EbayScraper(BaseScraper):
         ]
         return self._find_with_fallbacks(soup, selectors) or "Unknown Product"
 
-    def _extract_price(self, soup: BeautifulSoup) -> Optional[float]:
+    def _extract_price(self, soup: BeautifulSoup) -> Optional[Decimal]:
         """Extract current price from eBay page"""
         price_selectors = [
             {'class': 'x-price-primary'},
@@ -63,7 +64,7 @@ class EbayScraper(BaseScraper):
         price_text = self._find_with_fallbacks(soup, price_selectors)
         return normalize_price(price_text) if price_text else None
 
-    def _extract_original_price(self, soup: BeautifulSoup) -> Optional[float]:
+    def _extract_original_price(self, soup: BeautifulSoup) -> Optional[Decimal]:
         """Extract original price if on sale"""
         original_price_selectors = [
             {'class': 'x-original-price'},
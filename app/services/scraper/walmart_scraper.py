@@ -1,4 +1,5 @@
 import logging
+from decimal import Decimal
 from typing import Optional, Dict
 from bs4 import BeautifulSoup
 
@@ -49,7 +50,7 @@ class WalmartScraper(BaseScraper):
         ]
         return self._find_with_fallbacks(soup, selectors) or "Unknown Product"
 
-    def _extract_price(self, soup: BeautifulSoup) -> Optional[float]:
+    def _extract_price(self, soup: BeautifulSoup) -> Optional[Decimal]:
         """Extract current price from Walmart page"""
         price_selectors = [
             {'itemprop': 'price'},
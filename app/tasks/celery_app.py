@@ -1,5 +1,6 @@
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import task_postrun, task_prerun, worker_process_shutdown
 
 from app.config import settings
 
@@ -7,7 +8,7 @@ app = Celery(
     "price_tracker",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=["app.tasks.price_checks"]
+    include=["app.tasks.price_checks", "app.tasks.notifications", "app.tasks.maintenance"]
 )
 
 # Configure Celery
@@ -22,7 +23,10 @@ app.conf.update(
     task_soft_time_limit=240,
     worker_max_tasks_per_child=100,
     worker_prefetch_multiplier=1,
-    broker_connection_retry_on_startup=True
+    broker_connection_retry_on_startup=True,
+    task_routes={
+        'app.tasks.notifications.*': {'queue': 'notifications'}
+    }
 )
 
 # Scheduled tasks
@@ -32,6 +36,21 @@ app.conf.beat_schedule = {
         'schedule': crontab(minute=0, hour='*/6'),
         'options': {'queue': 'periodic'}
     },
+    'drain-notification-outbox': {
+        'task': 'app.tasks.notifications.drain_notification_outbox',
+        'schedule': settings.NOTIFICATION_OUTBOX_POLL_SECONDS,
+        'options': {'queue': 'notifications'}
+    },
+    'maintain-price-history-partitions-daily': {
+        'task': 'app.tasks.maintenance.maintain_price_history_partitions',
+        'schedule': crontab(minute=30, hour=1),
+        'options': {'queue': 'periodic'}
+    },
+    'refresh-price-drops-hourly': {
+        'task': 'app.tasks.maintenance.refresh_price_drops',
+        'schedule': crontab(minute=15),
+        'options': {'queue': 'periodic'}
+    },
     'train-models-weekly': {
         'task': 'app.tasks.price_checks.retrain_all_models',
         'schedule': crontab(day_of_week=0, hour=3),  # Sunday at 3AM
@@ -39,5 +58,31 @@ app.conf.beat_schedule = {
     }
 }
 
+# Open query-count scopes, keyed by task id, of the tasks running in this process
+_query_scopes = {}
+
+@task_prerun.connect
+def start_query_scope(task_id=None, **kwargs):
+    from app.db.instrumentation import start_scope
+    _query_scopes[task_id] = start_scope()
+
+@task_postrun.connect
+def end_query_scope(task_id=None, task=None, **kwargs):
+    """Log the statements a task ran and the time spent in them"""
+    from app.db.instrumentation import end_scope, log_scope
+    scope = _query_scopes.pop(task_id, None)
+    if scope is not None:
+        stats, token = scope
+        end_scope(token)
+        log_scope(f"Task {task.name if task else task_id}", stats)
+
+@worker_process_shutdown.connect
+def close_notification_sessions(**kwargs):
+    """Release SMTP sessions and provider clients when a worker exits"""
+    from app.services.notifications.dispatcher import close_worker_loop
+    from app.services.notifications.smtp_pool import close_smtp_pools
+    close_smtp_pools()
+    close_worker_loop()
+
 if __name__ == '__main__':
     app.start()
\ No newline at end of file
@@ -0,0 +1,62 @@
+from typing import Dict, List, Optional
+
+from celery import shared_task
+from sqlalchemy import select
+
+from app.config import settings
+from app.crud.price_history import price_history_crud
+from app.crud.products import product_crud
+from app.db.models.product import Product
+from app.db.partitioning import PriceHistoryPartitions
+from app.db.session import SessionLocal, engine
+from app.core.logging import logger
+
+@shared_task
+def maintain_price_history_partitions() -> Dict[str, List[str]]:
+    """Create upcoming price_history partitions and drop expired ones"""
+    if not settings.PRICE_HISTORY_PARTITIONING:
+        return {'created': [], 'dropped': []}
+
+    partitions = PriceHistoryPartitions(engine)
+    return {
+        'created': partitions.ensure(),
+        'dropped': partitions.drop_expired()
+    }
+
+@shared_task
+def refresh_price_drops() -> Dict[str, int]:
+    """Recompute every product's reference price for the deals feed"""
+    db = SessionLocal()
+    try:
+        products = product_crud.refresh_price_drops(db)
+        db.commit()
+        return {'products': products}
+    finally:
+        db.close()
+
+@shared_task(time_limit=None, soft_time_limit=None)
+def compact_price_history(product_ids: Optional[List[int]] = None) -> Dict[str, int]:
+    """One-off job merging repeated observations into last_seen runs.
+
+    Commits per product, so it can be interrupted and re-run. Run it with
+    price checks paused or PRICE_HISTORY_CHANGE_ONLY already on.
+
+        celery -A app.tasks.celery_app call app.tasks.maintenance.compact_price_history
+    """
+    db = SessionLocal()
+    try:
+        if product_ids is None:
+            product_ids = db.execute(select(Product.id).order_by(Product.id)).scalars().all()
+
+        removed = 0
+        for done, product_id in enumerate(product_ids, 1):
+            removed += price_history_crud.compact(db, product_id=product_id)
+            db.commit()
+            if done % 100 == 0:
+                logger.info(
+                    f"Compacted price history for {done}/{len(product_ids)} products, "
+                    f"{removed} rows removed"
+                )
+        return {'products': len(product_ids), 'removed': removed}
+    finally:
+        db.close()
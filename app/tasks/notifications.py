@@ -0,0 +1,117 @@
+from collections import defaultdict
+from datetime import timedelta
+from functools import partial
+from typing import Dict, List, Tuple
+
+from celery import shared_task
+
+from app.config import settings
+from app.crud.notification_outbox import outbox_crud
+from app.db.models.notification_outbox import NotificationOutbox
+from app.db.session import SessionLocal
+from app.services.notifications.alerts import PendingAlert, deliver_alerts
+from app.services.notifications.dispatcher import NotificationDispatcher
+from app.services.notifications.governor import BackpressureError, ProviderThrottled
+from app.core.logging import logger
+
+@shared_task
+def drain_notification_outbox(batch_size: int = None) -> int:
+    """Claim due outbox jobs in bulk, send them concurrently and record the outcome.
+
+    Runs on the dedicated ``notifications`` queue so slow providers never
+    hold up price checks. Returns the number of jobs processed.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_OUTBOX_BATCH_SIZE
+    db = SessionLocal()
+    processed = 0
+    try:
+        while True:
+            jobs = outbox_crud.claim_batch(
+                db,
+                limit=batch_size,
+                lease_seconds=settings.NOTIFICATION_OUTBOX_LEASE_SECONDS
+            )
+            if not jobs:
+                break
+
+            token = jobs[0].lease_token
+            delivered, failed, deferred, retry_after = deliver_outbox_jobs(jobs)
+            outbox_crud.mark_delivered(db, ids=delivered, lease_token=token)
+            outbox_crud.release(
+                db,
+                ids=deferred,
+                lease_token=token,
+                retry_in=timedelta(seconds=retry_after)
+            )
+            outbox_crud.mark_failed(
+                db,
+                ids=failed,
+                lease_token=token,
+                error="provider rejected or unreachable",
+                max_attempts=settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS,
+                retry_in=timedelta(seconds=settings.NOTIFICATION_OUTBOX_RETRY_SECONDS)
+            )
+            processed += len(jobs)
+            if deferred:
+                # Providers are pushing back: leave the rest queued in the outbox
+                logger.warning(
+                    f"Deferred {len(deferred)} notification jobs for {retry_after:.0f}s"
+                )
+                break
+            if len(jobs) < batch_size:
+                break
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Outbox drain failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+    if processed:
+        logger.info(f"Drained {processed} notification jobs")
+    return processed
+
+def deliver_outbox_jobs(
+    jobs: List[NotificationOutbox]
+) -> Tuple[List[int], List[int], List[int], float]:
+    """Send claimed jobs as one message or digest per (user, channel).
+
+    Returns delivered, failed and deferred job ids plus how long deferred
+    jobs should wait. Deferred jobs hit provider throttling or governor
+    backpressure and are retried without counting an attempt.
+    """
+    groups: Dict[Tuple[int, str, int], List[NotificationOutbox]] = defaultdict(list)
+    for job in jobs:
+        # Urgent alerts are never folded into a digest
+        key = (job.user_id, job.channel, job.id if job.urgent else 0)
+        groups[key].append(job)
+
+    batches = list(groups.values())
+    results = NotificationDispatcher().dispatch_sync([
+        partial(deliver_alerts, [
+            PendingAlert(
+                user_id=job.user_id,
+                channel=job.channel,
+                recipient=job.recipient,
+                **job.payload
+            )
+            for job in batch
+        ])
+        for batch in batches
+    ], return_exceptions=True)
+
+    delivered, failed, deferred = [], [], []
+    retry_after = float(settings.NOTIFICATION_OUTBOX_RETRY_SECONDS)
+    for batch, result in zip(batches, results):
+        ids = [job.id for job in batch]
+        if isinstance(result, (ProviderThrottled, BackpressureError)):
+            deferred.extend(ids)
+            if result.retry_after:
+                retry_after = max(retry_after, result.retry_after)
+        elif result is True:
+            delivered.extend(ids)
+        else:
+            if isinstance(result, Exception):
+                logger.error(f"Notification job failed: {str(result)}")
+            failed.extend(ids)
+    return delivered, failed, deferred, retry_after
@@ -1,17 +1,26 @@
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from celery import shared_task
 from sqlalchemy.orm import Session
 import pandas as pd
 
+from app.config import settings
 from app.db.session import SessionLocal
-from app.db.models import Product, PriceHistory, Alert
+from app.db.models.alert import Alert
+from app.db.models.product import Product
 from app.services.scraper.factory import ScraperFactory
-from app.services.notifications.email import EmailNotifier
-from app.services.notifications.sms import SMSNotifier
+from app.crud.alerts import alert_crud
+from app.crud.notification_outbox import outbox_crud
+from app.crud.price_history import price_history_crud
+from app.crud.products import price_drop_pct
+from app.db.models.notification_outbox import NotificationOutbox
+from app.services.notifications.alerts import PendingAlert
+from app.tasks.notifications import drain_notification_outbox
 from app.services.analytics.price_predictor import PricePredictor
+from app.services.analytics.rollups import record_price
+from app.utils.money import format_price, to_minor
 from app.core.logging import logger
 
 @shared_task(bind=True, max_retries=3)
@@ -36,27 +45,42 @@ def check_product_price(self, product_id: int) -> Optional[Dict]:
             return None
 
         product_data = scraper.scrape(product.url)
-        if not product_data or 'price' not in product_data:
+        if not product_data or product_data.get('price') is None:
             logger.error(f"Failed to scrape product {product_id}")
             return None
 
-        current_price = product_data['price']
+        # Prices are compared and stored in minor units (cents)
+        current_price = to_minor(product_data['price'], product.currency)
         
-        # 2. Save price history with BI metadata
-        price_history = PriceHistory(
+        # 2. Save price history with BI metadata and fold it into the rollups
+        observed_at = datetime.utcnow()
+        price_history_crud.record(
+            db,
             product_id=product.id,
             price=current_price,
-            date=datetime.now(),
+            observed_at=observed_at,
+            change_only=settings.PRICE_HISTORY_CHANGE_ONLY,
+            currency=product.currency,
             availability=product_data.get('availability', True),
             source=product_data.get('source', 'web')
         )
-        db.add(price_history)
-        
-        # 3. Calculate BI metrics
-        history_df = pd.read_sql(
-            f"SELECT date, price FROM price_history WHERE product_id = {product_id}",
-            db.connection()
+        record_price(
+            db,
+            product_id=product.id,
+            price=current_price,
+            observed_at=observed_at
         )
+        
+        # 3. Calculate BI metrics over a recent window (prunes old partitions)
+        history_df = pd.DataFrame(
+            price_history_crud.get_range(
+                db,
+                product_id=product_id,
+                start=datetime.utcnow() - timedelta(days=settings.PRICE_STATS_WINDOW_DAYS),
+                expand=True
+            ),
+            columns=['date', 'price']
+        ).astype({'price': 'int64'})
         stats = {
             'current_price': current_price,
             '7d_avg': history_df['price'].rolling(7).mean().iloc[-1],
@@ -71,17 +95,20 @@ def check_product_price(self, product_id: int) -> Optional[Dict]:
             logger.warning(f"Significant price drift detected: {price_drift:.2%}")
             trigger_ml_retrain.delay(product_id)
         
-        # 5. Update product and check alerts
+        # 5. Update product and queue alert notifications in the same transaction
         product.current_price = current_price
-        product.last_checked = datetime.now()
+        product.price_drop_pct = price_drop_pct(product.reference_price, current_price)
+        product.last_checked = datetime.utcnow()
+        queued = check_price_alerts(product_id, current_price, db)
         db.commit()
         
-        check_price_alerts(product_id, current_price, db)
+        if any(job.urgent for job in queued):
+            drain_notification_outbox.delay()
         
         return {
             'product_id': product_id,
             'stats': stats,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.utcnow().isoformat()
         }
 
     except Exception as e:
@@ -98,25 +125,72 @@ def trigger_ml_retrain(product_id: int):
     trainer = PricePredictorTrainer()
     trainer.train(product_id)
 
-def check_price_alerts(product_id: int, current_price: float, db: Session):
-    """Check if price meets any alert conditions"""
-    alerts = db.query(Alert).filter(
-        Alert.product_id == product_id,
-        Alert.active == True
-    ).all()
+def check_price_alerts(
+    product_id: int, current_price: int, db: Session
+) -> List[NotificationOutbox]:
+    """Queue outbox jobs for alerts whose condition is met (caller commits).
+
+    Alerts disarm once notified, so an item that stays below target does not
+    notify again on every check. They re-arm when the price climbs back above
+    target or falls a further ALERT_REARM_DROP_PCT below the notified price.
+    """
+    alert_crud.rearm(
+        db,
+        product_id=product_id,
+        current_price=current_price,
+        rearm_margin_pct=settings.ALERT_REARM_MARGIN_PCT
+    )
+    alerts = alert_crud.get_triggered(
+        db,
+        product_id=product_id,
+        current_price=current_price,
+        default_drop_pct=settings.ALERT_REARM_DROP_PCT or None,
+        cooldown=timedelta(seconds=settings.ALERT_COOLDOWN_SECONDS)
+    )
     
+    queued, notified = [], []
     for alert in alerts:
-        if current_price <= alert.target_price:
-            send_alert_notification(alert, current_price)
+        pending = build_pending_alert(alert, current_price)
+        if pending is None:
+            # Left armed, so it fires once the user has somewhere to receive it
+            logger.warning(f"Alert {alert.id} has no recipient; skipping")
+            continue
+        # Deep drops skip the digest window so the user can act quickly
+        urgent = current_price <= alert.target_price * (
+            1 - settings.NOTIFICATION_URGENT_DROP_PCT
+        )
+        notified.append(alert.id)
+        queued.append(outbox_crud.enqueue(
+            db,
+            user_id=pending.user_id,
+            channel=pending.channel,
+            recipient=pending.recipient,
+            payload=pending.as_context(),
+            urgent=urgent,
+            window_seconds=settings.NOTIFICATION_DIGEST_WINDOW_SECONDS
+        ))
+    alert_crud.mark_notified(db, ids=notified, price=current_price)
+    return queued
 
-def send_alert_notification(alert: Alert, current_price: float):
-    """Send alert via user's preferred channel"""
-    notifier = EmailNotifier() if alert.notification_type == 'email' else SMSNotifier()
-    notifier.send_price_alert(
-        recipient=alert.user.email,
+def build_pending_alert(alert: Alert, current_price: int) -> Optional[PendingAlert]:
+    """Snapshot what a notification needs so it can outlive the DB session.
+
+    SMS alerts for users without a phone number fall back to email; None
+    when there is no recipient at all.
+    """
+    channel = alert.notification_type or 'email'
+    recipient = alert.user.phone if channel == 'sms' else alert.user.email
+    if not recipient and channel == 'sms':
+        channel, recipient = 'email', alert.user.email
+    if not recipient:
+        return None
+    return PendingAlert(
+        user_id=alert.user_id,
+        channel=channel,
+        recipient=recipient,
         product_name=alert.product.name,
-        current_price=current_price,
-        target_price=alert.target_price,
-        product_url=alert.product.url
+        current_price=format_price(current_price, alert.product.currency),
+        target_price=format_price(alert.target_price, alert.product.currency),
+        product_url=alert.product.url,
+        currency=alert.product.currency
     )
-    
\ No newline at end of file
@@ -86,6 +86,47 @@ class ValidationError(PriceTrackerException):
             meta={"errors": errors}
         )
 
+class InvalidCursorError(PriceTrackerException):
+    def __init__(self, detail: str = "Invalid or expired pagination cursor"):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail,
+            code="invalid_cursor"
+        )
+
+class InvalidFieldsError(PriceTrackerException):
+    def __init__(self, detail: str = "Unknown field requested"):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail,
+            code="invalid_fields"
+        )
+
+class InvalidExportTokenError(PriceTrackerException):
+    def __init__(self, detail: str = "Invalid or expired export token"):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail,
+            code="invalid_export_token"
+        )
+
+class UnsupportedImageError(PriceTrackerException):
+    def __init__(self, detail: str = "Image must be a PNG, JPEG, GIF or WebP file"):
+        super().__init__(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=detail,
+            code="unsupported_image"
+        )
+
+class PayloadTooLargeError(PriceTrackerException):
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Upload exceeds {max_bytes} bytes",
+            code="payload_too_large",
+            meta={"max_bytes": max_bytes}
+        )
+
 # Business Logic Exceptions
 class ScrapingError(PriceTrackerException):
     def __init__(self, platform: str, detail: Optional[str] = None):
@@ -123,6 +164,15 @@ class RateLimitError(PriceTrackerException):
             headers={"Retry-After": str(retry_after)}
         )
 
+class PasswordHashingBusyError(PriceTrackerException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, try again shortly",
+            code="password_hashing_busy",
+            headers={"Retry-After": str(retry_after)}
+        )
+
 # Database Exceptions
 class DatabaseError(PriceTrackerException):
     def __init__(self, detail: Optional[str] = None):
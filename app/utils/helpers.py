@@ -1,20 +1,21 @@
 import re
 import random
 import time
+from decimal import Decimal, InvalidOperation
 from typing import Optional
 from urllib.parse import urlparse
 from datetime import datetime, timedelta
 
-def normalize_price(price_str: Optional[str]) -> Optional[float]:
-    """Convert price string to float"""
+def normalize_price(price_str: Optional[str]) -> Optional[Decimal]:
+    """Convert price string to an exact Decimal (see app.utils.money.to_minor)"""
     if not price_str:
         return None
     
     try:
         # Remove all non-numeric characters except decimal point
         cleaned = re.sub(r'[^\d.]', '', price_str)
-        return float(cleaned)
-    except (ValueError, TypeError):
+        return Decimal(cleaned)
+    except (InvalidOperation, TypeError):
         return None
 
 def random_delay(min_seconds: float = 1.0, max_seconds: float = 3.0) -> None:
@@ -62,3 +63,30 @@ def format_timedelta(td: timedelta) -> str:
             parts.append(part)
     
     return ", ".join(parts) if parts else "just now"
+
+# Leading bytes of the image formats accepted for uploads
+_IMAGE_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+]
+
+def image_content_type(data: bytes) -> Optional[str]:
+    """MIME type of a PNG, JPEG, GIF or WebP image, sniffed from its bytes"""
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    for signature, content_type in _IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return content_type
+    return None
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names ``etag`` (weak or strong)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/').strip('"') == etag:
+            return True
+    return False
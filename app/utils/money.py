@@ -0,0 +1,61 @@
+"""Integer minor-unit prices.
+
+Prices are stored and compared as integers in the currency's minor unit
+(cents for USD, yen for JPY, fils for KWD), so equality is exact and
+aggregates run on int64. Decimal is used only at the edges: parsing scraped
+text, API input/output and display.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional, Union
+
+DEFAULT_CURRENCY = "USD"
+
+# ISO 4217 minor unit exponents that differ from the default of 2
+CURRENCY_EXPONENTS = {
+    "BIF": 0, "CLP": 0, "DJF": 0, "GNF": 0, "ISK": 0, "JPY": 0, "KMF": 0,
+    "KRW": 0, "PYG": 0, "RWF": 0, "UGX": 0, "VND": 0, "VUV": 0, "XAF": 0,
+    "XOF": 0, "XPF": 0,
+    "BHD": 3, "IQD": 3, "JOD": 3, "KWD": 3, "LYD": 3, "OMR": 3, "TND": 3,
+}
+
+# Display symbols; other currencies are shown by code, e.g. 'KWD 12.345'
+CURRENCY_SYMBOLS = {
+    "USD": "$", "EUR": "€", "GBP": "£", "JPY": "¥", "INR": "₹", "KRW": "₩",
+    "CNY": "¥", "AUD": "A$", "CAD": "C$",
+}
+
+Amount = Union[Decimal, int, float, str]
+
+def currency_exponent(currency: Optional[str]) -> int:
+    """Number of minor-unit digits for a currency (2 unless listed)"""
+    return CURRENCY_EXPONENTS.get((currency or DEFAULT_CURRENCY).upper(), 2)
+
+def to_minor(amount: Optional[Amount], currency: Optional[str] = None) -> Optional[int]:
+    """Convert a major-unit amount (e.g. 79.99 USD) to minor units (7999).
+
+    Floats are converted through their shortest repr, so 0.1 + 0.2 style
+    binary noise does not leak into the stored value.
+    """
+    if amount is None:
+        return None
+    if isinstance(amount, float):
+        amount = repr(amount)
+    value = Decimal(amount).scaleb(currency_exponent(currency))
+    return int(value.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def to_major(minor: Optional[int], currency: Optional[str] = None) -> Optional[Decimal]:
+    """Convert minor units back to an exact major-unit Decimal (7999 -> 79.99)"""
+    if minor is None:
+        return None
+    return Decimal(int(minor)).scaleb(-currency_exponent(currency))
+
+def format_price(minor: Optional[int], currency: Optional[str] = None) -> str:
+    """Display string with the currency's digits, e.g. '79.90'"""
+    if minor is None:
+        return ""
+    return f"{to_major(minor, currency):.{currency_exponent(currency)}f}"
+
+def currency_symbol(currency: Optional[str] = None) -> str:
+    """Prefix to show before a formatted price, e.g. '$' or 'KWD '"""
+    code = (currency or DEFAULT_CURRENCY).upper()
+    return CURRENCY_SYMBOLS.get(code, f"{code} ")
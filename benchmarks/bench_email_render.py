@@ -0,0 +1,86 @@
+"""Messages/sec for price alert rendering and MIME assembly.
+
+Compares building a fresh Jinja environment per message (what an uncached
+render_template amounts to) with the shared EmailTemplateEngine, both one
+message at a time and through render_many.
+
+    python -m benchmarks.bench_email_render --messages 20000
+"""
+import argparse
+import time
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.config import settings
+from app.services.notifications.templates import (
+    EmailTemplateEngine,
+    FragmentCacheExtension,
+    url_for,
+)
+
+def make_contexts(n: int):
+    return [
+        {
+            'product_name': f"Wireless Headphones #{i}",
+            'current_price': 79.99 + i % 10,
+            'target_price': 99.99,
+            'product_url': f"https://example.com/product/{i}",
+            'unsubscribe_url': f"https://example.com/unsubscribe/{i}",
+            'settings_url': "https://example.com/settings",
+        }
+        for i in range(n)
+    ]
+
+def build_mime(html: str, recipient: str) -> bytes:
+    msg = MIMEMultipart()
+    msg['From'] = 'alerts@example.com'
+    msg['To'] = recipient
+    msg['Subject'] = 'Price Alert'
+    msg.attach(MIMEText(html, 'html'))
+    return msg.as_bytes()
+
+def bench_uncached(contexts):
+    for i, context in enumerate(contexts):
+        env = Environment(
+            loader=FileSystemLoader(settings.EMAIL_TEMPLATE_DIR),
+            autoescape=select_autoescape(["html"]),
+            extensions=[FragmentCacheExtension]
+        )
+        env.globals.update(url_for=url_for, now=datetime.utcnow())
+        html = env.get_template('email/price_alert.html').render(context)
+        build_mime(html, f"user{i}@example.com")
+
+def bench_engine(contexts):
+    engine = EmailTemplateEngine(settings.EMAIL_TEMPLATE_DIR)
+    for i, context in enumerate(contexts):
+        html = engine.render('price_alert.html', context)
+        build_mime(html, f"user{i}@example.com")
+
+def bench_engine_bulk(contexts):
+    engine = EmailTemplateEngine(settings.EMAIL_TEMPLATE_DIR)
+    for i, html in enumerate(engine.render_many('price_alert.html', contexts)):
+        build_mime(html, f"user{i}@example.com")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=5000)
+    args = parser.parse_args()
+
+    contexts = make_contexts(args.messages)
+    for name, fn in [
+        ('uncached', bench_uncached),
+        ('engine', bench_engine),
+        ('engine bulk', bench_engine_bulk),
+    ]:
+        # The uncached path is slow enough that a tenth of the load is plenty
+        sample = contexts[:max(1, len(contexts) // 10)] if name == 'uncached' else contexts
+        started = time.perf_counter()
+        fn(sample)
+        elapsed = time.perf_counter() - started
+        print(f"{name:<12} {len(sample) / elapsed:>10.0f} msg/s  ({len(sample)} messages)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Login throughput and event loop stalls with and without the hashing pool.
+
+Runs a burst of concurrent password verifications inside one event loop,
+the way the async /auth/login endpoint sees them, three ways: bcrypt
+inline on the loop (what authenticating through run_sync amounts to), in
+the default thread pool, and in app.core.hashing's process pool. A probe
+coroutine standing in for unrelated requests wakes every 5 ms meanwhile;
+its lateness is how long those requests would have stalled.
+
+    python -m benchmarks.bench_login_throughput --logins 400 --concurrency 100
+
+Logins the pool turns away when saturated are counted as rejected.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from passlib.context import CryptContext
+
+from app.core.hashing import PasswordHasher
+from app.utils.exceptions import PasswordHashingBusyError
+
+PASSWORD = "correct horse battery staple"
+
+async def probe(stop: asyncio.Event, interval: float = 0.005):
+    """Lateness in ms of each wakeup of a coroutine sleeping ``interval``"""
+    lateness = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lateness.append((time.perf_counter() - started - interval) * 1000)
+    return lateness
+
+async def run(mode: str, verify, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    rejected = 0
+
+    async def login():
+        nonlocal rejected
+        async with semaphore:
+            try:
+                if not await verify():
+                    raise RuntimeError("password did not verify")
+            except PasswordHashingBusyError:
+                rejected += 1
+
+    stop = asyncio.Event()
+    probe_task = asyncio.ensure_future(probe(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    lateness = sorted(await probe_task) or [0.0]
+    return {
+        "mode": mode,
+        "per_sec": (logins - rejected) / elapsed,
+        "rejected": rejected,
+        "p50": statistics.median(lateness),
+        "p99": lateness[int(len(lateness) * 0.99) - 1] if len(lateness) > 1 else lateness[0],
+        "max": lateness[-1],
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt rounds")
+    parser.add_argument("--workers", type=int, default=0, help="0 = one per CPU")
+    parser.add_argument("--max-pending", type=int, default=10_000)
+    parser.add_argument("--max-wait", type=float, default=3600.0,
+                        help="pool admission limit in seconds")
+    args = parser.parse_args()
+
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=args.rounds)
+    hashed = context.hash(PASSWORD)
+    hasher = PasswordHasher(
+        workers=args.workers,
+        max_pending=args.max_pending,
+        max_wait_seconds=args.max_wait
+    )
+
+    async def inline():
+        return context.verify(PASSWORD, hashed)
+
+    async def threads():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, context.verify, PASSWORD, hashed)
+
+    async def pool():
+        valid, _ = await hasher.verify_and_update_async(PASSWORD, hashed)
+        return valid
+
+    async def bench():
+        # Start the pool's processes outside the measured run
+        await asyncio.gather(*(pool() for _ in range(hasher.workers)))
+        return [
+            await run(mode, verify, args.logins, args.concurrency)
+            for mode, verify in (("inline", inline), ("threads", threads), ("process pool", pool))
+        ]
+
+    try:
+        results = asyncio.run(bench())
+    finally:
+        hasher.shutdown()
+
+    print(f"{args.logins} logins, {args.concurrency} concurrent, bcrypt rounds {args.rounds}, "
+          f"{hasher.workers} pool workers")
+    print(f"{'':<14}{'logins/s':>10}{'rejected':>10}{'stall p50':>11}{'stall p99':>11}{'stall max':>11}")
+    for r in results:
+        print(f"{r['mode']:<14}{r['per_sec']:>10.1f}{r['rejected']:>10}"
+              f"{r['p50']:>11.2f}{r['p99']:>11.2f}{r['max']:>11.2f}")
+    print("stall columns: ms a 5 ms sleeper woke late (unrelated requests' delay)")
+
+if __name__ == "__main__":
+    main()
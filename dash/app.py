@@ -4,9 +4,19 @@ import plotly.express as px
 import pandas as pd
 from sqlalchemy import create_engine
 
+from app.utils.money import currency_exponent
+
 # Connect to DB
 engine = create_engine("sqlite:///price_tracker.db")
-df = pd.read_sql("SELECT * FROM price_history", engine)
+# One row per product per day from the rollups instead of every raw observation
+df = pd.read_sql(
+    "SELECT r.product_id, r.period_start AS date, r.close_price AS price, p.currency "
+    "FROM price_rollup_daily r JOIN products p ON p.id = r.product_id "
+    "ORDER BY r.period_start",
+    engine
+)
+# Prices are stored in minor units (cents); chart them in major units
+df['price'] = df['price'] / 10.0 ** df['currency'].map(currency_exponent)
 
 # Initialize Dash
 app = dash.Dash(__name__)
@@ -19,7 +29,7 @@ app.layout = html.Div([
     ),
     dcc.Graph(
         figure=px.box(df, x='product_id', y='price', 
-                     title="Price Distribution by Product")
+                     title="Daily Close Distribution by Product")
     )
 ])
 
@@ -0,0 +1,16 @@
+-- Composite (product_id, date) index for per-product price history reads.
+--
+-- Postgres: CONCURRENTLY avoids blocking writers while the index builds on a
+-- large table, but it cannot run inside a transaction block, so apply with
+-- autocommit, e.g.  psql "$DATABASE_URL" -f migrations/001_price_history_product_date_index.sql
+-- INCLUDE (price) lets (date, price) range reads be answered index-only.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_price_history_product_id_date
+    ON price_history (product_id, date)
+    INCLUDE (price);
+
+ANALYZE price_history;
+
+-- SQLite (development) has no CONCURRENTLY/INCLUDE; use instead:
+--   CREATE INDEX IF NOT EXISTS ix_price_history_product_id_date
+--       ON price_history (product_id, date);
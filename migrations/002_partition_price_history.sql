@@ -0,0 +1,50 @@
+-- Convert price_history into a table partitioned by month on date (Postgres).
+--
+-- The existing table is kept as-is and attached as price_history_legacy,
+-- covering everything before the current month, so no rows are copied.
+-- Monthly partitions from the current month on are created by the
+-- maintain_price_history_partitions task (PRICE_HISTORY_PARTITIONING=true);
+-- run it once right after this migration, before new prices are written.
+-- Retention drops whole partitions; the legacy one goes once its newest
+-- month falls out of PRICE_HISTORY_RETENTION_MONTHS.
+--
+-- Run in a maintenance window: the renames and ATTACH take brief exclusive
+-- locks, and the primary key rebuild on the legacy table scans it once.
+
+BEGIN;
+
+ALTER TABLE price_history RENAME TO price_history_legacy;
+ALTER INDEX IF EXISTS ix_price_history_id RENAME TO ix_price_history_legacy_id;
+ALTER INDEX IF EXISTS ix_price_history_date RENAME TO ix_price_history_legacy_date;
+ALTER INDEX IF EXISTS ix_price_history_product_id_date
+    RENAME TO ix_price_history_legacy_product_id_date;
+
+-- A partitioned table's primary key must include the partition key
+ALTER TABLE price_history_legacy DROP CONSTRAINT price_history_pkey;
+ALTER TABLE price_history_legacy ALTER COLUMN date SET NOT NULL;
+ALTER TABLE price_history_legacy ADD PRIMARY KEY (id, date);
+
+CREATE TABLE price_history (LIKE price_history_legacy INCLUDING DEFAULTS)
+    PARTITION BY RANGE (date);
+ALTER TABLE price_history ADD PRIMARY KEY (id, date);
+ALTER TABLE price_history
+    ADD FOREIGN KEY (product_id) REFERENCES products (id);
+-- Keep the id sequence alive when the legacy partition is eventually dropped
+ALTER SEQUENCE price_history_id_seq OWNED BY price_history.id;
+
+DO $$
+BEGIN
+    EXECUTE format(
+        'ALTER TABLE price_history ATTACH PARTITION price_history_legacy '
+        'FOR VALUES FROM (MINVALUE) TO (%L)',
+        date_trunc('month', now() AT TIME ZONE 'UTC')
+    );
+END $$;
+
+-- Partitioned indexes; matching indexes on the legacy partition are attached
+CREATE INDEX ix_price_history_id ON price_history (id);
+CREATE INDEX ix_price_history_date ON price_history (date);
+CREATE INDEX ix_price_history_product_id_date
+    ON price_history (product_id, date) INCLUDE (price);
+
+COMMIT;
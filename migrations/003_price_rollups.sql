@@ -0,0 +1,29 @@
+-- Daily and weekly OHLC rollups of price_history (Postgres).
+-- Backfill existing history afterwards with:
+--   python -m app.services.analytics.rollups
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS price_rollup_daily (
+    product_id INTEGER NOT NULL REFERENCES products (id),
+    period_start TIMESTAMP NOT NULL,
+    open_price DOUBLE PRECISION NOT NULL,
+    high_price DOUBLE PRECISION NOT NULL,
+    low_price DOUBLE PRECISION NOT NULL,
+    close_price DOUBLE PRECISION NOT NULL,
+    mean_price DOUBLE PRECISION NOT NULL,
+    sample_count INTEGER NOT NULL,
+    price_sum DOUBLE PRECISION NOT NULL,
+    price_sum_sq DOUBLE PRECISION NOT NULL,
+    opened_at TIMESTAMP NOT NULL,
+    closed_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (product_id, period_start)
+);
+
+CREATE TABLE IF NOT EXISTS price_rollup_weekly (
+    LIKE price_rollup_daily INCLUDING ALL
+);
+ALTER TABLE price_rollup_weekly
+    ADD FOREIGN KEY (product_id) REFERENCES products (id);
+
+COMMIT;
@@ -0,0 +1,12 @@
+-- Run-length columns for change-only price storage (PRICE_HISTORY_CHANGE_ONLY).
+-- A row now covers observations from date to last_seen; existing rows are
+-- single observations. Collapse existing duplicates afterwards with the
+-- app.tasks.maintenance.compact_price_history task.
+--
+-- On a partitioned Postgres table this cascades to every partition.
+-- SQLite with partitioning on: run the two ADD COLUMN statements against each
+-- price_history_p* table (and price_history_legacy) instead, then
+-- DROP VIEW price_history; the next partition maintenance run recreates it.
+
+ALTER TABLE price_history ADD COLUMN last_seen TIMESTAMP;
+ALTER TABLE price_history ADD COLUMN observation_count INTEGER NOT NULL DEFAULT 1;
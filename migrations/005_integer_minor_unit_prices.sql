@@ -0,0 +1,107 @@
+-- Store prices as integers in the currency's minor unit (cents for USD, yen
+-- for JPY, fils for KWD) instead of floats; see app/utils/money.py. Rollups
+-- are rebuilt from the converted history afterwards with:
+--   python -m app.services.analytics.rollups
+--
+-- On a partitioned Postgres table the price_history change cascades to every
+-- partition (and rewrites them, so run it in a maintenance window).
+-- SQLite stores whatever it is given in any column, so there run the UPDATE
+-- statements at the bottom instead (against each price_history_p* table and
+-- price_history_legacy when partitioning is on).
+
+BEGIN;
+
+-- Keep in sync with app.utils.money.CURRENCY_EXPONENTS
+CREATE OR REPLACE FUNCTION price_currency_exponent(currency TEXT) RETURNS INTEGER
+LANGUAGE SQL IMMUTABLE AS $$
+    SELECT CASE
+        WHEN upper(coalesce(currency, 'USD')) IN (
+            'BIF', 'CLP', 'DJF', 'GNF', 'ISK', 'JPY', 'KMF', 'KRW', 'PYG',
+            'RWF', 'UGX', 'VND', 'VUV', 'XAF', 'XOF', 'XPF'
+        ) THEN 0
+        WHEN upper(currency) IN (
+            'BHD', 'IQD', 'JOD', 'KWD', 'LYD', 'OMR', 'TND'
+        ) THEN 3
+        ELSE 2
+    END
+$$;
+
+-- History rows were written with the default currency; take their
+-- product's so they are scaled by the right exponent
+UPDATE price_history AS h SET currency = p.currency
+FROM products AS p
+WHERE p.id = h.product_id AND h.currency IS DISTINCT FROM p.currency;
+
+ALTER TABLE price_history
+    ALTER COLUMN price TYPE INTEGER
+    USING round(price * 10 ^ price_currency_exponent(currency));
+
+ALTER TABLE products
+    ALTER COLUMN current_price TYPE INTEGER
+        USING round(current_price * 10 ^ price_currency_exponent(currency)),
+    ALTER COLUMN original_price TYPE INTEGER
+        USING round(original_price * 10 ^ price_currency_exponent(currency)),
+    ALTER COLUMN target_price TYPE INTEGER
+        USING round(target_price * 10 ^ price_currency_exponent(currency));
+
+-- Alert prices are in their product's currency, which USING cannot join to
+ALTER TABLE alerts
+    ADD COLUMN target_price_minor INTEGER,
+    ADD COLUMN last_notified_price_minor INTEGER;
+UPDATE alerts AS a SET
+    target_price_minor = round(a.target_price * 10 ^ price_currency_exponent(p.currency)),
+    last_notified_price_minor = round(a.last_notified_price * 10 ^ price_currency_exponent(p.currency))
+FROM products AS p
+WHERE p.id = a.product_id;
+ALTER TABLE alerts DROP COLUMN target_price;
+ALTER TABLE alerts DROP COLUMN last_notified_price;
+ALTER TABLE alerts RENAME COLUMN target_price_minor TO target_price;
+ALTER TABLE alerts RENAME COLUMN last_notified_price_minor TO last_notified_price;
+ALTER TABLE alerts ALTER COLUMN target_price SET NOT NULL;
+
+TRUNCATE price_rollup_daily, price_rollup_weekly;
+ALTER TABLE price_rollup_daily
+    ALTER COLUMN open_price TYPE INTEGER,
+    ALTER COLUMN high_price TYPE INTEGER,
+    ALTER COLUMN low_price TYPE INTEGER,
+    ALTER COLUMN close_price TYPE INTEGER,
+    ALTER COLUMN price_sum TYPE BIGINT;
+ALTER TABLE price_rollup_weekly
+    ALTER COLUMN open_price TYPE INTEGER,
+    ALTER COLUMN high_price TYPE INTEGER,
+    ALTER COLUMN low_price TYPE INTEGER,
+    ALTER COLUMN close_price TYPE INTEGER,
+    ALTER COLUMN price_sum TYPE BIGINT;
+
+COMMIT;
+
+-- SQLite (the CASE expressions mirror price_currency_exponent):
+--   UPDATE price_history SET currency = (
+--       SELECT currency FROM products WHERE products.id = price_history.product_id
+--   ) WHERE product_id IN (SELECT id FROM products);
+--   UPDATE price_history SET price = CAST(round(price * CASE
+--       WHEN upper(coalesce(currency, 'USD')) IN ('BIF', 'CLP', 'DJF', 'GNF', 'ISK', 'JPY',
+--           'KMF', 'KRW', 'PYG', 'RWF', 'UGX', 'VND', 'VUV', 'XAF', 'XOF', 'XPF') THEN 1
+--       WHEN upper(currency) IN ('BHD', 'IQD', 'JOD', 'KWD', 'LYD', 'OMR', 'TND') THEN 1000
+--       ELSE 100 END) AS INTEGER);
+--   UPDATE products SET
+--       current_price = CAST(round(current_price * f) AS INTEGER),
+--       original_price = CAST(round(original_price * f) AS INTEGER),
+--       target_price = CAST(round(target_price * f) AS INTEGER)
+--   FROM (SELECT id AS product_id, CASE
+--       WHEN upper(coalesce(currency, 'USD')) IN ('BIF', 'CLP', 'DJF', 'GNF', 'ISK', 'JPY',
+--           'KMF', 'KRW', 'PYG', 'RWF', 'UGX', 'VND', 'VUV', 'XAF', 'XOF', 'XPF') THEN 1
+--       WHEN upper(currency) IN ('BHD', 'IQD', 'JOD', 'KWD', 'LYD', 'OMR', 'TND') THEN 1000
+--       ELSE 100 END AS f FROM products) AS factors
+--   WHERE products.id = factors.product_id;
+--   UPDATE alerts SET
+--       target_price = CAST(round(target_price * f) AS INTEGER),
+--       last_notified_price = CAST(round(last_notified_price * f) AS INTEGER)
+--   FROM (SELECT id AS product_id, CASE
+--       WHEN upper(coalesce(currency, 'USD')) IN ('BIF', 'CLP', 'DJF', 'GNF', 'ISK', 'JPY',
+--           'KMF', 'KRW', 'PYG', 'RWF', 'UGX', 'VND', 'VUV', 'XAF', 'XOF', 'XPF') THEN 1
+--       WHEN upper(currency) IN ('BHD', 'IQD', 'JOD', 'KWD', 'LYD', 'OMR', 'TND') THEN 1000
+--       ELSE 100 END AS f FROM products) AS factors
+--   WHERE alerts.product_id = factors.product_id;
+--   DELETE FROM price_rollup_daily;
+--   DELETE FROM price_rollup_weekly;
@@ -0,0 +1,13 @@
+-- (user_id, id) indexes for keyset ("cursor") pagination of a user's products
+-- and alerts: a page is an index range scan starting after the cursor's id,
+-- however deep the page.
+--
+-- Postgres: CONCURRENTLY cannot run inside a transaction block, so apply with
+-- autocommit, e.g.  psql "$DATABASE_URL" -f migrations/006_owner_keyset_indexes.sql
+-- SQLite: drop CONCURRENTLY.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_user_id_id
+    ON products (user_id, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_alerts_user_id_id
+    ON alerts (user_id, id);
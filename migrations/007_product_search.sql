@@ -0,0 +1,37 @@
+-- Full-text product search (CRUDProduct.search); the same objects are created
+-- with the products table by app/db/models/product.py.
+--
+-- Postgres: the generated column fills itself for existing rows (the ADD
+-- COLUMN rewrites the table). CONCURRENTLY cannot run inside a transaction
+-- block, so apply with autocommit, e.g.
+--   psql "$DATABASE_URL" -f migrations/007_product_search.sql
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_search_vector
+    ON products USING GIN (search_vector);
+
+-- SQLite: an external-content FTS5 index kept current by triggers, then
+-- filled from the existing rows:
+--   CREATE VIRTUAL TABLE products_fts USING fts5(
+--       name, description, content='products', content_rowid='id',
+--       tokenize='unicode61 remove_diacritics 2', prefix='2 3');
+--   CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN
+--       INSERT INTO products_fts (rowid, name, description)
+--       VALUES (new.id, new.name, new.description);
+--   END;
+--   CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN
+--       INSERT INTO products_fts (products_fts, rowid, name, description)
+--       VALUES ('delete', old.id, old.name, old.description);
+--   END;
+--   CREATE TRIGGER products_fts_update AFTER UPDATE OF name, description ON products BEGIN
+--       INSERT INTO products_fts (products_fts, rowid, name, description)
+--       VALUES ('delete', old.id, old.name, old.description);
+--       INSERT INTO products_fts (rowid, name, description)
+--       VALUES (new.id, new.name, new.description);
+--   END;
+--   INSERT INTO products_fts (products_fts) VALUES ('rebuild');
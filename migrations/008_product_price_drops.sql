@@ -0,0 +1,12 @@
+-- Precomputed reference prices for the deals feed (CRUDProduct.get_price_drops).
+-- Fill them afterwards with the app.tasks.maintenance.refresh_price_drops task
+-- (also scheduled hourly by celery beat).
+--
+-- Postgres: CONCURRENTLY cannot run inside a transaction block, so apply with
+-- autocommit. SQLite: drop CONCURRENTLY.
+
+ALTER TABLE products ADD COLUMN reference_price INTEGER;
+ALTER TABLE products ADD COLUMN price_drop_pct DOUBLE PRECISION;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_price_drop_pct_id
+    ON products (price_drop_pct, id);
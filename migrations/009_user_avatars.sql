@@ -0,0 +1,67 @@
+-- Move users.profile_image into its own table (app/db/models/user_avatar.py)
+-- so the users rows loaded on every authenticated request stay small.
+-- Existing images keep their bytes; the content type is sniffed from them.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS user_avatars (
+    user_id INTEGER PRIMARY KEY REFERENCES users (id) ON DELETE CASCADE,
+    content_type VARCHAR(50) NOT NULL,
+    size INTEGER NOT NULL,
+    etag VARCHAR(64) NOT NULL,
+    updated_at TIMESTAMP,
+    image BYTEA NOT NULL
+);
+
+-- Images are already compressed; stored uncompressed out of line, the
+-- substring() reads that stream an avatar in chunks fetch only the bytes
+-- they need instead of decompressing the whole value for every chunk
+ALTER TABLE user_avatars ALTER COLUMN image SET STORAGE EXTERNAL;
+
+INSERT INTO user_avatars (user_id, content_type, size, etag, updated_at, image)
+SELECT
+    id,
+    CASE
+        WHEN substring(profile_image FROM 1 FOR 8) = '\x89504e470d0a1a0a'::bytea THEN 'image/png'
+        WHEN substring(profile_image FROM 1 FOR 3) = '\xffd8ff'::bytea THEN 'image/jpeg'
+        WHEN substring(profile_image FROM 1 FOR 4) = 'GIF8'::bytea THEN 'image/gif'
+        WHEN substring(profile_image FROM 1 FOR 4) = 'RIFF'::bytea
+            AND substring(profile_image FROM 9 FOR 4) = 'WEBP'::bytea THEN 'image/webp'
+        ELSE 'application/octet-stream'
+    END,
+    octet_length(profile_image),
+    encode(sha256(profile_image), 'hex'),
+    now(),
+    profile_image
+FROM users
+WHERE profile_image IS NOT NULL
+ON CONFLICT (user_id) DO NOTHING;
+
+ALTER TABLE users DROP COLUMN profile_image;
+
+COMMIT;
+
+-- SQLite (no sha256(), so moved images get a random etag; it only has to
+-- change when the image does):
+--   CREATE TABLE user_avatars (
+--       user_id INTEGER PRIMARY KEY REFERENCES users (id) ON DELETE CASCADE,
+--       content_type VARCHAR(50) NOT NULL,
+--       size INTEGER NOT NULL,
+--       etag VARCHAR(64) NOT NULL,
+--       updated_at DATETIME,
+--       image BLOB NOT NULL
+--   );
+--   INSERT INTO user_avatars (user_id, content_type, size, etag, updated_at, image)
+--   SELECT id,
+--          CASE
+--              WHEN substr(profile_image, 1, 8) = X'89504E470D0A1A0A' THEN 'image/png'
+--              WHEN substr(profile_image, 1, 3) = X'FFD8FF' THEN 'image/jpeg'
+--              WHEN substr(profile_image, 1, 4) = X'47494638' THEN 'image/gif'
+--              WHEN substr(profile_image, 1, 4) = X'52494646'
+--                  AND substr(profile_image, 9, 4) = X'57454250' THEN 'image/webp'
+--              ELSE 'application/octet-stream'
+--          END,
+--          length(profile_image), lower(hex(randomblob(32))), CURRENT_TIMESTAMP,
+--          profile_image
+--   FROM users WHERE profile_image IS NOT NULL;
+--   ALTER TABLE users DROP COLUMN profile_image;
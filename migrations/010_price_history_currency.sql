@@ -0,0 +1,17 @@
+-- Price checks recorded history rows with the default currency (USD) while
+-- storing the price in the product's minor unit, so readers scaled prices
+-- of non-USD products by the wrong exponent. The prices are right; only the
+-- currency needs to match the product's. Safe to run more than once.
+
+BEGIN;
+
+UPDATE price_history AS h SET currency = p.currency
+FROM products AS p
+WHERE p.id = h.product_id AND h.currency IS DISTINCT FROM p.currency;
+
+COMMIT;
+
+-- SQLite:
+--   UPDATE price_history SET currency = (
+--       SELECT currency FROM products WHERE products.id = price_history.product_id
+--   ) WHERE product_id IN (SELECT id FROM products);
@@ -4,22 +4,20 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 import joblib
 from datetime import datetime
-from app.db.session import SessionLocal
+from app.crud.price_history import price_history_crud
+from app.db.session import ReadSessionLocal
 
 class PricePredictorTrainer:
     def __init__(self):
         self.model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.db = SessionLocal()
+        self.db = ReadSessionLocal()
 
     def load_data(self, product_id: int) -> pd.DataFrame:
         """Load price history data from database"""
-        query = f"""
-            SELECT date, price 
-            FROM price_history 
-            WHERE product_id = {product_id}
-            ORDER BY date
-        """
-        df = pd.read_sql(query, self.db.connection())
+        df = pd.DataFrame(
+            price_history_crud.get_range(self.db, product_id=product_id, expand=True),
+            columns=['date', 'price']
+        )
         df['date'] = pd.to_datetime(df['date'])
         return df
 
@@ -1,23 +1,41 @@
--- 1. Price Volatility (Standard Deviation)
+-- These read the price_rollup_daily / price_rollup_weekly tables (one row per
+-- product per day / Monday-start week) instead of raw price_history rows.
+-- Populate them for existing data with:
+--   python -m app.services.analytics.rollups
+-- Prices are integers in the currency's minor unit (cents for USD); the
+-- "* 1.0" keeps averages from being truncated by integer division.
+
+-- 1. Price Volatility (Standard Deviation, over all observations)
 SELECT 
     product_id,
-    STDDEV(price) AS price_volatility
-FROM price_history
+    SQRT(
+        SUM(price_sum_sq) / SUM(sample_count)
+        - (SUM(price_sum) * 1.0 / SUM(sample_count)) * (SUM(price_sum) * 1.0 / SUM(sample_count))
+    ) AS price_volatility
+FROM price_rollup_daily
 GROUP BY product_id;
 
 -- 2. Weekly Price Trends
 SELECT 
     product_id,
-    strftime('%Y-%W', date) AS week,
-    AVG(price) AS avg_price
-FROM price_history
-GROUP BY product_id, week;
+    period_start AS week,
+    mean_price AS avg_price,
+    open_price,
+    high_price,
+    low_price,
+    close_price
+FROM price_rollup_weekly
+ORDER BY product_id, week;
 
--- 3. Optimal Buy Windows (Prices below avg)
+-- 3. Optimal Buy Windows (days whose low was below the product's average)
 SELECT 
-    product_id,
-    date,
-    price
-FROM price_history
-WHERE price < (SELECT AVG(price) FROM price_history AS ph2 
-               WHERE ph2.product_id = price_history.product_id);
\ No newline at end of file
+    d.product_id,
+    d.period_start AS date,
+    d.low_price AS price
+FROM price_rollup_daily AS d
+JOIN (
+    SELECT product_id, SUM(price_sum) * 1.0 / SUM(sample_count) AS avg_price
+    FROM price_rollup_daily
+    GROUP BY product_id
+) AS a ON a.product_id = d.product_id
+WHERE d.low_price < a.avg_price;